@@ -0,0 +1,153 @@
+"""Quality/latency trade-off of adaptive rerank depth in ``retrieve_chunks``.
+
+The corpus is the retirement knowledge base itself: every paragraph of
+``data/retirement_facts.txt`` plus one passage per section of the structured
+facts in ``data/retirement_data.json``.  Each labelled query in
+``benchmarks/data/rerank_queries.json`` names substrings identifying its
+relevant passage.  For every rerank policy this reports hit@1, MRR@3, the
+mean number of cross-encoded pairs per query and p50/p99 latency, with the
+retrieval caches cleared before each query so every run pays for inference.
+
+Run from the backend directory with the real models (downloaded on first use):
+
+    python benchmarks/bench_adaptive_rerank.py
+
+``--models stub`` swaps in bag-of-words stand-ins to smoke-test the harness
+without the model weights; its quality numbers are not meaningful.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import types
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND))
+
+from modules.ann_index import build_index
+from modules.lexical import BM25Index, flatten_fact, tokenize
+
+DIMENSION = 384
+QUERIES_FILE = BACKEND / "benchmarks" / "data" / "rerank_queries.json"
+
+POLICIES = [
+    ("rerank all k", {"rerank_k": 8}),
+    ("fixed depth", {"adaptive": False}),
+    ("adaptive", {"adaptive": True}),
+    ("adaptive 20ms", {"adaptive": True, "latency_budget_ms": 20}),
+    ("adaptive 5ms", {"adaptive": True, "latency_budget_ms": 5}),
+]
+
+
+class Chunk:
+    __slots__ = ("page_content", "metadata")
+
+    def __init__(self, page_content, metadata):
+        self.page_content = page_content
+        self.metadata = metadata
+
+
+def install_stub_models():
+    """Bag-of-words embedding and word-overlap cross encoder"""
+
+    def embed(text):
+        vector = np.zeros(DIMENSION, dtype=np.float32)
+        for token in tokenize(text):
+            vector[zlib.crc32(token.encode()) % DIMENSION] += 1.0
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    class StubEmbedding:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def encode(self, texts, **kwargs):
+            if isinstance(texts, str):
+                return embed(texts)
+            return np.array([embed(text) for text in texts])
+
+    class StubCrossEncoder:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def predict(self, pairs, **kwargs):
+            time.sleep(0.002 * len(pairs))
+            return np.array([len(set(tokenize(q)) & set(tokenize(d))) for q, d in pairs], dtype=np.float32)
+
+    module = types.ModuleType("sentence_transformers")
+    module.SentenceTransformer = StubEmbedding
+    module.CrossEncoder = StubCrossEncoder
+    sys.modules["sentence_transformers"] = module
+
+
+def load_corpus():
+    passages = [p.strip() for p in (BACKEND / "data" / "retirement_facts.txt").read_text().split("\n\n") if p.strip()]
+    with open(BACKEND / "data" / "retirement_data.json") as f:
+        facts = json.load(f)["retirement_facts"]
+    for section, value in facts.items():
+        lines = flatten_fact(value) if isinstance(value, dict) else [str(value)]
+        passages.append("\n".join([section.replace("_", " ") + ":"] + lines))
+    return [Chunk(text, {"chunk_id": i}) for i, text in enumerate(passages)]
+
+
+def rank_of_relevant(result, relevant):
+    for rank, passage in enumerate(result, start=1):
+        if any(label in passage for label in relevant):
+            return rank
+    return None
+
+
+def run(top_n):
+    os.chdir(BACKEND)
+    import retirement_planner
+
+    documents = load_corpus()
+    with open(QUERIES_FILE) as f:
+        queries = json.load(f)
+
+    vectors = retirement_planner.get_embedding_model().encode([doc.page_content for doc in documents])
+    manager = types.SimpleNamespace(
+        index=build_index("flat", np.asarray(vectors, dtype=np.float32), DIMENSION),
+        document_store=documents,
+        bm25_index=BM25Index([doc.page_content for doc in documents])
+    )
+
+    # Warm the models and the per-pair latency estimate before timing
+    for query in queries:
+        retirement_planner.retrieve_chunks(query["query"], manager, top_n=top_n, rerank_k=8)
+        retirement_planner.clear_retrieval_caches()
+
+    print(f"{len(documents)} passages, {len(queries)} labelled queries, top_n={top_n}")
+    print(f"{'policy':>14} {'hit@1':>6} {'mrr@' + str(top_n):>6} {'pairs':>6} {'p50':>9} {'p99':>9}")
+    for name, options in POLICIES:
+        hits, reciprocal_ranks, pairs, latencies = 0, [], [], []
+        for query in queries:
+            retirement_planner.clear_retrieval_caches()
+            misses = retirement_planner.rerank_score_cache.misses
+            start = time.perf_counter()
+            result = retirement_planner.retrieve_chunks(query["query"], manager, top_n=top_n, **options)
+            latencies.append(time.perf_counter() - start)
+            pairs.append(retirement_planner.rerank_score_cache.misses - misses)
+
+            rank = rank_of_relevant(result, query["relevant"])
+            hits += rank == 1
+            reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+        print(f"{name:>14} {hits / len(queries):>6.2f} {np.mean(reciprocal_ranks):>6.3f} {np.mean(pairs):>6.2f} "
+              f"{np.percentile(latencies, 50) * 1000:>7.2f}ms {np.percentile(latencies, 99) * 1000:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top-n", type=int, default=3)
+    parser.add_argument("--models", choices=("stub", "real"), default="real",
+                        help="The real models (default) or bag-of-words stand-ins")
+    args = parser.parse_args()
+    if args.models == "stub":
+        install_stub_models()
+    run(args.top_n)
@@ -0,0 +1,146 @@
+"""Recall and latency benchmark for the FAISS index types used by IndexManager.
+
+For each corpus size and index type this reports build time, recall@k of the
+index against exact (flat) search, and p50/p99 latency of both the raw index
+search and the full ``retrieve_with_rerank`` call.
+
+The corpus is synthetic: clustered, L2-normalized 384-d vectors shaped like
+MiniLM sentence embeddings, with queries drawn near corpus points.  By
+default the embedding model and cross encoder are replaced with cheap
+stand-ins so the numbers isolate the index; pass ``--models real`` to
+include model inference.
+
+Run from the backend directory:
+
+    python benchmarks/bench_ann_index.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+import types
+from pathlib import Path
+
+import numpy as np
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND))
+
+from modules.ann_index import INDEX_TYPES, build_index
+
+DIMENSION = 384
+
+
+class Chunk:
+    __slots__ = ("page_content", "metadata")
+
+    def __init__(self, page_content, metadata):
+        self.page_content = page_content
+        self.metadata = metadata
+
+
+def make_corpus(n_vectors, n_queries, seed=0):
+    rng = np.random.default_rng(seed)
+    n_clusters = max(16, n_vectors // 500)
+    centers = rng.standard_normal((n_clusters, DIMENSION)).astype(np.float32)
+    vectors = centers[rng.integers(0, n_clusters, n_vectors)]
+    vectors += 0.35 * rng.standard_normal((n_vectors, DIMENSION)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    queries = vectors[rng.integers(0, n_vectors, n_queries)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return vectors, queries.astype(np.float32)
+
+
+def install_stub_models(query_vectors):
+    """Replace the sentence-transformers models with lookups so imports stay cheap"""
+    lookup = {f"benchmark query {i}": vector for i, vector in enumerate(query_vectors)}
+
+    class StubEmbedding:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def encode(self, texts, **kwargs):
+            if isinstance(texts, str):
+                return lookup.get(texts, np.zeros(DIMENSION, dtype=np.float32))
+            return np.array([lookup.get(t, np.zeros(DIMENSION, dtype=np.float32)) for t in texts])
+
+    class StubCrossEncoder:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def predict(self, pairs, **kwargs):
+            return np.array([-len(document) for _, document in pairs], dtype=np.float32)
+
+    module = types.ModuleType("sentence_transformers")
+    module.SentenceTransformer = StubEmbedding
+    module.CrossEncoder = StubCrossEncoder
+    sys.modules["sentence_transformers"] = module
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def recall_at_k(found, truth, k):
+    hits = [len(set(f[:k]) & set(t[:k])) for f, t in zip(found, truth)]
+    return sum(hits) / (k * len(truth))
+
+
+def run(sizes, index_types, n_queries, k, models):
+    _, probe_queries = make_corpus(max(sizes), n_queries, seed=1)
+    if models == "stub":
+        install_stub_models(probe_queries)
+
+    os.chdir(BACKEND)
+    import retirement_planner
+
+    print(f"{'chunks':>9} {'index':>6} {'build s':>8} {'recall@' + str(k):>9} "
+          f"{'search p50':>11} {'search p99':>11} {'rerank p50':>11} {'rerank p99':>11}")
+
+    for size in sizes:
+        vectors, _ = make_corpus(size, 0, seed=size)
+        queries = probe_queries
+        documents = [Chunk(f"chunk {i}", {"chunk_id": i}) for i in range(size)]
+
+        exact = build_index("flat", vectors, DIMENSION)
+        _, truth = exact.search(queries, k)
+
+        for index_type in index_types:
+            start = time.perf_counter()
+            index = exact if index_type == "flat" else build_index(index_type, vectors, DIMENSION)
+            build_seconds = time.perf_counter() - start
+
+            search_times, found = [], []
+            for query in queries:
+                start = time.perf_counter()
+                _, ids = index.search(query[None, :], k)
+                search_times.append(time.perf_counter() - start)
+                found.append(ids[0])
+
+            manager = types.SimpleNamespace(index=index, document_store=documents)
+            # Cached embeddings and rerank scores from the previous index would hide this one's cost
+            retirement_planner.clear_retrieval_caches()
+            rerank_times = []
+            for i in range(len(queries)):
+                start = time.perf_counter()
+                retirement_planner.retrieve_with_rerank(f"benchmark query {i}", manager, k=k)
+                rerank_times.append(time.perf_counter() - start)
+
+            print(f"{size:>9} {index_type:>6} {build_seconds:>8.2f} {recall_at_k(found, truth, k):>9.3f} "
+                  f"{percentile_ms(search_times, 50):>9.2f}ms {percentile_ms(search_times, 99):>9.2f}ms "
+                  f"{percentile_ms(rerank_times, 50):>9.2f}ms {percentile_ms(rerank_times, 99):>9.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--index-types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--models", choices=("stub", "real"), default="stub",
+                        help="Cheap stand-ins (default) or the real embedding model and cross encoder")
+    args = parser.parse_args()
+    run(args.sizes, args.index_types, args.queries, args.k, args.models)
@@ -0,0 +1,133 @@
+"""Throughput, latency and agreement of the embedding/cross-encoder inference backends.
+
+Each backend in ``modules.inference_backend`` is loaded for both MiniLM
+models and compared with the full-precision PyTorch path on the retirement
+knowledge base and the labelled queries used by ``bench_adaptive_rerank``:
+
+- embedding throughput (passages/s) and single-query latency p50/p99
+- cross-encoder throughput (pairs/s) and latency p50/p99 for one query
+  against ``--pairs`` passages, the shape of a rerank call
+- agreement with torch: mean cosine similarity of embeddings, overlap of
+  the top-3 retrieved passages, and top-1 agreement of rerank scores
+
+It then reports how retrieval changes when the torch embeddings are stored
+in the reduced-precision FAISS indexes (``fp16``, ``sq8``).
+
+Run from the backend directory (ONNX backends need ``onnxruntime`` and
+``optimum``; models download on first use):
+
+    python benchmarks/bench_inference_backend.py --threads 4
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_adaptive_rerank import QUERIES_FILE, load_corpus
+from modules.ann_index import build_index
+from modules.inference_backend import INFERENCE_BACKENDS, load_cross_encoder, load_embedding_model
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+CROSS_ENCODER_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+TOP_K = 3
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return np.array(samples)
+
+
+def top_k_ids(vectors, queries, index_type="flat"):
+    index = build_index(index_type, vectors, vectors.shape[1])
+    _, ids = index.search(queries, TOP_K)
+    return ids
+
+
+def overlap(found, reference):
+    return float(np.mean([len(set(f) & set(r)) / TOP_K for f, r in zip(found, reference)]))
+
+
+def evaluate(backend, threads, passages, queries, n_pairs, repeats):
+    embedder = load_embedding_model(EMBEDDING_MODEL_NAME, backend, threads)
+    cross_encoder = load_cross_encoder(CROSS_ENCODER_MODEL_NAME, backend, threads)
+
+    # Warm up graph compilation and thread pools
+    embedder.encode(passages[:8])
+    cross_encoder.predict([(queries[0], passage) for passage in passages[:8]])
+
+    passage_vectors = np.asarray(embedder.encode(passages), dtype=np.float32)
+    query_vectors = np.asarray(embedder.encode(queries), dtype=np.float32)
+    pairs = [(query, passage) for query in queries for passage in passages]
+    scores = np.asarray(cross_encoder.predict(pairs), dtype=np.float32).reshape(len(queries), len(passages))
+
+    encode_seconds = timed(lambda: embedder.encode(passages), repeats).mean()
+    query_latency = timed(lambda: embedder.encode([queries[0]]), repeats * 10)
+    rerank_pairs = [(queries[0], passage) for passage in (passages * n_pairs)[:n_pairs]]
+    predict_seconds = timed(lambda: cross_encoder.predict(pairs), repeats).mean()
+    rerank_latency = timed(lambda: cross_encoder.predict(rerank_pairs), repeats * 10)
+
+    return {
+        "passage_vectors": passage_vectors,
+        "query_vectors": query_vectors,
+        "scores": scores,
+        "embed_per_s": len(passages) / encode_seconds,
+        "query_p50": np.percentile(query_latency, 50) * 1000,
+        "query_p99": np.percentile(query_latency, 99) * 1000,
+        "pairs_per_s": len(pairs) / predict_seconds,
+        "rerank_p50": np.percentile(rerank_latency, 50) * 1000,
+        "rerank_p99": np.percentile(rerank_latency, 99) * 1000,
+    }
+
+
+def cosine(a, b):
+    return float(np.mean(np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))))
+
+
+def run(backends, threads, n_pairs, repeats):
+    passages = [doc.page_content for doc in load_corpus()]
+    with open(QUERIES_FILE) as f:
+        queries = [entry["query"] for entry in json.load(f)]
+
+    results = {backend: evaluate(backend, threads, passages, queries, n_pairs, repeats) for backend in backends}
+    reference = results.get("torch") or evaluate("torch", threads, passages, queries, n_pairs, repeats)
+    reference_ids = top_k_ids(reference["passage_vectors"], reference["query_vectors"])
+    reference_top1 = reference["scores"].argmax(axis=1)
+
+    print(f"{len(passages)} passages, {len(queries)} queries, threads={threads or 'default'}")
+    print(f"{'backend':>11} {'embed/s':>8} {'query p50':>10} {'query p99':>10} {'pairs/s':>8} "
+          f"{'rerank p50':>11} {'rerank p99':>11} {'cosine':>7} {'top-3':>6} {'top-1':>6}")
+    for backend, result in results.items():
+        ids = top_k_ids(result["passage_vectors"], result["query_vectors"])
+        print(f"{backend:>11} {result['embed_per_s']:>8.0f} {result['query_p50']:>8.2f}ms {result['query_p99']:>8.2f}ms "
+              f"{result['pairs_per_s']:>8.0f} {result['rerank_p50']:>9.2f}ms {result['rerank_p99']:>9.2f}ms "
+              f"{cosine(result['passage_vectors'], reference['passage_vectors']):>7.4f} "
+              f"{overlap(ids, reference_ids):>6.3f} "
+              f"{np.mean(result['scores'].argmax(axis=1) == reference_top1):>6.3f}")
+
+    print(f"\n{'index':>6} {'bytes/vector':>13} {'top-3 vs flat':>14}")
+    for index_type, bytes_per_value in (("flat", 4), ("fp16", 2), ("sq8", 1)):
+        ids = top_k_ids(reference["passage_vectors"], reference["query_vectors"], index_type)
+        print(f"{index_type:>6} {bytes_per_value * reference['passage_vectors'].shape[1]:>13} "
+              f"{overlap(ids, reference_ids):>14.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", choices=INFERENCE_BACKENDS, default=list(INFERENCE_BACKENDS))
+    parser.add_argument("--threads", type=int, default=None, help="Intra-op threads per model")
+    parser.add_argument("--pairs", type=int, default=8, help="Query/passage pairs per rerank call")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.backends, args.threads, args.pairs, args.repeats)
@@ -0,0 +1,53 @@
+"""Multi-worker serving with models and the retrieval index loaded before fork.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+The master imports the app, loads the read-only model weights and the FAISS
+index once, then freezes the garbage collector so reference-count and GC
+bookkeeping in the workers does not dirty those shared pages.  Set
+RETIREMENT_INDEX_MMAP=true to also share the index through the page cache.
+Per-worker memory is logged after each worker boots and served at /api/memory.
+
+The news scheduler and first news fetch run in one designated worker, the one
+holding the NEWS_SCHEDULER_LOCK file lock (see main.py), not in the master:
+the master has no event loop, and a worker replacing a dead leader simply
+takes the lock over.
+"""
+
+import gc
+import logging
+import os
+
+from modules.inference_backend import configure_threads
+from modules.memory import process_memory
+
+logger = logging.getLogger("gunicorn.error")
+
+bind = f"0.0.0.0:{os.getenv('PORT', 4000)}"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+
+# Split the cores between workers unless the thread count is set explicitly
+INFERENCE_THREADS = int(os.getenv("RETIREMENT_INFERENCE_THREADS", 0)) or max(1, (os.cpu_count() or 1) // workers)
+
+
+def when_ready(server):
+    from main import preload_shared_state
+
+    # A single-threaded master never starts an OpenMP pool that forked workers would inherit
+    configure_threads(1)
+    preload_shared_state()
+    gc.collect()
+    gc.freeze()
+    os.environ["GUNICORN_MASTER_PID"] = str(os.getpid())
+    logger.info(f"Preloaded shared state: {process_memory()}")
+
+
+def post_fork(server, worker):
+    configure_threads(INFERENCE_THREADS)
+
+
+def post_worker_init(worker):
+    logger.info(f"Worker {worker.pid} booted: {process_memory()}")
@@ -0,0 +1,49 @@
+"""Standalone plan job worker.
+
+    RETIREMENT_JOB_WORKERS=0 gunicorn -c gunicorn.conf.py main:app
+    python job_worker.py --concurrency 2
+
+Runs queued /api/retirement/plan/jobs from the shared SQLite job store
+(RETIREMENT_JOB_DB), so job throughput scales with the number of worker
+processes independently of the API.  Run it from the backend directory so it
+sees the same data files as the API.  On SIGTERM or Ctrl-C any job in
+progress is put back on the queue for another worker.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from retirement_planner import initialize_app, run_plan_job_worker, shutdown_worker_pools
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("job_worker")
+
+
+async def main(concurrency: int):
+    await asyncio.to_thread(initialize_app)
+    worker = asyncio.create_task(run_plan_job_worker(concurrency))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.cancel)
+
+    logger.info(f"Plan job worker started with concurrency {concurrency}")
+    try:
+        await worker
+    except asyncio.CancelledError:
+        logger.info("Plan job worker stopped")
+    finally:
+        shutdown_worker_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("RETIREMENT_JOB_CONCURRENCY", 2)),
+                        help="Plan jobs run at once by this process")
+    asyncio.run(main(parser.parse_args().concurrency))
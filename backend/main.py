@@ -1,4 +1,5 @@
 from fastapi import FastAPI, Query, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -11,14 +12,17 @@ import time
 load_dotenv()
 import logging
 import os
+import fcntl
 import requests
 import asyncio
 
 
 from typing import List
 from database import db
-from news_fetcher import NewsFetcher
-from retirement_planner import router as retirement_router, initialize_app
+from news_fetcher import NewsFetcher, get_summarizer
+from retirement_planner import router as retirement_router, initialize_app, shutdown_worker_pools, run_plan_job_worker, INFERENCE_BACKEND
+from modules.readiness import readiness
+from modules.memory import worker_memory_report
 from functools import lru_cache
 import finnhub
 
@@ -32,6 +36,14 @@ logger = logging.getLogger("main")
 
 scheduler = AsyncIOScheduler()
 
+# Plan jobs and batch narratives run in each API process by default; set to 0 and run job_worker.py to scale them separately
+JOB_WORKERS = int(os.getenv("RETIREMENT_JOB_WORKERS", 2))
+
+# With several server workers only the one holding this lock runs the news
+# scheduler and the first fetch.  The lock dies with its worker, so the
+# worker gunicorn starts in its place takes over.
+NEWS_SCHEDULER_LOCK = os.getenv("NEWS_SCHEDULER_LOCK", "data/news_scheduler.lock")
+
 
 
 
@@ -53,23 +65,74 @@ def fetch_with_retry(ticker, retries=3):
             else:
                 raise
 
+readiness.register("initial_news_fetch")
+
+def preload_shared_state():
+    """Load read-only models and the retrieval index before server workers fork.
+
+    Called in the gunicorn master (see gunicorn.conf.py).  Model weights and
+    the index become copy-on-write pages shared by every worker, and each
+    worker's background warm-up finds them already loaded.  ONNX Runtime
+    sessions own thread pools that do not survive fork, so with an ONNX
+    backend the MiniLM models are left to each worker.
+    """
+    initialize_app(warm_models=not INFERENCE_BACKEND.startswith("onnx"))
+    get_summarizer()
+
+def acquire_news_scheduler_lock():
+    """Return the held lock file if this process should fetch news, else None"""
+    os.makedirs(os.path.dirname(os.path.abspath(NEWS_SCHEDULER_LOCK)), exist_ok=True)
+    lock_file = open(NEWS_SCHEDULER_LOCK, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+async def warm_up_news():
+    """Load the summarizer, then run the first news fetch"""
+    try:
+        await asyncio.to_thread(get_summarizer)
+    except Exception as e:
+        logger.error(f"Error loading summarizer: {e}")
+    try:
+        # A failed fetch leaves initial_news_fetch in the error state; the scheduler retries hourly
+        with readiness.loading("initial_news_fetch"):
+            await news_fetcher.fetch_and_save_business_us()
+    except Exception as e:
+        logger.error(f"Error in initial news fetch: {e}")
+
 # FastAPI app with lifespan context
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting lifespan")
 
-    initialize_app()
-
-    scheduler.add_job(news_fetcher.fetch_and_save_business_us, 'interval', hours=1)
-    scheduler.start()
-    logger.info("Scheduler started")
-
-    await news_fetcher.fetch_and_save_business_us()
+    # Models, the retrieval index and the first news fetch load in the
+    # background so article and stock routes are served immediately
+    background_tasks = [asyncio.create_task(asyncio.to_thread(initialize_app))]
+    if JOB_WORKERS > 0:
+        background_tasks.append(asyncio.create_task(run_plan_job_worker(JOB_WORKERS)))
+
+    news_lock = acquire_news_scheduler_lock()
+    if news_lock:
+        background_tasks.append(asyncio.create_task(warm_up_news()))
+        scheduler.add_job(news_fetcher.fetch_and_save_business_us, 'interval', hours=1)
+        scheduler.start()
+        logger.info("Scheduler started")
+    else:
+        # Articles come from the shared database, kept fresh by another worker
+        readiness.mark("initial_news_fetch", "ready", fetched_by="another worker")
 
     yield
 
-    scheduler.shutdown()
-    logger.info("Scheduler shut down")
+    for task in background_tasks:
+        task.cancel()
+    if news_lock:
+        scheduler.shutdown()
+        news_lock.close()
+        logger.info("Scheduler shut down")
+    shutdown_worker_pools()
 
 
 app = FastAPI(title="News Digest API", lifespan=lifespan)
@@ -139,6 +202,21 @@ async def get_stock_data_with_cache(symbols: List[str]):
 # Mount routers
 app.include_router(retirement_router)
 
+@app.get("/api/memory")
+async def get_memory_usage():
+    """Report RSS/PSS of this worker, its sibling workers and their master, for node sizing"""
+    master_pid = int(os.getenv("GUNICORN_MASTER_PID", 0)) or None
+    return worker_memory_report(master_pid)
+
+@app.get("/api/ready")
+async def get_readiness():
+    """Report which subsystems have finished warming up; 503 until all are ready"""
+    ready = readiness.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "subsystems": readiness.snapshot()}
+    )
+
 # Endpoint to get articles with optional category and limit
 @app.get("/api/articles")
 async def get_articles(
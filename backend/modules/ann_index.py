@@ -0,0 +1,80 @@
+import math
+import numpy as np
+from typing import Any, Dict
+
+INDEX_TYPES = ("flat", "ivf", "hnsw", "sq8", "fp16")
+
+DEFAULT_INDEX_PARAMS = {
+    "ivf": {"nlist": None, "nprobe": 16},
+    "hnsw": {"m": 32, "ef_construction": 200, "ef_search": 128},
+}
+
+
+def _params(index_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    return {**DEFAULT_INDEX_PARAMS.get(index_type, {}), **{k: v for k, v in params.items() if v is not None}}
+
+
+def build_index(index_type: str, vectors: np.ndarray, dimension: int, **params):
+    """Build and fill a FAISS index of the given type.
+
+    - ``flat``: exact L2 search
+    - ``ivf``: inverted lists over a k-means coarse quantizer (``nlist``, ``nprobe``)
+    - ``hnsw``: navigable small-world graph (``m``, ``ef_construction``, ``ef_search``)
+    - ``sq8``: exact search over 8-bit scalar-quantized vectors
+    - ``fp16``: exact search over half-precision vectors (half the memory, near-identical ranking)
+    """
+    import faiss
+
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type: {index_type}")
+    params = _params(index_type, params)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, dimension)
+    n_vectors = vectors.shape[0]
+
+    if index_type == "ivf":
+        # Rule of thumb: about 4 * sqrt(n) lists, never more lists than vectors
+        nlist = params["nlist"] or int(4 * math.sqrt(max(n_vectors, 1)))
+        nlist = max(1, min(nlist, n_vectors))
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dimension), dimension, nlist)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, params["m"])
+        index.hnsw.efConstruction = params["ef_construction"]
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit)
+    elif index_type == "fp16":
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16)
+    else:
+        index = faiss.IndexFlatL2(dimension)
+
+    if not index.is_trained and n_vectors:
+        index.train(vectors)
+    if n_vectors:
+        index.add(vectors)
+    configure_search(index, **params)
+    return index
+
+
+def configure_search(index, nprobe=None, ef_search=None, **_):
+    """Apply query-time knobs to an index built or loaded from disk"""
+    if nprobe is not None and hasattr(index, "nprobe"):
+        index.nprobe = min(nprobe, index.nlist)
+    if ef_search is not None and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
+    return index
+
+
+def read_index(path: str, mmap: bool = False):
+    """Read an index from disk, memory-mapping its vector storage when requested.
+
+    Memory-mapped indexes are read-only and share pages across processes, so
+    large corpora do not have to fit in each worker's private memory.
+    """
+    import faiss
+
+    if mmap:
+        try:
+            return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            # Not every index type supports mmap; fall back to a regular load
+            pass
+    return faiss.read_index(path)
@@ -0,0 +1,134 @@
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+# Recent samples kept for the queue-wait and batch-size percentiles
+METRIC_WINDOW = 2048
+
+# Live batchers, reset together by one fork handler: handlers cannot be
+# unregistered, so one per instance would keep every batcher ever made alive
+_live_batchers: "weakref.WeakSet[InferenceBatcher]" = weakref.WeakSet()
+
+
+class InferenceBatcher:
+    """Coalesce small inference calls from many threads into one forward pass.
+
+    Callers block in ``submit`` while a single background thread collects
+    requests until ``max_batch_size`` items are queued or ``max_wait_ms`` has
+    passed since the first one arrived, runs ``fn`` once on the concatenated
+    items and hands each caller its slice of the outputs.  ``fn`` must map a
+    list of items to an equally long sequence of outputs.
+    """
+
+    def __init__(self, name: str, fn: Callable[[List[Any]], Sequence[Any]],
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.name = name
+        self.fn = fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._queue_waits = deque(maxlen=METRIC_WINDOW)
+        self._batch_sizes = deque(maxlen=METRIC_WINDOW)
+        self.batches = 0
+        self.items = 0
+        _live_batchers.add(self)
+
+    def _reset_after_fork(self):
+        # The batching thread does not survive fork, so a forked server worker starts its own
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+
+    def submit(self, items: Sequence[Any]) -> List[Any]:
+        """Outputs for ``items``, computed in a shared batch with concurrent callers"""
+        if not items:
+            return []
+        self._ensure_started()
+        future = Future()
+        self._queue.put((list(items), future, time.perf_counter()))
+        return future.result()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=f"{self.name}-batcher", daemon=True)
+                    self._thread.start()
+
+    def _collect(self):
+        requests = [self._queue.get()]
+        size = len(requests[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            requests.append(request)
+            size += len(request[0])
+        return requests
+
+    def _run(self):
+        while True:
+            requests = self._collect()
+            started = time.perf_counter()
+            items = [item for request_items, _, _ in requests for item in request_items]
+            try:
+                outputs = self.fn(items)
+            except Exception as e:
+                for _, future, _ in requests:
+                    future.set_exception(e)
+                continue
+            finally:
+                self._record(started, requests, len(items))
+
+            offset = 0
+            for request_items, future, _ in requests:
+                future.set_result(list(outputs[offset:offset + len(request_items)]))
+                offset += len(request_items)
+
+    def _record(self, started: float, requests, size: int):
+        with self._metrics_lock:
+            self.batches += 1
+            self.items += size
+            self._batch_sizes.append(size)
+            self._queue_waits.extend(started - enqueued for _, _, enqueued in requests)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            waits_ms = np.array(self._queue_waits) * 1000
+            sizes = np.array(self._batch_sizes)
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queued": self._queue.qsize(),
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": float(sizes.mean()) if sizes.size else 0.0,
+                "p99_batch_size": float(np.percentile(sizes, 99)) if sizes.size else 0.0,
+                "queue_wait_ms": {
+                    "mean": float(waits_ms.mean()) if waits_ms.size else 0.0,
+                    "p50": float(np.percentile(waits_ms, 50)) if waits_ms.size else 0.0,
+                    "p99": float(np.percentile(waits_ms, 99)) if waits_ms.size else 0.0
+                }
+            }
+
+
+def _reset_batchers_after_fork():
+    for batcher in list(_live_batchers):
+        batcher._reset_after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_batchers_after_fork)
@@ -0,0 +1,171 @@
+import json
+import numpy as np
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from modules.projection import DEFAULT_INFLATION_RATE, project_population
+
+WITHDRAWAL_STRATEGIES = ("fixed_real", "fixed_percentage", "spending_need")
+DEFAULT_HORIZON_AGE = 95
+DEFAULT_RETIREMENT_RETURN = 0.05
+DEFAULT_WITHDRAWAL_RATE = 0.04
+
+
+@lru_cache(maxsize=1)
+def load_decumulation_tables(path="data/retirement_data.json") -> Dict[str, Any]:
+    """Load RMD and Social Security tables as lookup arrays indexed by age"""
+    with open(path) as f:
+        data = json.load(f)
+    facts = data.get("retirement_facts", {})
+    tables = data.get("decumulation_tables", {})
+
+    # Divisor by age; ages before the table starts have no RMD (divisor inf)
+    rmd_divisors = np.full(121, np.inf)
+    for age, divisor in tables.get("rmd_uniform_lifetime_divisors", {}).items():
+        rmd_divisors[int(age)] = divisor
+    # Past the end of the table the last divisor keeps applying
+    last_age = max((int(age) for age in tables.get("rmd_uniform_lifetime_divisors", {})), default=120)
+    rmd_divisors[last_age:] = rmd_divisors[last_age]
+
+    claiming = {int(age): factor for age, factor in tables.get("social_security_claiming_adjustment", {}).items()}
+    claiming_adjustment = np.zeros(121)
+    if claiming:
+        ages = np.arange(121)
+        claiming_adjustment = np.interp(ages, sorted(claiming), [claiming[a] for a in sorted(claiming)])
+
+    return {
+        "rmd_start_age": facts.get("required_minimum_distributions", {}).get("start_age", 73),
+        "rmd_divisors": rmd_divisors,
+        "claiming_adjustment": claiming_adjustment,
+        "bend_points": tables.get("social_security_bend_points", {}),
+    }
+
+
+def estimate_social_security(income, claim_age, tables: Dict[str, Any]) -> np.ndarray:
+    """Rough annual benefit in today's dollars from current income, adjusted for claiming age"""
+    bend = tables["bend_points"]
+    if not bend:
+        return np.zeros(np.shape(income))
+
+    monthly = np.minimum(np.asarray(income, dtype=np.float64), bend["annual_wage_base"]) / 12
+    limits = np.array([0.0, *bend["monthly_bend_points"], np.inf])
+    brackets = np.clip(monthly[..., None] - limits[:-1], 0, np.diff(limits))
+    full_benefit = 12 * (brackets * np.asarray(bend["replacement_rates"])).sum(axis=-1)
+
+    claim_age = np.clip(np.asarray(claim_age, dtype=np.int64), 0, 120)
+    return full_benefit * tables["claiming_adjustment"][claim_age]
+
+
+def simulate_drawdown(balance, retirement_age, annual_spending=0.0, social_security=0.0, claim_age=67,
+                      horizon_age=DEFAULT_HORIZON_AGE, annual_return=DEFAULT_RETIREMENT_RETURN,
+                      inflation_rate=DEFAULT_INFLATION_RATE, strategy="fixed_real",
+                      withdrawal_rate=DEFAULT_WITHDRAWAL_RATE,
+                      tables: Optional[Dict[str, Any]] = None, include_paths: bool = False) -> Dict[str, np.ndarray]:
+    """Run the post-retirement drawdown for N users year by year.
+
+    Each step withdraws at the start of the year and grows the remainder,
+    with every user advanced together as array operations.  Strategies:
+
+    - ``fixed_real``: ``withdrawal_rate`` of the starting balance, raised with inflation
+    - ``fixed_percentage``: ``withdrawal_rate`` of the current balance
+    - ``spending_need``: annual spending (raised with inflation) less Social Security
+
+    RMDs set a floor on every strategy from the RMD start age.  Spending and
+    Social Security are given in dollars as of the retirement date.  Only
+    the running balances and summaries are kept unless ``include_paths`` is
+    set, which adds the N x horizon yearly paths and their ``mask``.
+    """
+    if strategy not in WITHDRAWAL_STRATEGIES:
+        raise ValueError(f"Unknown withdrawal strategy: {strategy}")
+    tables = tables or load_decumulation_tables()
+
+    balance = np.atleast_1d(np.asarray(balance, dtype=np.float64)).copy()
+    n_users = balance.shape[0]
+
+    def per_user(value, dtype=np.float64):
+        return np.broadcast_to(np.asarray(value, dtype=dtype), (n_users,))
+
+    retirement_age = per_user(retirement_age, np.int64)
+    horizon_age = per_user(horizon_age, np.int64)
+    annual_spending = per_user(annual_spending)
+    social_security = per_user(social_security)
+    claim_age = per_user(claim_age, np.int64)
+
+    years = np.maximum(horizon_age - retirement_age, 0)
+    horizon = int(years.max(initial=0))
+    initial_withdrawal = withdrawal_rate * balance
+
+    if include_paths:
+        paths = {name: np.zeros((n_users, horizon)) for name in ("balance", "withdrawal", "rmd", "social_security", "shortfall")}
+    # A portfolio is depleted from the first year it cannot fund the desired withdrawal
+    depleted = np.zeros(n_users, dtype=bool)
+    first_depleted = np.zeros(n_users, dtype=np.int64)
+    # Share of users whose portfolio is still funded t years into retirement
+    survival_curve = np.zeros(horizon)
+
+    for t in range(horizon):
+        age = retirement_age + t
+        active = age < horizon_age
+        price = (1.0 + inflation_rate) ** t
+
+        benefit = np.where(age >= claim_age, social_security * price, 0.0)
+
+        if strategy == "fixed_real":
+            desired = initial_withdrawal * price
+        elif strategy == "fixed_percentage":
+            desired = withdrawal_rate * balance
+        else:
+            desired = np.maximum(annual_spending * price - benefit, 0.0)
+
+        rmd = np.where(age >= tables["rmd_start_age"], balance / tables["rmd_divisors"][np.minimum(age, 120)], 0.0)
+        withdrawal = np.minimum(np.maximum(desired, rmd), balance)
+        shortfall = np.maximum(desired - withdrawal, 0.0)
+
+        balance = np.where(active, (balance - withdrawal) * (1.0 + annual_return), balance)
+
+        newly_depleted = active & (shortfall > 1e-6) & ~depleted
+        first_depleted[newly_depleted] = t
+        depleted |= newly_depleted
+        survival_curve[t] = (active & ~depleted).sum() / max(active.sum(), 1)
+
+        if include_paths:
+            for name, value in (("balance", balance), ("withdrawal", withdrawal), ("rmd", rmd),
+                                ("social_security", benefit), ("shortfall", shortfall)):
+                paths[name][:, t] = np.where(active, value, 0.0)
+
+    result = {
+        "depletion_age": np.where(depleted, retirement_age + first_depleted, -1),
+        "years_funded": np.where(depleted, first_depleted, years),
+        "survival_curve": survival_curve,
+    }
+    if include_paths:
+        result.update(paths, mask=np.arange(horizon)[None, :] < years[:, None])
+    return result
+
+
+def simulate_population_drawdown(user_inputs, strategy="fixed_real", withdrawal_rate=DEFAULT_WITHDRAWAL_RATE,
+                                 horizon_age=DEFAULT_HORIZON_AGE, annual_return=DEFAULT_RETIREMENT_RETURN,
+                                 inflation_rate=DEFAULT_INFLATION_RATE, claim_age=67,
+                                 include_paths: bool = False) -> Dict[str, np.ndarray]:
+    """Project each user to retirement, then run the drawdown for the whole batch"""
+    tables = load_decumulation_tables()
+    scores = project_population(user_inputs)
+
+    years_left = np.maximum(scores["years_left"], 0)
+    retirement_age = scores["age"] + years_left
+    # Spending and benefits are entered in today's dollars
+    to_retirement = (1.0 + inflation_rate) ** years_left
+    spending = np.array([u.get("spending") or 0 for u in user_inputs], dtype=np.float64) * to_retirement
+    benefit = estimate_social_security(scores["income"], claim_age, tables) * to_retirement
+
+    drawdown = simulate_drawdown(
+        scores["projected_savings"], retirement_age, spending, benefit, claim_age,
+        horizon_age=horizon_age, annual_return=annual_return, inflation_rate=inflation_rate,
+        strategy=strategy, withdrawal_rate=withdrawal_rate, tables=tables, include_paths=include_paths
+    )
+    return {
+        **drawdown,
+        "retirement_age": retirement_age,
+        "starting_balance": scores["projected_savings"],
+        "social_security_benefit": benefit,
+    }
@@ -0,0 +1,75 @@
+import base64
+import numpy as np
+from typing import Any, Dict
+
+CALCULATION_FORMATS = ("records", "columnar", "binary")
+CALCULATION_SERIES = ("contributions", "growth", "cumulative")
+
+
+def _decode_buffer(data: str, dtype) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=dtype)
+
+
+def _encode_buffer(values: np.ndarray, dtype) -> str:
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode("ascii")
+
+
+def calculations_to_arrays(calculations: Dict[str, Any]):
+    """Decode intermediate calculations in any supported format to NumPy columns.
+
+    Returns ``(years, series)`` where ``series`` maps each series name to an
+    array aligned with ``years``.
+    """
+    calc_format = calculations.get("format", "records")
+
+    if calc_format == "binary":
+        dtype = np.dtype(calculations["dtype"])
+        years = _decode_buffer(calculations["years"], calculations.get("year_dtype", "<i2")).astype(np.int64)
+        series = {name: _decode_buffer(calculations[name], dtype) for name in CALCULATION_SERIES}
+    elif calc_format == "columnar":
+        years = np.asarray(calculations["years"], dtype=np.int64)
+        series = {name: np.asarray(calculations[name], dtype=np.float64) for name in CALCULATION_SERIES}
+    else:
+        # Records: every series is a list of {"year", "amount"} dicts over the same years
+        cumulative = calculations.get("cumulative", [])
+        years = np.array([entry["year"] for entry in cumulative], dtype=np.int64)
+        series = {
+            name: np.array([entry["amount"] for entry in calculations.get(name, [])], dtype=np.float64)
+            for name in CALCULATION_SERIES
+        }
+
+    return years, series
+
+
+def encode_calculations(calculations: Dict[str, Any], calc_format: str = "records") -> Dict[str, Any]:
+    """Re-encode intermediate calculations as records, columnar arrays or float32 buffers"""
+    if calc_format not in CALCULATION_FORMATS:
+        raise ValueError(f"Unknown calculation format: {calc_format}")
+    if calculations.get("format", "records") == calc_format:
+        return calculations
+
+    years, series = calculations_to_arrays(calculations)
+
+    if calc_format == "records":
+        year_list = years.tolist()
+        return {
+            name: [{"year": year, "amount": amount} for year, amount in zip(year_list, series[name].tolist())]
+            for name in CALCULATION_SERIES
+        }
+
+    if calc_format == "columnar":
+        return {
+            "format": "columnar",
+            "years": years.tolist(),
+            **{name: series[name].tolist() for name in CALCULATION_SERIES}
+        }
+
+    # Base64 buffers: little-endian int16 years and float32 amounts
+    return {
+        "format": "binary",
+        "dtype": "<f4",
+        "year_dtype": "<i2",
+        "length": int(years.shape[0]),
+        "years": _encode_buffer(years, "<i2"),
+        **{name: _encode_buffer(series[name], "<f4") for name in CALCULATION_SERIES}
+    }
@@ -0,0 +1,145 @@
+import numpy as np
+from typing import Any, Dict, Optional, Sequence
+
+from modules.projection import DEFAULT_ANNUAL_RETURN
+
+INVESTMENT_ACCOUNTS = ("401k", "ira", "taxable")
+
+# Per-account contribution schedule and growth, in INVESTMENT_ACCOUNTS order
+DEFAULT_ACCOUNT_ASSUMPTIONS = {
+    "401k": {"contribution_rate": 0.10, "annual_limit": 23000.0, "catch_up": 7500.0, "annual_return": DEFAULT_ANNUAL_RETURN},
+    "ira": {"contribution_rate": 0.05, "annual_limit": 7000.0, "catch_up": 1000.0, "annual_return": DEFAULT_ANNUAL_RETURN},
+    "taxable": {"contribution_rate": 0.05, "annual_limit": np.inf, "catch_up": 0.0, "annual_return": 0.06},
+}
+CATCH_UP_AGE = 50
+DEFAULT_INCOME_GROWTH = 0.03
+DEFAULT_EMPLOYER_MATCH_RATE = 0.5
+DEFAULT_EMPLOYER_MATCH_CAP = 0.06
+DEFAULT_MORTGAGE_RATE = 0.065
+DEFAULT_HOME_APPRECIATION = 0.03
+
+
+def _household_inputs(user_inputs: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    def column(field, dtype=np.float64, when=None):
+        return np.array([
+            (u.get(field) or 0) if when is None or u.get(when, "no") == "yes" else 0
+            for u in user_inputs
+        ], dtype=dtype)
+
+    return {
+        "age": column("age", np.int64),
+        "retirement_age": column("retirementAge", np.int64),
+        "income": column("income"),
+        "current_savings": column("currentSavings"),
+        "investment_amount": column("investmentAmount", when="hasInvestment"),
+        "assets": column("assets"),
+        "mortgage_amount": column("mortgageAmount", when="hasMortgage"),
+        "mortgage_term": column("mortgageTerm", np.int64, when="hasMortgage"),
+        "down_payment": column("downPayment", when="hasMortgage"),
+    }
+
+
+def mortgage_balance(principal, term_years, mortgage_rate, years):
+    """Remaining mortgage balance after `years` of level annual payments"""
+    principal = np.asarray(principal, dtype=np.float64)
+    term_years = np.asarray(term_years, dtype=np.float64)
+    years = np.minimum(np.asarray(years, dtype=np.float64), term_years)
+
+    growth = (1.0 + mortgage_rate) ** years
+    if mortgage_rate == 0:
+        payment = np.divide(principal, term_years, out=np.zeros(np.broadcast(principal, term_years).shape), where=term_years > 0)
+        return np.maximum(principal - payment * years, 0.0)
+    payment = np.divide(
+        principal * mortgage_rate,
+        1.0 - (1.0 + mortgage_rate) ** -term_years,
+        out=np.zeros(np.broadcast(principal, term_years).shape),
+        where=term_years > 0,
+    )
+    remaining = principal * growth - payment * (growth - 1.0) / mortgage_rate
+    return np.where(term_years > 0, np.maximum(remaining, 0.0), principal)
+
+
+def project_household(user_inputs: Sequence[Dict[str, Any]],
+                      accounts: Optional[Dict[str, Dict[str, float]]] = None,
+                      income_growth: float = DEFAULT_INCOME_GROWTH,
+                      employer_match_rate: float = DEFAULT_EMPLOYER_MATCH_RATE,
+                      employer_match_cap: float = DEFAULT_EMPLOYER_MATCH_CAP,
+                      mortgage_rate: float = DEFAULT_MORTGAGE_RATE,
+                      home_appreciation: float = DEFAULT_HOME_APPRECIATION,
+                      include_paths: bool = False) -> Dict[str, Any]:
+    """Project 401(k), IRA, taxable and home-equity balances to retirement.
+
+    Investment accounts are held as an (N, accounts) array, so each year of
+    the loop advances every account of every user in one step.  Current
+    savings seed the 401(k), ``investmentAmount`` seeds the taxable account,
+    and home equity follows the amortization of ``mortgageAmount`` over
+    ``mortgageTerm`` plus appreciation of the home.  The yearly ``paths`` and
+    ``home_equity_path`` are only built when ``include_paths`` is set.
+    """
+    assumptions = {name: {**DEFAULT_ACCOUNT_ASSUMPTIONS[name], **(accounts or {}).get(name, {})} for name in INVESTMENT_ACCOUNTS}
+
+    def account_vector(field):
+        return np.array([assumptions[name][field] for name in INVESTMENT_ACCOUNTS], dtype=np.float64)
+
+    rates = account_vector("contribution_rate")
+    limits = account_vector("annual_limit")
+    catch_up = account_vector("catch_up")
+    returns = account_vector("annual_return")
+    match_index = INVESTMENT_ACCOUNTS.index("401k")
+    employer = np.array([name == "401k" for name in INVESTMENT_ACCOUNTS], dtype=np.float64)
+
+    inputs = _household_inputs(user_inputs)
+    n_users = len(user_inputs)
+    years_left = np.maximum(inputs["retirement_age"] - inputs["age"], 0)
+    horizon = int(years_left.max(initial=0))
+
+    balances = np.zeros((n_users, len(INVESTMENT_ACCOUNTS)))
+    balances[:, INVESTMENT_ACCOUNTS.index("401k")] = inputs["current_savings"]
+    balances[:, INVESTMENT_ACCOUNTS.index("taxable")] = inputs["investment_amount"]
+
+    if include_paths:
+        paths = np.zeros((n_users, len(INVESTMENT_ACCOUNTS), horizon))
+    employee_totals = np.zeros_like(balances)
+    employer_totals = np.zeros_like(balances)
+
+    for t in range(horizon):
+        active = (t < years_left)[:, None]
+        income = inputs["income"] * (1.0 + income_growth) ** t
+        age = inputs["age"] + t
+
+        cap = limits[None, :] + np.where(age[:, None] >= CATCH_UP_AGE, catch_up[None, :], 0.0)
+        contributions = np.minimum(income[:, None] * rates[None, :], cap)
+        # Employer matches employee 401(k) dollars up to a share of pay
+        matched = np.minimum(contributions[:, match_index], income * employer_match_cap)
+        match = employer[None, :] * (employer_match_rate * matched)[:, None]
+
+        balances = np.where(active, balances * (1.0 + returns) + contributions + match, balances)
+        employee_totals += np.where(active, contributions, 0.0)
+        employer_totals += np.where(active, match, 0.0)
+        if include_paths:
+            paths[:, :, t] = np.where(active, balances, 0.0)
+
+    home_value = inputs["mortgage_amount"] + inputs["down_payment"]
+    remaining_mortgage = mortgage_balance(inputs["mortgage_amount"], inputs["mortgage_term"], mortgage_rate, years_left)
+    home_equity = home_value * (1.0 + home_appreciation) ** years_left - remaining_mortgage
+
+    result = {
+        "accounts": INVESTMENT_ACCOUNTS,
+        "years_left": years_left,
+        "balances": balances,
+        "employee_contributions": employee_totals,
+        "employer_contributions": employer_totals,
+        "home_equity": home_equity,
+        "remaining_mortgage": remaining_mortgage,
+        "net_worth": balances.sum(axis=1) + home_equity + inputs["assets"],
+    }
+    if include_paths:
+        # Home equity path by year, for charting next to the investment accounts
+        steps = np.arange(1, horizon + 1)
+        equity_path = (
+            home_value[:, None] * (1.0 + home_appreciation) ** steps[None, :]
+            - mortgage_balance(inputs["mortgage_amount"][:, None], inputs["mortgage_term"][:, None], mortgage_rate, steps[None, :])
+        )
+        result["paths"] = paths
+        result["home_equity_path"] = np.where(steps[None, :] <= years_left[:, None], equity_path, 0.0)
+    return result
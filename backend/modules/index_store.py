@@ -0,0 +1,89 @@
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+from modules.ann_index import read_index
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+INDEX_FILE = "index.faiss"
+VECTORS_FILE = "embeddings.npz"
+CHUNKS_FILE = "chunks.json"
+
+
+def content_hash(*parts: Any) -> str:
+    """Stable SHA-256 over strings and JSON-serializable settings"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True)
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _atomic_write(path: str, write):
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_index_artifacts(cache_dir: str, cache_key: str, mmap: bool = False) -> Optional[Dict[str, Any]]:
+    """Load a persisted index if it was built from the same content and settings"""
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        if manifest.get("cache_key") != cache_key:
+            return None
+        with open(os.path.join(cache_dir, CHUNKS_FILE), encoding="utf-8") as f:
+            chunks = json.load(f)
+        index = read_index(os.path.join(cache_dir, INDEX_FILE), mmap=mmap)
+        return {"index": index, "chunks": chunks}
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable index cache in {cache_dir}: {e}")
+        return None
+
+
+def load_cached_vectors(cache_dir: str) -> Dict[str, np.ndarray]:
+    """Previously computed embeddings keyed by chunk content hash"""
+    try:
+        with np.load(os.path.join(cache_dir, VECTORS_FILE)) as data:
+            return dict(zip(data["chunk_hashes"].tolist(), data["vectors"]))
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable embedding cache in {cache_dir}: {e}")
+        return {}
+
+
+def save_index_artifacts(cache_dir: str, cache_key: str, index, vectors: np.ndarray,
+                         chunk_hashes: List[str], chunks: List[Dict[str, Any]]):
+    """Persist the index, its vectors and chunk store; the manifest is written last"""
+    import faiss
+
+    def write_vectors(path):
+        with open(path, "wb") as f:
+            np.savez(f, chunk_hashes=np.array(chunk_hashes), vectors=vectors)
+
+    def write_chunks(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(chunks, f)
+
+    def write_manifest(path):
+        with open(path, "w") as f:
+            json.dump({"cache_key": cache_key, "chunk_count": len(chunks), "dimension": int(index.d)}, f)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _atomic_write(os.path.join(cache_dir, VECTORS_FILE), write_vectors)
+        _atomic_write(os.path.join(cache_dir, CHUNKS_FILE), write_chunks)
+        _atomic_write(os.path.join(cache_dir, INDEX_FILE), lambda path: faiss.write_index(index, path))
+        _atomic_write(os.path.join(cache_dir, MANIFEST_FILE), write_manifest)
+    except Exception as e:
+        logger.error(f"Error saving index cache to {cache_dir}: {e}")
@@ -0,0 +1,101 @@
+import logging
+import os
+import platform
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# torch: full-precision PyTorch (the reference path)
+# torch-int8: PyTorch with dynamically int8-quantized Linear layers
+# onnx: ONNX Runtime with the exported fp32 graph
+# onnx-int8: ONNX Runtime with the int8-quantized graph published for the model
+INFERENCE_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+def quantized_onnx_file() -> str:
+    """Pick the int8 ONNX export matching this CPU's vector instructions"""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        flags = ""
+    if "avx512_vnni" in flags:
+        return "onnx/model_qint8_avx512_vnni.onnx"
+    if "avx512f" in flags:
+        return "onnx/model_qint8_avx512.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+
+def configure_threads(threads: Optional[int]):
+    """Pin PyTorch intra-op parallelism; ONNX sessions get the same count via session options"""
+    if not threads:
+        return
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except ImportError:
+        pass
+    except RuntimeError:
+        # Inter-op threads can only be set before the first parallel op runs
+        pass
+
+
+def _onnx_model_kwargs(backend: str, threads: Optional[int]) -> Dict[str, Any]:
+    model_kwargs: Dict[str, Any] = {"provider": "CPUExecutionProvider"}
+    if backend == "onnx-int8":
+        model_kwargs["file_name"] = os.getenv("RETIREMENT_ONNX_FILE") or quantized_onnx_file()
+    if threads:
+        import onnxruntime
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = threads
+        session_options.inter_op_num_threads = 1
+        model_kwargs["session_options"] = session_options
+    return model_kwargs
+
+
+def _quantize_linear_layers(module):
+    import torch
+    return torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load(model_class, model_name: str, backend: str, threads: Optional[int], quantize):
+    if backend not in INFERENCE_BACKENDS:
+        logger.warning(f"Unknown inference backend {backend!r}, falling back to torch")
+        backend = "torch"
+    configure_threads(threads)
+
+    if backend.startswith("onnx"):
+        try:
+            return model_class(model_name, backend="onnx", model_kwargs=_onnx_model_kwargs(backend, threads))
+        except Exception as e:
+            # Missing onnxruntime/optimum or no published export for this model
+            logger.warning(f"ONNX backend unavailable for {model_name} ({e}), falling back to torch")
+            backend = "torch"
+
+    model = model_class(model_name)
+    if backend == "torch-int8":
+        quantize(model)
+    return model
+
+
+def load_embedding_model(model_name: str, backend: str = "torch", threads: Optional[int] = None):
+    """SentenceTransformer on the requested inference backend"""
+    from sentence_transformers import SentenceTransformer
+
+    def quantize(model):
+        model[0].auto_model = _quantize_linear_layers(model[0].auto_model)
+
+    return _load(SentenceTransformer, model_name, backend, threads, quantize)
+
+
+def load_cross_encoder(model_name: str, backend: str = "torch", threads: Optional[int] = None):
+    """CrossEncoder on the requested inference backend"""
+    from sentence_transformers import CrossEncoder
+
+    def quantize(model):
+        model.model = _quantize_linear_layers(model.model)
+
+    return _load(CrossEncoder, model_name, backend, threads, quantize)
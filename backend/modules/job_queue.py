@@ -0,0 +1,245 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from modules.workers import PoolSaturated
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+# SQLite limits the number of bound parameters per statement
+_MAX_BATCH_IDS = 500
+
+
+class RetryJob(Exception):
+    """Raised by a handler to put its job back on the queue, e.g. when a downstream pool is saturated"""
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class JobStore:
+    """Persistent FIFO job queue in a local SQLite file.
+
+    Jobs survive restarts, and any number of worker processes on the host
+    can share the file: ``claim`` atomically leases the oldest queued job to
+    one worker.  A job whose worker dies is picked up again once its lease
+    expires, up to ``max_attempts`` tries, then marked failed.  ``submit``
+    raises ``PoolSaturated`` (429) once ``max_queued`` jobs are waiting.
+    """
+
+    def __init__(self, path: str, max_queued: int = 1000, lease_seconds: float = 600, max_attempts: int = 3):
+        self.path = path
+        self.max_queued = max_queued
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._schema_ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        """Queue a job and return its ID"""
+        return self.submit_many([payload])[0]
+
+    def submit_many(self, payloads: List[Dict[str, Any]]) -> List[str]:
+        """Queue several jobs in one transaction, all or none, and return their IDs in order"""
+        job_ids = [str(uuid.uuid4()) for _ in payloads]
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued + len(payloads) > self.max_queued:
+                conn.execute("ROLLBACK")
+                raise PoolSaturated("jobs", 429, retry_after=5)
+            conn.executemany(
+                "INSERT INTO jobs (id, status, payload, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+                [(job_id, json.dumps(payload), now, now) for job_id, payload in zip(job_ids, payloads)]
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return job_ids
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._to_dict(row) if row else None
+
+    def statuses(self, job_ids: List[str]) -> Dict[str, str]:
+        """Status of each job that exists among ``job_ids``"""
+        found = {}
+        conn = self._connect()
+        try:
+            for start in range(0, len(job_ids), _MAX_BATCH_IDS):
+                chunk = job_ids[start:start + _MAX_BATCH_IDS]
+                found.update(conn.execute(
+                    f"SELECT id, status FROM jobs WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+        finally:
+            conn.close()
+        return found
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Lease the oldest runnable job to ``worker``, or None if there is nothing to do"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' AND lease_expires < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                if row["attempts"] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, worker = NULL, updated_at = ? WHERE id = ?",
+                        (f"Abandoned after {row['attempts']} attempts", now, row["id"])
+                    )
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, lease_expires = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (worker, now + self.lease_seconds, now, row["id"])
+                )
+                conn.execute("COMMIT")
+                return self._to_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _finish(self, job_id: str, worker: str, status: str, result: Any = None, error: Optional[str] = None) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, worker = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id, worker)
+            )
+        finally:
+            conn.close()
+        # False if the lease expired and another worker took the job over
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker: str, result: Any) -> bool:
+        return self._finish(job_id, worker, "succeeded", result=result)
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        return self._finish(job_id, worker, "failed", error=error)
+
+    def release(self, job_id: str, worker: str) -> bool:
+        """Put a job back on the queue without counting the attempt, e.g. when its worker shuts down"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = attempts - 1, worker = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), job_id, worker)
+            )
+        finally:
+            conn.close()
+        return cursor.rowcount == 1
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        try:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        finally:
+            conn.close()
+        return {
+            **{status: counts.get(status, 0) for status in JOB_STATUSES},
+            "max_queued": self.max_queued,
+            "lease_seconds": self.lease_seconds
+        }
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def run_worker(store: JobStore, handler: Callable[[Dict[str, Any]], Awaitable[Any]],
+                     concurrency: int = 1, poll_interval: float = 0.5,
+                     stop: Optional[asyncio.Event] = None):
+    """Process jobs from ``store`` with ``concurrency`` concurrent handlers until ``stop`` is set.
+
+    Cancelling the worker puts any job it is running back on the queue.
+    """
+    stop = stop or asyncio.Event()
+
+    async def loop():
+        worker = worker_name()
+        while not stop.is_set():
+            job = await asyncio.to_thread(store.claim, worker)
+            if job is None:
+                try:
+                    await asyncio.wait_for(stop.wait(), poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                result = await handler(job["payload"])
+            except asyncio.CancelledError:
+                store.release(job["id"], worker)
+                raise
+            except RetryJob as e:
+                logger.warning(f"Job {job['id']} requeued: {e}")
+                await asyncio.to_thread(store.release, job["id"], worker)
+                try:
+                    await asyncio.wait_for(stop.wait(), poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            except Exception as e:
+                logger.error(f"Job {job['id']} failed: {e}")
+                await asyncio.to_thread(store.fail, job["id"], worker, str(e))
+            else:
+                await asyncio.to_thread(store.complete, job["id"], worker, result)
+
+    await asyncio.gather(*(loop() for _ in range(max(1, concurrency))))
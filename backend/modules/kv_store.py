@@ -0,0 +1,221 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    secondary_key TEXT,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_secondary ON entries (secondary_key);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# SQLite limits the number of bound parameters per statement
+_MAX_BATCH_KEYS = 500
+
+
+class KVStore:
+    """JSON values in a local SQLite file, with TTL and size-bounded LRU eviction.
+
+    Lookups go through the primary key index and each write is its own
+    transaction, so concurrent threads and worker processes see whole
+    entries.  Entries older than ``ttl_seconds`` (by creation) are treated as
+    missing; once a write takes the store past ``max_entries`` they are
+    purged, then the least recently read entries are evicted.  A read only
+    refreshes an entry's LRU position when it was last refreshed more than
+    ``touch_interval`` seconds ago (a tenth of the TTL, or a minute), so
+    repeated reads of hot entries do not each take the write lock.  An
+    optional ``secondary_key`` per entry (e.g. a plan ID) is indexed for
+    ``get_by_secondary``.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: Optional[float] = None,
+                 touch_interval: Optional[float] = None):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds or None
+        if touch_interval is None:
+            touch_interval = self.ttl_seconds / 10 if self.ttl_seconds else 60.0
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._schema_ready = False
+        self._stats_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._schema_ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def _min_created(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else float("-inf")
+
+    def _record(self, hits: int, misses: int = 0, evictions: int = 0):
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Values of the live entries among ``keys``; reading them refreshes their LRU position"""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        conn = self._connect()
+        try:
+            for start in range(0, len(keys), _MAX_BATCH_KEYS):
+                chunk = keys[start:start + _MAX_BATCH_KEYS]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, value, accessed_at FROM entries WHERE key IN ({marks}) AND created_at >= ?",
+                    (*chunk, self._min_created())
+                ).fetchall()
+                now = time.time()
+                stale = [key for key, _, accessed_at in rows if accessed_at < now - self.touch_interval]
+                if stale:
+                    conn.execute(
+                        f"UPDATE entries SET accessed_at = ? WHERE key IN ({','.join('?' * len(stale))})",
+                        (now, *stale)
+                    )
+                found.update((key, json.loads(value)) for key, value, _ in rows)
+        finally:
+            conn.close()
+        self._record(len(found), len(keys) - len(found))
+        return found
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_by_secondary(self, secondary_key: str) -> Optional[Any]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE secondary_key = ? AND created_at >= ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (secondary_key, self._min_created())
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, value: Any, secondary_key: Optional[str] = None):
+        """Insert or replace an entry, evicting expired and least recently used entries if the store is full"""
+        self.put_many({key: value}, secondary_key)
+
+    def put_many(self, entries: Dict[str, Any], secondary_key: Optional[str] = None):
+        """Insert or replace several entries sharing a secondary key in one transaction"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, secondary_key, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(key, json.dumps(value), secondary_key, now, now) for key, value in entries.items()]
+            )
+            evicted = 0
+            if conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] > self.max_entries:
+                evicted = conn.execute("DELETE FROM entries WHERE created_at < ?", (self._min_created(),)).rowcount
+                evicted += conn.execute(
+                    "DELETE FROM entries WHERE key IN ("
+                    "SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        if evicted:
+            self._record(0, evictions=evicted)
+
+    def delete(self, key: str, secondary_key: Optional[str] = None) -> bool:
+        """Remove an entry; with ``secondary_key``, only if it still has that secondary key"""
+        conn = self._connect()
+        try:
+            if secondary_key is None:
+                cursor = conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            else:
+                cursor = conn.execute("DELETE FROM entries WHERE key = ? AND secondary_key = ?", (key, secondary_key))
+        finally:
+            conn.close()
+        return cursor.rowcount == 1
+
+    def import_json(self, json_path: str, secondary_field: Optional[str] = None) -> int:
+        """Copy a legacy ``{key: value}`` JSON cache into the store, once per file.
+
+        Existing entries win over imported ones.  Returns how many were imported.
+        """
+        marker = f"imported:{os.path.abspath(json_path)}"
+        if not os.path.exists(json_path):
+            return 0
+        conn = self._connect()
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE name = ?", (marker,)).fetchone():
+                return 0
+            try:
+                with open(json_path) as f:
+                    legacy = json.load(f)
+            except Exception as e:
+                logger.error(f"Error reading {json_path} for import: {e}")
+                return 0
+
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            imported = 0
+            for key, value in legacy.items():
+                secondary = value.get(secondary_field) if secondary_field and isinstance(value, dict) else None
+                imported += conn.execute(
+                    "INSERT OR IGNORE INTO entries (key, value, secondary_key, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(value), secondary, now, now)
+                ).rowcount
+            conn.execute("INSERT INTO meta (name, value) VALUES (?, ?)", (marker, str(now)))
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        logger.info(f"Imported {imported} entries from {json_path}")
+        return imported
+
+    def __len__(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM entries WHERE created_at >= ?", (self._min_created(),)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        entries = len(self)
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,127 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Sequence, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\([a-z0-9]+\))?")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have how i in is it its my of on or our
+should that the their this to was what when which who will with you your year old
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords; ``401(k)`` stays one token"""
+    tokens = TOKEN_PATTERN.findall(str(text).lower().replace("_", " "))
+    return [token for token in tokens if token not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> List[int]:
+    """Fuse ranked ID lists; each appearance contributes 1 / (k + rank)"""
+    scores: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] += 1.0 / (k + rank)
+    return sorted(scores, key=lambda item: scores[item], reverse=True)
+
+
+class FactIndex:
+    """Inverted index from terms to paths in the structured retirement facts.
+
+    Terms come from both key names and leaf values, so a query matches a
+    fact whether it names the section or something the fact says.
+    """
+
+    def __init__(self, facts: Dict[str, Any]):
+        self.entries: List[Tuple[str, Any]] = []
+        self.postings: Dict[str, set] = defaultdict(set)
+        self._parents: Dict[int, int] = {}
+        self._add(facts, "", None)
+
+    def _add(self, facts: Dict[str, Any], path: str, parent):
+        for key, value in facts.items():
+            name = key.replace("_", " ").lower()
+            current_path = f"{path}.{name}" if path else name
+            entry_id = len(self.entries)
+            self.entries.append((current_path, flatten_fact(value) if isinstance(value, dict) else str(value)))
+            self._parents[entry_id] = parent
+
+            for term in tokenize(name):
+                self.postings[term].add(entry_id)
+            if isinstance(value, dict):
+                self._add(value, current_path, entry_id)
+            else:
+                for term in tokenize(value):
+                    self.postings[term].add(entry_id)
+
+    def _has_matched_ancestor(self, entry_id: int, matched) -> bool:
+        parent = self._parents[entry_id]
+        while parent is not None:
+            if parent in matched:
+                return True
+            parent = self._parents[parent]
+        return False
+
+    def search(self, query: str, max_results: int = 10) -> List[Tuple[str, Any]]:
+        """Facts matching any query term, most matched terms first.
+
+        Children of a matched section are omitted because the section's
+        flattened value already includes them.
+        """
+        hits = Counter()
+        for term in set(tokenize(query)):
+            hits.update(self.postings.get(term, ()))
+
+        matched = set(hits)
+        results = [entry_id for entry_id in matched if not self._has_matched_ancestor(entry_id, matched)]
+        results.sort(key=lambda entry_id: (-hits[entry_id], entry_id))
+        return [self.entries[entry_id] for entry_id in results[:max_results]]
+
+
+def flatten_fact(d: Dict[str, Any]) -> List[str]:
+    """Flatten a nested fact section into indented display lines"""
+    result = []
+    for k, v in d.items():
+        key = k.replace("_", " ")
+        if isinstance(v, dict):
+            result.append(f"{key}:")
+            result.extend([f"  {x}" for x in flatten_fact(v)])
+        else:
+            result.append(f"{key}: {v}")
+    return result
+
+
+class BM25Index:
+    """Okapi BM25 over text chunks, with postings precomputed at build time"""
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.n_documents = len(documents)
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+        lengths = []
+        for doc_id, document in enumerate(documents):
+            counts = Counter(tokenize(document))
+            lengths.append(sum(counts.values()))
+            for term, count in counts.items():
+                self.postings[term].append((doc_id, count))
+
+        self.lengths = lengths
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0.0
+        self.idf = {
+            term: math.log(1 + (self.n_documents - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def search(self, query: str, k: int = 8) -> List[Tuple[int, float]]:
+        """Top-k (document ID, score) pairs for the query"""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, count in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / (self.average_length or 1))
+                scores[doc_id] += idf * count * (self.k1 + 1) / (count + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from modules.workers import PoolSaturated
+
+logger = logging.getLogger(__name__)
+
+# Live clients, reset together by one fork handler: handlers cannot be
+# unregistered, so one per instance would keep every client ever made alive
+_live_clients: "weakref.WeakSet[LLMClient]" = weakref.WeakSet()
+
+
+class LLMDeadlineExceeded(Exception):
+    """The request deadline passed before the model produced a complete answer"""
+
+
+def chat_messages(system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def _content(chunk) -> str:
+    return chunk["message"]["content"] or ""
+
+
+class LLMClient:
+    """Shared async Ollama client with bounded, fair concurrency and deadlines.
+
+    One ``ollama.AsyncClient`` (and so one keep-alive HTTP connection pool) is
+    reused for every request.  At most ``max_concurrency`` generations run on
+    the model server at once; further requests wait in FIFO order, and once
+    ``max_queue`` are waiting new ones are rejected with ``PoolSaturated``.
+    Every call takes an absolute ``deadline`` on the ``time.monotonic`` clock:
+    queueing, retries and backoff all count against it, and running out
+    raises ``LLMDeadlineExceeded``.  Cancelling the awaiting task (e.g. on
+    client disconnect) closes the HTTP stream, which stops the generation.
+    """
+
+    def __init__(self, model: str, host: Optional[str] = None, max_concurrency: int = 2, max_queue: int = 32,
+                 max_retries: int = 2, backoff: float = 0.5, keep_alive: Optional[str] = None,
+                 client_factory: Optional[Callable[[], Any]] = None):
+        self.model = model
+        self.host = host
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.keep_alive = keep_alive
+        self._client_factory = client_factory
+        self._client = None
+        self._semaphore = None
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.deadline_exceeded = 0
+        self.rejected = 0
+        _live_clients.add(self)
+
+    def _reset_after_fork(self):
+        # The HTTP client and semaphore belong to the parent's event loop, so a forked worker makes its own
+        self._client = None
+        self._semaphore = None
+        self.running = 0
+        self.waiting = 0
+
+    def _get_client(self):
+        if self._client is None:
+            if self._client_factory is not None:
+                self._client = self._client_factory()
+            else:
+                import ollama
+                self._client = ollama.AsyncClient(host=self.host)
+        return self._client
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMDeadlineExceeded("Deadline passed before the model finished")
+        return remaining
+
+    @asynccontextmanager
+    async def _slot(self, deadline: Optional[float]):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.waiting >= self.max_queue and self._semaphore.locked():
+            self.rejected += 1
+            raise PoolSaturated("llm", 429)
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self._remaining(deadline))
+        except asyncio.TimeoutError:
+            raise LLMDeadlineExceeded("Deadline passed while waiting for a model slot")
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            yield
+        except LLMDeadlineExceeded:
+            self.deadline_exceeded += 1
+            raise
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        else:
+            self.completed += 1
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    async def _with_retries(self, request: Callable, deadline: Optional[float]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await asyncio.wait_for(request(), self._remaining(deadline))
+            except asyncio.TimeoutError:
+                raise LLMDeadlineExceeded("Deadline passed during generation")
+            except LLMDeadlineExceeded:
+                raise
+            except Exception as e:
+                logger.error(f"Ollama call failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
+                if attempt == self.max_retries:
+                    raise Exception(f"Failed to generate response after {self.max_retries + 1} attempts: {e}")
+                delay = self.backoff * 2 ** attempt
+                remaining = self._remaining(deadline)
+                if remaining is not None and delay >= remaining:
+                    raise LLMDeadlineExceeded("No time left to retry before the deadline")
+                await asyncio.sleep(delay)
+
+    async def chat(self, system_prompt: str, user_prompt: str, deadline: Optional[float] = None) -> str:
+        """Complete narrative for the prompts"""
+        async with self._slot(deadline):
+            response = await self._with_retries(
+                lambda: self._get_client().chat(
+                    model=self.model,
+                    messages=chat_messages(system_prompt, user_prompt),
+                    keep_alive=self.keep_alive
+                ),
+                deadline
+            )
+            return _content(response)
+
+    async def stream(self, system_prompt: str, user_prompt: str, deadline: Optional[float] = None) -> AsyncIterator[str]:
+        """Narrative text as it is generated; only opening the stream is retried"""
+        async with self._slot(deadline):
+            stream = await self._with_retries(
+                lambda: self._get_client().chat(
+                    model=self.model,
+                    messages=chat_messages(system_prompt, user_prompt),
+                    stream=True,
+                    keep_alive=self.keep_alive
+                ),
+                deadline
+            )
+            iterator = stream.__aiter__()
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(iterator.__anext__(), self._remaining(deadline))
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        raise LLMDeadlineExceeded("Deadline passed during generation")
+                    text = _content(chunk)
+                    if text:
+                        yield text
+            finally:
+                aclose = getattr(iterator, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "deadline_exceeded": self.deadline_exceeded,
+            "rejected": self.rejected
+        }
+
+
+def _reset_clients_after_fork():
+    for client in list(_live_clients):
+        client._reset_after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_clients_after_fork)
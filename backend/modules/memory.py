@@ -0,0 +1,66 @@
+import os
+from typing import Any, Dict, List, Optional
+
+# smaps_rollup fields, in kB, that split resident memory into shared and private pages
+_ROLLUP_FIELDS = {
+    "Rss": "rss_mb",
+    "Pss": "pss_mb",
+    "Shared_Clean": "shared_clean_mb",
+    "Shared_Dirty": "shared_dirty_mb",
+    "Private_Clean": "private_clean_mb",
+    "Private_Dirty": "private_dirty_mb",
+}
+
+
+def process_memory(pid: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Resident memory of a process in MB, split into shared and private pages.
+
+    PSS divides each shared page among the processes mapping it, so summing
+    PSS over the master and workers gives the node's real footprint, while
+    private_dirty is what each additional worker costs.  Returns None when
+    the process is gone or /proc is unavailable (non-Linux).
+    """
+    pid = pid or os.getpid()
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    usage: Dict[str, Any] = {"pid": pid}
+    for line in lines:
+        parts = line.split()
+        field = parts[0].rstrip(":") if parts else ""
+        if field in _ROLLUP_FIELDS:
+            usage[_ROLLUP_FIELDS[field]] = round(int(parts[1]) / 1024, 1)
+    usage["private_mb"] = round(usage.get("private_clean_mb", 0) + usage.get("private_dirty_mb", 0), 1)
+    usage["shared_mb"] = round(usage.get("shared_clean_mb", 0) + usage.get("shared_dirty_mb", 0), 1)
+    return usage
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of a process, e.g. the workers of a gunicorn master"""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def worker_memory_report(master_pid: Optional[int] = None) -> Dict[str, Any]:
+    """Memory of this worker, its sibling workers and their master process.
+
+    Without a master PID (a single-process server) only this process is reported.
+    """
+    workers = [usage for usage in map(process_memory, child_pids(master_pid)) if usage] if master_pid else []
+    master = process_memory(master_pid) if workers else None
+    if not workers:
+        workers = [usage for usage in [process_memory()] if usage]
+    processes = workers + ([master] if master else [])
+    return {
+        "worker_pid": os.getpid(),
+        "master": master,
+        "workers": workers,
+        "total_pss_mb": round(sum(usage.get("pss_mb", 0) for usage in processes), 1),
+        "total_rss_mb": round(sum(usage.get("rss_mb", 0) for usage in processes), 1)
+    }
@@ -0,0 +1,117 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from modules.projection import DEFAULT_ANNUAL_RETURN, DEFAULT_CONTRIBUTION_RATE, DEFAULT_INFLATION_RATE
+
+DEFAULT_RETURN_VOLATILITY = 0.15
+DEFAULT_INFLATION_VOLATILITY = 0.01
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Paths are always drawn in fixed-size chunks with spawned seeds, so a given
+# seed yields the same result whether chunks run inline or on the pool.
+CHUNK_PATHS = 25_000
+PARALLEL_PATH_THRESHOLD = int(os.getenv("RETIREMENT_SIMULATION_PARALLEL_THRESHOLD", 50_000))
+
+
+@lru_cache(maxsize=1)
+def get_simulation_pool():
+    workers = int(os.getenv("RETIREMENT_SIMULATION_WORKERS", 0)) or os.cpu_count() or 1
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def simulate_paths(current_savings: float, annual_contribution: float, years: int, n_paths: int,
+                   seed, annual_return: float = DEFAULT_ANNUAL_RETURN,
+                   return_volatility: float = DEFAULT_RETURN_VOLATILITY,
+                   inflation_rate: float = DEFAULT_INFLATION_RATE,
+                   inflation_volatility: float = DEFAULT_INFLATION_VOLATILITY) -> np.ndarray:
+    """Draw stochastic return and inflation paths and return real balances.
+
+    Returns an (n_paths, years) matrix of end-of-year savings in today's
+    dollars.  Contributions are indexed to inflation, so in real terms the
+    saver keeps putting away the same share of income.
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(annual_return, return_volatility, size=(n_paths, years))
+    inflation = rng.normal(inflation_rate, inflation_volatility, size=(n_paths, years))
+
+    growth = np.cumprod(1.0 + np.maximum(returns, -0.99), axis=1)
+    price_level = np.cumprod(1.0 + inflation, axis=1)
+    # Contribution made at the end of year t is scaled by the prior year's price level
+    prior_price = np.concatenate([np.ones((n_paths, 1)), price_level[:, :-1]], axis=1)
+
+    # balance_t = G_t * (S + C * sum_{j<=t} P_{j-1} / G_j)
+    nominal = growth * (current_savings + annual_contribution * np.cumsum(prior_price / growth, axis=1))
+    return (nominal / price_level).astype(np.float32)
+
+
+def _simulate_chunk(args):
+    return simulate_paths(*args)
+
+
+def simulate_retirement(user_input: Dict[str, Any], n_paths: int = 10_000, seed: Optional[int] = None,
+                        annual_return: float = DEFAULT_ANNUAL_RETURN,
+                        return_volatility: float = DEFAULT_RETURN_VOLATILITY,
+                        inflation_rate: float = DEFAULT_INFLATION_RATE,
+                        inflation_volatility: float = DEFAULT_INFLATION_VOLATILITY,
+                        contribution_rate: float = DEFAULT_CONTRIBUTION_RATE,
+                        parallel: Optional[bool] = None) -> Dict[str, Any]:
+    """Monte Carlo projection of savings at retirement for one user"""
+    current_age = int(user_input.get("age") or 0)
+    retirement_age = int(user_input.get("retirementAge") or 0)
+    current_savings = float(user_input.get("currentSavings") or 0)
+    income = float(user_input.get("income") or 0)
+    goal = float(user_input.get("retirementSavingsGoal") or 0)
+
+    years = max(retirement_age - current_age, 0)
+    annual_contribution = income * contribution_rate
+
+    chunk_sizes = [CHUNK_PATHS] * (n_paths // CHUNK_PATHS)
+    if n_paths % CHUNK_PATHS:
+        chunk_sizes.append(n_paths % CHUNK_PATHS)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = [
+        (current_savings, annual_contribution, years, size, chunk_seed,
+         annual_return, return_volatility, inflation_rate, inflation_volatility)
+        for size, chunk_seed in zip(chunk_sizes, seeds)
+    ]
+
+    if parallel is None:
+        parallel = n_paths >= PARALLEL_PATH_THRESHOLD and len(tasks) > 1
+    if parallel:
+        chunks = list(get_simulation_pool().map(_simulate_chunk, tasks))
+    else:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    paths = np.concatenate(chunks, axis=0)
+
+    if years:
+        final = paths[:, -1].astype(np.float64)
+    else:
+        final = np.full(n_paths, current_savings)
+
+    bands = np.percentile(paths, PERCENTILES, axis=0) if years else np.empty((len(PERCENTILES), 0))
+    final_percentiles = np.percentile(final, PERCENTILES)
+
+    return {
+        "n_paths": n_paths,
+        "years_left": years,
+        "success_probability": float(np.mean(final >= goal)),
+        "projected_savings": {
+            "mean": float(final.mean()),
+            "percentiles": {f"p{p}": float(v) for p, v in zip(PERCENTILES, final_percentiles)}
+        },
+        "percentile_bands": {
+            "years": list(range(current_age + 1, current_age + years + 1)),
+            **{f"p{p}": band.tolist() for p, band in zip(PERCENTILES, bands)}
+        },
+        "assumptions": {
+            "annual_return": annual_return,
+            "return_volatility": return_volatility,
+            "inflation_rate": inflation_rate,
+            "inflation_volatility": inflation_volatility,
+            "contribution_rate": contribution_rate,
+            "real_dollars": True
+        }
+    }
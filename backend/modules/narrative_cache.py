@@ -0,0 +1,296 @@
+import re
+import threading
+from bisect import bisect_right
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+# Band edges for the quantized profile signature
+AGE_BAND_YEARS = 5
+YEARS_LEFT_BAND_YEARS = 5
+INCOME_BAND_EDGES = (25_000, 50_000, 75_000, 100_000, 150_000, 200_000, 300_000)
+SAVINGS_RATIO_EDGES = (0.25, 0.5, 1.0, 2.0, 4.0, 7.0)
+
+# A figure written in a narrative, e.g. "$1,250,000", "$1.2 million", "$85k", "12.5%", "35"
+FIGURE_PATTERN = re.compile(
+    r"(?P<dollar>\$)?(?P<number>\d{1,3}(?:,\d{3})+|\d+)(?P<decimals>\.\d+)?"
+    r"(?P<suffix>\s?(?:million|M)\b|[kK]\b|%)?"
+)
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\|([^}]*)\}\}")
+SUFFIX_MULTIPLIERS = {"": 1, "%": 1, "k": 1e3, "K": 1e3, "M": 1e6, "million": 1e6}
+# Largest relative error accepted when matching a rounded figure ("$1.2 million") to an exact one
+MAX_ROUNDING_ERROR = 0.05
+
+FIGURE_KINDS = ("money", "percent", "age", "retirement_age", "years", "text")
+
+# Phrasings in which a bare integer is the user's own age, retirement age or
+# years to retirement.  Anywhere else ("catch-up contributions start at age
+# 50", "full retirement age is 67") the same number may be a fact, so it is
+# never rewritten.
+INTEGER_CONTEXTS = {
+    "age": (
+        r"\b(\d+)-year-old\b",
+        r"\b(?:you are|you're|you’re|aged) (\d+)\b",
+    ),
+    "retirement_age": (
+        r"\bretir(?:e|ing|ement) (?:at|by) (?:age )?(\d+)\b",
+        r"\byour (?:target )?retirement age of (\d+)\b",
+    ),
+    "years": (
+        r"\b(\d+) years (?:until|to|before|left|remaining|from now)\b",
+        r"\b(?:in|next|remaining|over) (\d+) years\b",
+    ),
+}
+INTEGER_KINDS = tuple(INTEGER_CONTEXTS)
+
+
+def _band(value: float, width: int) -> int:
+    return int(value // width * width)
+
+
+def profile_signature(age: int, income: float, savings: float, years_left: int, gap: float,
+                      has_mortgage: bool, has_investment: bool,
+                      age_band: int = AGE_BAND_YEARS, years_left_band: int = YEARS_LEFT_BAND_YEARS,
+                      income_edges: Sequence[float] = INCOME_BAND_EDGES,
+                      savings_ratio_edges: Sequence[float] = SAVINGS_RATIO_EDGES) -> str:
+    """Quantized profile that users sharing a narrative must agree on.
+
+    Whether the user is on track for their goal is part of the signature so
+    a reused narrative never congratulates someone with a shortfall.
+    """
+    ratio = savings / income if income > 0 else float("inf")
+    features = {
+        "age": _band(age, age_band),
+        "income": bisect_right(income_edges, income),
+        "savings_ratio": bisect_right(savings_ratio_edges, ratio),
+        "years_left": _band(years_left, years_left_band),
+        "mortgage": int(has_mortgage),
+        "investment": int(has_investment),
+        "on_track": int(gap <= 0)
+    }
+    return "|".join(f"{name}={value}" for name, value in features.items())
+
+
+def _parse(match: re.Match) -> Dict[str, Any]:
+    suffix = (match.group("suffix") or "").strip()
+    decimals = match.group("decimals") or ""
+    value = float(match.group("number").replace(",", "") + decimals)
+    return {
+        "dollar": bool(match.group("dollar")),
+        "comma": "," in match.group("number"),
+        "places": max(len(decimals) - 1, 0),
+        "space": bool(match.group("suffix")) and match.group("suffix")[0].isspace(),
+        "suffix": suffix,
+        "value": value * SUFFIX_MULTIPLIERS[suffix]
+    }
+
+
+def _matches(token: Dict[str, Any], kind: str, figure: float) -> bool:
+    if kind == "percent":
+        if token["suffix"] != "%":
+            return False
+    elif kind == "money":
+        if token["suffix"] == "%" or not (token["dollar"] or token["suffix"]):
+            return False
+    elif kind in INTEGER_KINDS:
+        # Integers are only templated in recognised phrasings, see _templatize_integers
+        return False
+    return _rounds_to(token, figure)
+
+
+def _rounds_to(token: Dict[str, Any], figure: float) -> bool:
+    # Accept any value the writer could have rounded to the digits shown
+    unit = SUFFIX_MULTIPLIERS[token["suffix"]] / 10 ** token["places"]
+    error = abs(token["value"] - figure)
+    return error <= unit / 2 and error <= MAX_ROUNDING_ERROR * max(abs(figure), 1e-9)
+
+
+def _spec(token: Dict[str, Any]) -> str:
+    space = " " if token["space"] else ""
+    return f"{'$' if token['dollar'] else ''}{',' if token['comma'] else ''}.{token['places']}{space}{token['suffix']}"
+
+
+def _is_bare_integer(token: Dict[str, Any]) -> bool:
+    return not (token["dollar"] or token["suffix"] or token["comma"] or token["places"])
+
+
+def _is_amount(token: Dict[str, Any]) -> bool:
+    """A dollar amount, percentage or currency-sized number ("$1,250", "12%", "85k", "90,000")"""
+    return token["dollar"] or token["comma"] or bool(token["suffix"])
+
+
+def figure_values(text: str) -> Set[float]:
+    """Values of the numbers written in ``text``, e.g. the static facts a narrative may quote.
+
+    Fractions such as ``0.025`` are also taken as the percentage they
+    would be written as.
+    """
+    values = set()
+    for match in FIGURE_PATTERN.finditer(text):
+        value = _parse(match)["value"]
+        values.add(value)
+        if match.group("decimals") and value < 1:
+            values.add(value * 100)
+    return values
+
+
+def _sentences(text: str) -> List[str]:
+    return re.split(r"(?<=[.!?])(?=\s)", text)
+
+
+def _templatize_text(narrative: str, figures: Dict[str, tuple]) -> Optional[str]:
+    """Replace the user's job and gender in the sentence introducing them.
+
+    That is the sentence giving their age, or the first one.  None if a
+    value is still written anywhere else, where it may be the user's or an
+    unrelated word.
+    """
+    sentences = _sentences(narrative)
+    intro = next((i for i, sentence in enumerate(sentences) if "{{age|" in sentence), 0)
+    for name, (kind, value) in figures.items():
+        if kind != "text" or not value or len(str(value)) < 3:
+            continue
+        pattern = rf"\b{re.escape(str(value))}\b"
+        sentences[intro] = re.sub(pattern, f"{{{{{name}|text}}}}", sentences[intro], flags=re.IGNORECASE)
+        if any(re.search(pattern, sentence, flags=re.IGNORECASE) for sentence in sentences):
+            return None
+    return "".join(sentences)
+
+
+def _templatize_integers(narrative: str, figures: Dict[str, tuple]) -> str:
+    for name, (kind, value) in figures.items():
+        if kind not in INTEGER_KINDS or value is None:
+            continue
+        for pattern in INTEGER_CONTEXTS[kind]:
+            def replace(match: re.Match) -> str:
+                if int(match.group(1)) != value:
+                    return match.group(0)
+                start, end = match.span(1)
+                offset = match.start()
+                text = match.group(0)
+                return f"{text[:start - offset]}{{{{{name}|.0}}}}{text[end - offset:]}"
+
+            narrative = re.sub(pattern, replace, narrative, flags=re.IGNORECASE)
+    return narrative
+
+
+def templatize(narrative: str, figures: Dict[str, tuple], fact_values: Iterable[float] = ()) -> Optional[str]:
+    """Replace the user's own figures in a narrative with placeholders.
+
+    ``figures`` maps a name to ``(kind, value)`` where kind is one of
+    ``FIGURE_KINDS``.  Each number in the text that matches a figure of a
+    compatible kind becomes ``{{name|spec}}``, with ``spec`` recording how it
+    was written so ``render`` can write another user's value the same way.
+    Ages and year counts are only matched in ``INTEGER_CONTEXTS``, and job
+    and gender only in the sentence introducing the user.
+
+    Returns None if the narrative cannot be safely templated: a number
+    matches more than one figure, a bare integer equal to one of the user's
+    ages or year counts appears where it may be a fact, or an amount matches
+    neither a figure nor one of ``fact_values``.  Such an amount was
+    probably derived from the user's figures (a monthly contribution, the
+    gap spread over the remaining years) and must not reach other users.
+    """
+    if "{{" in narrative or "}}" in narrative:
+        return None
+
+    narrative = _templatize_text(_templatize_integers(narrative, figures), figures)
+    if narrative is None:
+        return None
+
+    numeric = {name: (kind, float(value)) for name, (kind, value) in figures.items()
+               if kind != "text" and value is not None}
+    integers = {value for kind, value in numeric.values() if kind in INTEGER_KINDS}
+    fact_values = list(fact_values)
+    unsafe = []
+
+    def replace(match: re.Match) -> str:
+        if match.group(0).startswith("{{"):
+            return match.group(0)
+        token = _parse(match)
+        if _is_bare_integer(token) and token["value"] in integers:
+            unsafe.append(match.group(0))
+            return match.group(0)
+        candidates = [name for name, (kind, value) in numeric.items() if _matches(token, kind, value)]
+        if len(candidates) == 1:
+            return f"{{{{{candidates[0]}|{_spec(token)}}}}}"
+        if candidates or (_is_amount(token) and not any(_rounds_to(token, value) for value in fact_values)):
+            unsafe.append(match.group(0))
+        return match.group(0)
+
+    template = re.sub(PLACEHOLDER_PATTERN.pattern + "|" + FIGURE_PATTERN.pattern, replace, narrative)
+    return None if unsafe else template
+
+
+def _format(value: float, spec: str) -> str:
+    match = re.fullmatch(r"(\$?)(,?)\.(\d+)(\s?)(million|M|k|K|%)?", spec)
+    dollar, comma, places, space, suffix = match.groups()
+    suffix = suffix or ""
+    scaled = value / SUFFIX_MULTIPLIERS[suffix]
+    return f"{dollar}{scaled:{comma}.{places}f}{space if suffix else ''}{suffix}"
+
+
+def render(template: str, figures: Dict[str, tuple]) -> Optional[str]:
+    """Fill a template from ``templatize`` with another user's figures.
+
+    Returns None if the template needs a figure this user does not have.
+    """
+    missing = []
+
+    def fill(match: re.Match) -> str:
+        name, spec = match.groups()
+        kind, value = figures.get(name, (None, None))
+        if value is None or value == "":
+            missing.append(name)
+            return ""
+        return str(value) if spec == "text" else _format(float(value), spec)
+
+    narrative = PLACEHOLDER_PATTERN.sub(fill, template)
+    return None if missing else narrative
+
+
+class NarrativeCacheStats:
+    """Lookup outcomes of the narrative cache, overall and per signature, for tuning the bands"""
+
+    def __init__(self, top_signatures: int = 10):
+        self.top_signatures = top_signatures
+        self.hits = 0
+        self.misses = 0
+        self.render_failures = 0
+        self.stores = 0
+        self.untemplatable = 0
+        self.signature_hits = Counter()
+        self.signature_misses = Counter()
+        self._lock = threading.Lock()
+
+    def record_lookup(self, signature: str, hit: bool, render_failed: bool = False):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.signature_hits[signature] += 1
+            else:
+                self.misses += 1
+                self.signature_misses[signature] += 1
+                self.render_failures += int(render_failed)
+
+    def record_store(self, stored: bool):
+        with self._lock:
+            if stored:
+                self.stores += 1
+            else:
+                self.untemplatable += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "lookups": lookups,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "render_failures": self.render_failures,
+                "stores": self.stores,
+                "untemplatable": self.untemplatable,
+                "signatures_seen": len(set(self.signature_hits) | set(self.signature_misses)),
+                "top_hit_signatures": dict(self.signature_hits.most_common(self.top_signatures)),
+                "top_miss_signatures": dict(self.signature_misses.most_common(self.top_signatures))
+            }
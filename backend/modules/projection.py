@@ -0,0 +1,144 @@
+import numpy as np
+from typing import Any, Dict, List, Sequence
+
+# Planner assumptions shared by every projection
+DEFAULT_CONTRIBUTION_RATE = 0.15
+DEFAULT_ANNUAL_RETURN = 0.065
+DEFAULT_INFLATION_RATE = 0.03
+
+
+def extract_projection_inputs(user_inputs: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Pull the numeric planner fields out of raw user input dicts as column arrays"""
+    def column(field, dtype):
+        return np.array([u.get(field) or 0 for u in user_inputs], dtype=dtype)
+
+    return {
+        "age": column("age", np.int64),
+        "retirement_age": column("retirementAge", np.int64),
+        "current_savings": column("currentSavings", np.float64),
+        "income": column("income", np.float64),
+        "goal": column("retirementSavingsGoal", np.float64),
+    }
+
+
+def future_value(current_savings, annual_contribution, annual_return, years):
+    """Closed-form balance after `years` of compounding with a year-end contribution.
+
+    All arguments broadcast against each other, so a scalar user can be swept
+    over a grid of rates or a batch of users evaluated in one call.
+    """
+    current_savings = np.asarray(current_savings, dtype=np.float64)
+    annual_contribution = np.asarray(annual_contribution, dtype=np.float64)
+    annual_return = np.asarray(annual_return, dtype=np.float64)
+    years = np.maximum(np.asarray(years, dtype=np.float64), 0)
+
+    growth = np.power(1.0 + annual_return, years)
+    # (g^n - 1) / r, falling back to n when the rate is zero
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(annual_return == 0, years, (growth - 1.0) / annual_return)
+    return current_savings * growth + annual_contribution * annuity
+
+
+def project_savings(current_savings, annual_contribution, annual_return, years_left) -> Dict[str, np.ndarray]:
+    """Project yearly savings paths for N users at once.
+
+    Returns (N, T) matrices where T is the longest horizon in the batch.  Years
+    past a user's own horizon are masked out (``mask`` is False) and hold
+    zeros, so row ``i`` truncated to ``years_left[i]`` reproduces the original
+    per-user loop exactly.
+    """
+    current_savings = np.atleast_1d(np.asarray(current_savings, dtype=np.float64))
+    n_users = current_savings.shape[0]
+    annual_contribution = np.broadcast_to(np.asarray(annual_contribution, dtype=np.float64), (n_users,))
+    annual_return = np.broadcast_to(np.asarray(annual_return, dtype=np.float64), (n_users,))
+    years_left = np.maximum(np.broadcast_to(np.asarray(years_left, dtype=np.int64), (n_users,)), 0)
+
+    horizon = int(years_left.max()) if n_users else 0
+    steps = np.arange(1, horizon + 1)
+    mask = steps[None, :] <= years_left[:, None]
+
+    # Cumulative-product path of growth factors: factors[:, t] = (1 + r)^(t + 1)
+    factors = np.cumprod(np.broadcast_to((1.0 + annual_return)[:, None], (n_users, horizon)), axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(
+            annual_return[:, None] == 0,
+            steps[None, :].astype(np.float64),
+            (factors - 1.0) / annual_return[:, None],
+        )
+    cumulative = current_savings[:, None] * factors + annual_contribution[:, None] * annuity
+
+    # Growth for year t is earned on the balance at the end of year t - 1
+    previous = np.concatenate([current_savings[:, None], cumulative[:, :-1]], axis=1)
+    growth = previous * annual_return[:, None]
+    contributions = np.broadcast_to(annual_contribution[:, None], (n_users, horizon))
+
+    projected_savings = future_value(current_savings, annual_contribution, annual_return, years_left)
+
+    return {
+        "steps": steps,
+        "mask": mask,
+        "contributions": np.where(mask, contributions, 0.0),
+        "growth": np.where(mask, growth, 0.0),
+        "cumulative": np.where(mask, cumulative, 0.0),
+        "projected_savings": projected_savings,
+        "years_left": years_left,
+    }
+
+
+def required_savings_rate(current_savings, income, goal, years_left):
+    """Planner's linear savings-rate estimate, clamped to 15-50% of income"""
+    current_savings = np.asarray(current_savings, dtype=np.float64)
+    income = np.asarray(income, dtype=np.float64)
+    goal = np.asarray(goal, dtype=np.float64)
+    years_left = np.asarray(years_left, dtype=np.float64)
+
+    shortfall, denominator = np.broadcast_arrays(goal - current_savings, income * years_left)
+    # With no income the goal can only be reached at the maximum rate
+    rate = np.divide(
+        shortfall,
+        denominator,
+        out=np.where(shortfall > 0, np.inf, 0.0),
+        where=denominator > 0,
+    )
+    rate = np.where(years_left > 0, rate, 0.0)
+    return np.clip(rate, 0.15, 0.50)
+
+
+def project_population(user_inputs: Sequence[Dict[str, Any]],
+                       contribution_rate: float = DEFAULT_CONTRIBUTION_RATE,
+                       annual_return: float = DEFAULT_ANNUAL_RETURN) -> Dict[str, np.ndarray]:
+    """Score a whole population of raw user inputs in one vectorized pass"""
+    inputs = extract_projection_inputs(user_inputs)
+    years_left = inputs["retirement_age"] - inputs["age"]
+    annual_contribution = inputs["income"] * contribution_rate
+
+    projection = project_savings(inputs["current_savings"], annual_contribution, annual_return, years_left)
+    projected_savings = projection["projected_savings"]
+
+    return {
+        **inputs,
+        "projection": projection,
+        "years_left": years_left,
+        "annual_contribution": annual_contribution,
+        "projected_savings": projected_savings,
+        "gap": inputs["goal"] - projected_savings,
+        "required_savings_rate": required_savings_rate(
+            inputs["current_savings"], inputs["income"], inputs["goal"], years_left
+        ),
+    }
+
+
+def to_intermediate_calculations(projection: Dict[str, np.ndarray], current_age: int, index: int = 0) -> Dict[str, List[Dict]]:
+    """Convert one user's row of a projection into the API's list-of-dicts form"""
+    n_years = int(projection["years_left"][index])
+    years = (current_age + projection["steps"][:n_years]).tolist()
+
+    def series(name):
+        amounts = projection[name][index, :n_years].tolist()
+        return [{"year": year, "amount": amount} for year, amount in zip(years, amounts)]
+
+    return {
+        "contributions": series("contributions"),
+        "growth": series("growth"),
+        "cumulative": series("cumulative"),
+    }
@@ -0,0 +1,92 @@
+import hashlib
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Rough characters per token for English prose under Llama-style BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count, close enough to budget prompts without loading a tokenizer"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def fill_budget(snippets: Sequence[str], budget: int,
+                token_counter: Callable[[str], int] = estimate_tokens) -> Tuple[List[str], int, int]:
+    """Take snippets in relevance order while they fit in ``budget`` tokens.
+
+    A snippet too large for the remaining budget is skipped rather than
+    ending the fill, so a smaller, less relevant one can still use the
+    space.  Returns the chosen snippets, their token count and how many
+    were dropped.
+    """
+    chosen, used, dropped = [], 0, 0
+    for snippet in snippets:
+        tokens = token_counter(snippet)
+        if used + tokens > budget:
+            dropped += 1
+            continue
+        chosen.append(snippet)
+        used += tokens
+    return chosen, used, dropped
+
+
+class PromptBuilder:
+    """Assemble LLM prompts from templates compiled once, within token budgets.
+
+    The system prompt holds the instructions plus a fixed slice of the static
+    facts, so it is byte-identical across requests and the model server can
+    reuse its KV cache for that prefix.  Everything request-specific goes in
+    the user prompt, whose retrieved context is filled by relevance up to
+    ``context_budget`` tokens.  Templates compile on first use, so importing
+    the builder does not import jinja2.
+    """
+
+    def __init__(self, system_template: str, user_template: str, context_budget: int = 1500,
+                 static_facts_budget: int = 1000, token_counter: Callable[[str], int] = estimate_tokens):
+        self.system_source = system_template
+        self.user_source = user_template
+        self.context_budget = context_budget
+        self.static_facts_budget = static_facts_budget
+        self.token_counter = token_counter
+        self._templates = None
+        self._prefixes: Dict[str, str] = {}
+
+    def _compiled(self):
+        if self._templates is None:
+            from jinja2 import Template
+            self._templates = (
+                Template(self.system_source, trim_blocks=True, lstrip_blocks=True),
+                Template(self.user_source, trim_blocks=True, lstrip_blocks=True)
+            )
+        return self._templates
+
+    def system_prompt(self, static_facts: str) -> str:
+        """Instructions plus the static facts that fit their budget, memoized per facts content"""
+        key = hashlib.sha256(static_facts.encode("utf-8")).hexdigest()
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            facts, _, _ = fill_budget(static_facts.splitlines(), self.static_facts_budget, self.token_counter)
+            prefix = self._compiled()[0].render(static_facts="\n".join(facts))
+            self._prefixes = {key: prefix}
+        return prefix
+
+    def build(self, static_facts: str, context: Sequence[str], exclude: Optional[set] = None,
+              **variables: Any) -> Dict[str, Any]:
+        """System and user prompts for one request.
+
+        ``context`` snippets are in relevance order; any already in the static
+        facts, or in ``exclude``, are skipped.
+        """
+        system_prompt = self.system_prompt(static_facts)
+        seen = set(static_facts.splitlines()) | (exclude or set())
+        candidates = [snippet for snippet in dict.fromkeys(context) if snippet not in seen]
+        chosen, context_tokens, dropped = fill_budget(candidates, self.context_budget, self.token_counter)
+        user_prompt = self._compiled()[1].render(context=chosen, **variables)
+        return {
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "prompt_tokens": self.token_counter(system_prompt) + self.token_counter(user_prompt),
+            "context_tokens": context_tokens,
+            "context_dropped": dropped
+        }
@@ -0,0 +1,55 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Optional
+
+SUBSYSTEM_STATES = ("pending", "loading", "ready", "error")
+
+
+class Readiness:
+    """Load state of the subsystems warmed up after startup"""
+
+    def __init__(self):
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, *names: str):
+        with self._lock:
+            for name in names:
+                self._states.setdefault(name, {"state": "pending"})
+
+    def mark(self, name: str, state: str, **details):
+        with self._lock:
+            self._states[name] = {"state": state, **details}
+
+    @contextmanager
+    def loading(self, name: str):
+        """Mark ``name`` loading for the duration of the block, then ready or error"""
+        if self.state(name) == "ready":
+            yield
+            return
+        self.mark(name, "loading")
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.mark(name, "error", error=str(e))
+            raise
+        self.mark(name, "ready", load_seconds=round(time.perf_counter() - start, 3))
+
+    def state(self, name: str) -> Optional[str]:
+        with self._lock:
+            return self._states.get(name, {}).get("state")
+
+    def is_ready(self, names: Optional[Iterable[str]] = None) -> bool:
+        with self._lock:
+            names = list(self._states) if names is None else list(names)
+            return all(self._states.get(name, {}).get("state") == "ready" for name in names)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(status) for name, status in self._states.items()}
+
+
+# Shared by the news and retirement subsystems so one endpoint can report both
+readiness = Readiness()
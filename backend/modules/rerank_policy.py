@@ -0,0 +1,83 @@
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+RERANK_MODES = ("skip", "partial", "full", "escalate")
+
+DEFAULT_SKIP_MARGIN = 0.25
+DEFAULT_CLOSE_SPREAD = 0.05
+DEFAULT_BAND = 0.15
+
+
+def choose_rerank_depth(distances: Sequence[float], top_n: int, max_depth: int,
+                        latency_budget_ms: Optional[float] = None, per_pair_ms: Optional[float] = None,
+                        escalated_depth: Optional[int] = None, skip_margin: float = DEFAULT_SKIP_MARGIN,
+                        close_spread: float = DEFAULT_CLOSE_SPREAD, band: float = DEFAULT_BAND) -> Dict[str, Any]:
+    """Decide how many retrieved candidates to cross-encode from their FAISS distances.
+
+    ``distances`` are the ascending L2 distances of the candidates.  The
+    relative margin between the first two decides whether there is a clear
+    winner (``skip``); a tiny spread across all candidates means the index
+    cannot tell them apart, so the search should go deeper and rerank more
+    (``escalate``); otherwise only candidates within ``band`` of the best
+    distance are reranked (``partial``, or ``full`` at ``max_depth``).  When
+    a latency budget is given the depth is capped at what the budget affords
+    at ``per_pair_ms`` per cross-encoded pair.
+    """
+    d = np.asarray(distances, dtype=np.float64)
+    escalated_depth = escalated_depth or 2 * max_depth
+    margin = float((d[1] - d[0]) / max(d[1], 1e-9)) if d.size > 1 else 1.0
+    spread = float((d[-1] - d[0]) / max(d[-1], 1e-9)) if d.size > 1 else 1.0
+
+    if d.size <= 1 or margin >= skip_margin:
+        mode, depth = "skip", 0
+    elif d.size > top_n and spread < close_spread:
+        mode, depth = "escalate", escalated_depth
+    else:
+        depth = int(np.clip(np.count_nonzero(d <= d[0] * (1 + band)), top_n, max_depth))
+        mode = "full" if depth >= min(max_depth, d.size) else "partial"
+
+    if latency_budget_ms is not None and per_pair_ms:
+        affordable = int(latency_budget_ms // per_pair_ms)
+        if affordable < depth:
+            depth = affordable
+            mode = "partial" if depth else "skip"
+
+    return {"mode": mode, "depth": depth, "escalate": mode == "escalate", "margin": margin, "spread": spread}
+
+
+class RerankStats:
+    """Decision counts and an exponentially weighted cross-encoder cost per pair.
+
+    The cost should come from the model forward pass alone (``record_forward``),
+    not from the caller's wall time, which also includes batching delays and
+    cache hits.
+    """
+
+    def __init__(self, initial_per_pair_ms: float = 5.0, alpha: float = 0.2):
+        self.per_pair_ms = initial_per_pair_ms
+        self.alpha = alpha
+        self.decisions = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, decision: Dict[str, Any], pairs: int = 0, seconds: float = 0.0):
+        with self._lock:
+            self.decisions[decision["mode"]] += 1
+        self.record_forward(pairs, seconds)
+
+    def record_forward(self, pairs: int, seconds: float):
+        """Fold one cross-encoder forward pass over ``pairs`` pairs into the per-pair cost"""
+        if not pairs:
+            return
+        with self._lock:
+            observed = seconds * 1000 / pairs
+            self.per_pair_ms += self.alpha * (observed - self.per_pair_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "decisions": {mode: self.decisions[mode] for mode in RERANK_MODES},
+                "per_pair_ms": self.per_pair_ms
+            }
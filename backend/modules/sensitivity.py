@@ -0,0 +1,41 @@
+import numpy as np
+from typing import Any, Dict, Optional, Sequence
+
+from modules.projection import future_value
+
+MAX_GRID_CELLS = 100_000
+
+
+def sensitivity_grid(current_savings: float, income: float, goal: float, current_age: int,
+                     contribution_rates: Sequence[float], annual_returns: Sequence[float],
+                     retirement_ages: Sequence[int],
+                     inflation_rates: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+    """Sweep the planner's projection over a broadcast grid of assumptions.
+
+    Axes are ordered (contribution_rate, annual_return, retirement_age[,
+    inflation_rate]).  When inflation rates are given, projected savings and
+    the gap are expressed in today's dollars.
+    """
+    rates = np.asarray(contribution_rates, dtype=np.float64)[:, None, None]
+    returns = np.asarray(annual_returns, dtype=np.float64)[None, :, None]
+    ages = np.asarray(retirement_ages, dtype=np.int64)[None, None, :]
+    years = np.maximum(ages - current_age, 0)
+
+    projected = future_value(current_savings, income * rates, returns, years)
+
+    axes = {
+        "contribution_rate": list(contribution_rates),
+        "annual_return": list(annual_returns),
+        "retirement_age": list(retirement_ages),
+    }
+    if inflation_rates is not None:
+        inflation = np.asarray(inflation_rates, dtype=np.float64)
+        projected = projected[..., None] / np.power(1.0 + inflation, years[..., None])
+        axes["inflation_rate"] = list(inflation_rates)
+
+    return {
+        "axes": axes,
+        "shape": list(projected.shape),
+        "projected_savings": projected,
+        "gap": goal - projected,
+    }
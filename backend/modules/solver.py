@@ -0,0 +1,78 @@
+import numpy as np
+from typing import Any, Dict, Sequence
+
+from modules.projection import (
+    DEFAULT_ANNUAL_RETURN,
+    DEFAULT_CONTRIBUTION_RATE,
+    extract_projection_inputs,
+    future_value,
+)
+
+MAX_RETIREMENT_AGE = 100
+
+
+def solve_contribution_rate(current_savings, income, goal, years_left, annual_return=DEFAULT_ANNUAL_RETURN):
+    """Exact share of income that reaches the goal by retirement, with compounding.
+
+    The projected balance is linear in the contribution, so the root of
+    ``future_value(S, rate * income, r, n) - goal`` has a closed form.
+    Returns 0 where current savings alone already get there and ``inf``
+    where no contribution can (no years left, or no income).
+    """
+    current_savings = np.asarray(current_savings, dtype=np.float64)
+    income = np.asarray(income, dtype=np.float64)
+    goal = np.asarray(goal, dtype=np.float64)
+    years_left = np.maximum(np.asarray(years_left, dtype=np.float64), 0)
+
+    # Balance from existing savings alone, and from contributing $1 a year
+    baseline = future_value(current_savings, 0.0, annual_return, years_left)
+    per_dollar = future_value(0.0, 1.0, annual_return, years_left)
+
+    shortfall, capacity = np.broadcast_arrays(goal - baseline, per_dollar * income)
+    rate = np.divide(shortfall, capacity, out=np.full(shortfall.shape, np.inf), where=capacity > 0)
+    return np.where(shortfall <= 0, 0.0, rate)
+
+
+def solve_retirement_age(current_age, current_savings, income, goal, contribution_rate=DEFAULT_CONTRIBUTION_RATE,
+                         annual_return=DEFAULT_ANNUAL_RETURN, max_age=MAX_RETIREMENT_AGE):
+    """Earliest whole age at which the projected balance reaches the goal.
+
+    Every candidate age up to ``max_age`` is evaluated at once as an
+    (N, ages) grid and the first crossing is taken per user.  Returns -1
+    where the goal is not reached by ``max_age``.
+    """
+    current_age = np.atleast_1d(np.asarray(current_age, dtype=np.int64))
+    current_savings = np.atleast_1d(np.asarray(current_savings, dtype=np.float64))
+    income = np.atleast_1d(np.asarray(income, dtype=np.float64))
+    goal = np.atleast_1d(np.asarray(goal, dtype=np.float64))
+
+    candidate_years = np.arange(0, max_age - int(current_age.min(initial=max_age)) + 1)
+    balances = future_value(
+        current_savings[:, None],
+        (income * contribution_rate)[:, None],
+        annual_return,
+        candidate_years[None, :],
+    )
+    in_range = (current_age[:, None] + candidate_years[None, :]) <= max_age
+    reached = (balances >= goal[:, None]) & in_range
+
+    first = reached.argmax(axis=1)
+    return np.where(reached.any(axis=1), current_age + candidate_years[first], -1)
+
+
+def solve_goals(user_inputs: Sequence[Dict[str, Any]], contribution_rate: float = DEFAULT_CONTRIBUTION_RATE,
+                annual_return: float = DEFAULT_ANNUAL_RETURN, max_age: int = MAX_RETIREMENT_AGE) -> Dict[str, np.ndarray]:
+    """Solve the required contribution rate and earliest retirement age for a cohort"""
+    inputs = extract_projection_inputs(user_inputs)
+    years_left = inputs["retirement_age"] - inputs["age"]
+
+    return {
+        "years_left": years_left,
+        "contribution_rate": solve_contribution_rate(
+            inputs["current_savings"], inputs["income"], inputs["goal"], years_left, annual_return
+        ),
+        "earliest_retirement_age": solve_retirement_age(
+            inputs["age"], inputs["current_savings"], inputs["income"], inputs["goal"],
+            contribution_rate, annual_return, max_age
+        ),
+    }
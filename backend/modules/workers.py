@@ -0,0 +1,128 @@
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+POOL_KINDS = ("thread", "process")
+
+# Live pools, reset together by one fork handler: handlers cannot be
+# unregistered, so one per instance would keep every pool ever made alive
+_live_pools: "weakref.WeakSet[BoundedPool]" = weakref.WeakSet()
+
+
+class PoolSaturated(Exception):
+    """A pool refused work because its queue is full or it is shutting down"""
+
+    def __init__(self, pool: str, status_code: int, retry_after: int = 1):
+        self.pool = pool
+        self.status_code = status_code
+        self.retry_after = retry_after
+        reason = "is shutting down" if status_code == 503 else "is at capacity"
+        super().__init__(f"The {pool} worker pool {reason}, please retry shortly")
+
+
+class BoundedPool:
+    """Executor with a hard cap on queued work, awaitable from the event loop.
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more
+    wait for a worker.  Past that, ``run`` raises ``PoolSaturated`` right away
+    (429) instead of letting latency grow without bound; once shut down it
+    raises with 503.  A slot is released when the call itself finishes, even
+    if the awaiting request was cancelled, so the cap reflects real load.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, kind: str = "thread"):
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Unknown pool kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = None
+        self._closed = False
+        self._lock = threading.Lock()
+        _live_pools.add(self)
+
+    def _reset_after_fork(self):
+        # Executor threads do not survive fork, so a forked server worker starts its own
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    @classmethod
+    def from_env(cls, name: str, max_workers: int, max_queue: int, kind: str = "thread") -> "BoundedPool":
+        """Pool sized by RETIREMENT_<NAME>_WORKERS / _QUEUE / _POOL_KIND, with the given defaults"""
+        prefix = f"RETIREMENT_{name.upper()}"
+        return cls(
+            name,
+            max_workers=int(os.getenv(f"{prefix}_WORKERS", 0)) or max_workers,
+            max_queue=int(os.getenv(f"{prefix}_QUEUE", max_queue)),
+            kind=os.getenv(f"{prefix}_POOL_KIND", kind)
+        )
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    def _acquire(self):
+        with self._lock:
+            if self._closed:
+                raise PoolSaturated(self.name, 503)
+            if self.in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PoolSaturated(self.name, 429)
+            self.in_flight += 1
+            return self._get_executor()
+
+    def _release(self, _future=None):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the pool, or fail fast if it is saturated"""
+        executor = self._acquire()
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except RuntimeError:
+            # Executor was shut down between acquiring a slot and submitting
+            self._release()
+            raise PoolSaturated(self.name, 503)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": min(self.in_flight, self.max_workers),
+                "queued": max(0, self.in_flight - self.max_workers),
+                "completed": self.completed,
+                "rejected": self.rejected
+            }
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _reset_pools_after_fork():
+    for pool in list(_live_pools):
+        pool._reset_after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
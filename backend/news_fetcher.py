@@ -2,16 +2,23 @@ import aiohttp
 import asyncio
 from datetime import datetime
 from typing import Optional
-from transformers import pipeline
+from functools import lru_cache
 import logging
-from newspaper import Article
-import newspaper
 import re
 
+from modules.readiness import readiness
+
 logger = logging.getLogger(__name__)
 
-# Load the model once globally
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+SUMMARIZER_MODEL_NAME = "facebook/bart-large-cnn"
+readiness.register("summarizer")
+
+@lru_cache(maxsize=1)
+def get_summarizer():
+    """Load the summarization model once, on first use or during warm-up"""
+    with readiness.loading("summarizer"):
+        from transformers import pipeline
+        return pipeline("summarization", model=SUMMARIZER_MODEL_NAME)
 
 BLOCKED_DOMAINS = ["wsj.com", "barrons.com", "forbes.com", "politico.com"]
 
@@ -27,14 +34,16 @@ async def summarize_article(text: str) -> str:
         return "No summary available."
     
     try:
-        # Truncate long content to stay within token limits
-        result = await asyncio.to_thread(
-            summarizer,
-            text[:1000],
-            max_length=30,
-            min_length=10,
-            do_sample=False,
-        )
+        def _summarize():
+            # Truncate long content to stay within token limits
+            return get_summarizer()(
+                text[:1000],
+                max_length=30,
+                min_length=10,
+                do_sample=False,
+            )
+
+        result = await asyncio.to_thread(_summarize)
         return result[0]["summary_text"]
     except Exception as e:
         logger.warning(f"Summarization failed: {e}")
@@ -43,6 +52,7 @@ async def summarize_article(text: str) -> str:
 async def extract_full_text(url: str) -> str:
     try:
         def _parse():
+            from newspaper import Article
             article = Article(url)
             article.download()
             article.parse()
@@ -4,20 +4,38 @@ from datetime import datetime
 import os
 import json
 import hashlib
-import faiss
 import numpy as np
-import ollama
-from sentence_transformers import SentenceTransformer, CrossEncoder
-from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from jinja2 import Template
-from fastapi import APIRouter, Request, Depends, HTTPException
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any, Union
-from modules.utils import clean_rag_facts
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Optional, List, Dict, Any, Tuple, Union
+from modules.projection import project_population, to_intermediate_calculations
+from modules.monte_carlo import simulate_retirement
+from modules.sensitivity import MAX_GRID_CELLS, sensitivity_grid
+from modules.encoding import CALCULATION_FORMATS, encode_calculations
+from modules.solver import MAX_RETIREMENT_AGE, solve_goals
+from modules.decumulation import WITHDRAWAL_STRATEGIES, simulate_population_drawdown
+from modules.household import INVESTMENT_ACCOUNTS, project_household
+from modules.index_store import content_hash, load_cached_vectors, load_index_artifacts, save_index_artifacts
+from modules.ann_index import INDEX_TYPES, build_index, configure_search
+from modules.lru import LRUCache
+from modules.lexical import BM25Index, FactIndex, reciprocal_rank_fusion
+from modules.workers import BoundedPool, PoolSaturated
+from modules.batching import InferenceBatcher
+from modules.rerank_policy import RerankStats, choose_rerank_depth
+from modules.inference_backend import INFERENCE_BACKENDS, load_cross_encoder, load_embedding_model
+from modules.readiness import readiness
+from modules.llm_client import LLMClient
+from modules.job_queue import JobStore, RetryJob, run_worker
+from modules.kv_store import KVStore
+from modules.prompt_builder import PromptBuilder
+from modules.narrative_cache import NarrativeCacheStats, figure_values, profile_signature, render, templatize
 import random
 import logging
+import asyncio
+import threading
 from functools import lru_cache
+from contextlib import aclosing
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -25,6 +43,18 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/retirement")
 
+# Serializes read-modify-write of the JSON data files now that plans run on worker threads
+_data_file_lock = threading.RLock()
+
+# Encoding of intermediate_calculations in the plan cache (records, columnar or binary)
+PLAN_CACHE_CALC_FORMAT = os.getenv("PLAN_CACHE_CALC_FORMAT", "records")
+CALC_FORMAT_PATTERN = f"^({'|'.join(CALCULATION_FORMATS)})$"
+# Second plan cache tier: narratives shared by users with the same quantized profile,
+# with each user's own figures written back in
+NARRATIVE_CACHE_ENABLED = os.getenv("RETIREMENT_NARRATIVE_CACHE", "true").lower() == "true"
+NARRATIVE_AGE_BAND = int(os.getenv("RETIREMENT_NARRATIVE_AGE_BAND", 5))
+NARRATIVE_YEARS_LEFT_BAND = int(os.getenv("RETIREMENT_NARRATIVE_YEARS_LEFT_BAND", 5))
+
 # ────────────────────────────────────────────────────────────────────────────────
 # Enhanced Pydantic Models
 # ────────────────────────────────────────────────────────────────────────────────
@@ -49,6 +79,79 @@ class RetirementInput(BaseModel):
     hasInvestment: str = Field("no", description="Has investments (yes/no)")
     investmentAmount: float = Field(None, ge=0, description="Investment amount")
 
+class BatchRetirementInput(BaseModel):
+    inputs: List[RetirementInput] = Field(..., min_length=1, max_length=10000, description="Retirement inputs to plan together")
+
+class GoalSolverInput(BaseModel):
+    inputs: List[RetirementInput] = Field(..., min_length=1, max_length=100000, description="Users to solve for")
+    contribution_rate: float = Field(0.15, ge=0, le=1, description="Contribution rate used to find the earliest retirement age")
+    annual_return: float = Field(0.065, ge=-0.5, le=0.5, description="Assumed annual return")
+    max_retirement_age: int = Field(MAX_RETIREMENT_AGE, ge=40, le=120, description="Latest retirement age considered")
+
+class DecumulationInput(BaseModel):
+    inputs: List[RetirementInput] = Field(..., min_length=1, max_length=100000, description="Users to simulate")
+    strategy: str = Field("fixed_real", pattern=f"^({'|'.join(WITHDRAWAL_STRATEGIES)})$", description="Withdrawal strategy")
+    withdrawal_rate: float = Field(0.04, ge=0, le=1, description="Withdrawal rate for rate-based strategies")
+    horizon_age: int = Field(95, ge=60, le=120, description="Life-expectancy horizon")
+    annual_return: float = Field(0.05, ge=-0.5, le=0.5, description="Annual return during retirement")
+    inflation_rate: float = Field(0.03, ge=-0.1, le=0.5, description="Annual inflation")
+    claim_age: int = Field(67, ge=62, le=70, description="Social Security claiming age")
+    include_paths: bool = Field(False, description="Return each user's yearly balance and withdrawal paths")
+
+class AccountAssumptions(BaseModel):
+    contribution_rate: Optional[float] = Field(None, ge=0, le=1, description="Share of income contributed each year")
+    annual_limit: Optional[float] = Field(None, ge=0, description="Annual contribution limit")
+    catch_up: Optional[float] = Field(None, ge=0, description="Extra contribution allowed from age 50")
+    annual_return: Optional[float] = Field(None, ge=-0.5, le=0.5, description="Annual return of the account")
+
+class HouseholdInput(BaseModel):
+    inputs: List[RetirementInput] = Field(..., min_length=1, max_length=100000, description="Households to project")
+    accounts: Dict[str, AccountAssumptions] = Field({}, description="Per-account overrides keyed by 401k, ira or taxable")
+    income_growth: float = Field(0.03, ge=-0.2, le=0.5, description="Annual income growth")
+    employer_match_rate: float = Field(0.5, ge=0, le=2, description="Employer match per employee 401(k) dollar")
+    employer_match_cap: float = Field(0.06, ge=0, le=1, description="Share of pay eligible for the employer match")
+    mortgage_rate: float = Field(0.065, ge=0, le=0.3, description="Mortgage interest rate")
+    home_appreciation: float = Field(0.03, ge=-0.2, le=0.3, description="Annual home price growth")
+    include_paths: bool = Field(False, description="Return yearly balances for each account")
+
+    @model_validator(mode="after")
+    def check_accounts(self):
+        unknown = set(self.accounts) - set(INVESTMENT_ACCOUNTS)
+        if unknown:
+            raise ValueError(f"Unknown accounts: {', '.join(sorted(unknown))}")
+        return self
+
+class SimulationInput(RetirementInput):
+    n_paths: int = Field(10000, ge=1000, le=100000, description="Number of simulated market paths")
+    annual_return: float = Field(0.065, ge=-0.5, le=0.5, description="Mean annual return")
+    return_volatility: float = Field(0.15, ge=0, le=1, description="Standard deviation of annual returns")
+    inflation_rate: float = Field(0.03, ge=-0.1, le=0.5, description="Mean annual inflation")
+    inflation_volatility: float = Field(0.01, ge=0, le=0.2, description="Standard deviation of annual inflation")
+    contribution_rate: float = Field(0.15, ge=0, le=1, description="Share of income contributed each year")
+    seed: Optional[int] = Field(None, ge=0, description="Random seed for reproducible simulations")
+
+class SensitivityInput(RetirementInput):
+    contribution_rates: List[Annotated[float, Field(ge=0, le=1)]] = Field(
+        [0.10, 0.15, 0.20, 0.25, 0.30], min_length=1, description="Contribution rates to sweep"
+    )
+    annual_returns: List[Annotated[float, Field(gt=-1, le=1)]] = Field(
+        [0.04, 0.05, 0.065, 0.08], min_length=1, description="Annual returns to sweep"
+    )
+    retirement_ages: Optional[List[Annotated[int, Field(ge=40, le=120)]]] = Field(
+        None, min_length=1, description="Retirement ages to sweep (defaults to target age ±5)"
+    )
+    inflation_rates: Optional[List[Annotated[float, Field(gt=-1, le=1)]]] = Field(
+        None, min_length=1, description="Inflation rates to sweep for real-dollar results"
+    )
+
+    @model_validator(mode="after")
+    def check_grid_size(self):
+        cells = len(self.contribution_rates) * len(self.annual_returns) * len(self.retirement_ages or range(11))
+        cells *= len(self.inflation_rates or [None])
+        if cells > MAX_GRID_CELLS:
+            raise ValueError(f"Sensitivity grid has {cells} cells; the maximum is {MAX_GRID_CELLS}")
+        return self
+
 class FeedbackInput(BaseModel):
     plan_id: str = Field(..., description="ID of the retirement plan")
     rating: int = Field(..., ge=1, le=5, description="Rating from 1-5")
@@ -62,15 +165,109 @@ class QueryInput(BaseModel):
 # Models and Index Setup (Lazy Loading)
 # ────────────────────────────────────────────────────────────────────────────────
 
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+CROSS_ENCODER_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+# Model runtime: torch, torch-int8, onnx or onnx-int8, with an optional intra-op thread count
+INFERENCE_BACKEND = os.getenv("RETIREMENT_INFERENCE_BACKEND", "torch")
+INFERENCE_THREADS = int(os.getenv("RETIREMENT_INFERENCE_THREADS", 0)) or None
+if INFERENCE_BACKEND not in INFERENCE_BACKENDS:
+    logger.warning(f"Unknown RETIREMENT_INFERENCE_BACKEND {INFERENCE_BACKEND!r}, falling back to torch")
+    INFERENCE_BACKEND = "torch"
+# Embeddings differ slightly between backends, so cached vectors from another backend are not reused
+EMBEDDING_CACHE_ID = EMBEDDING_MODEL_NAME if INFERENCE_BACKEND == "torch" else f"{EMBEDDING_MODEL_NAME}:{INFERENCE_BACKEND}"
+EMBEDDING_BATCH_SIZE = int(os.getenv("RETIREMENT_EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_DIMENSION = 384
+INDEX_CACHE_DIR = os.getenv("RETIREMENT_INDEX_CACHE_DIR", "data/index_cache")
+# FAISS index type (flat, ivf, hnsw or sq8) and its tuning knobs
+INDEX_TYPE = os.getenv("RETIREMENT_INDEX_TYPE", "flat")
+INDEX_PARAMS = {
+    "nlist": int(os.getenv("RETIREMENT_INDEX_NLIST", 0)) or None,
+    "nprobe": int(os.getenv("RETIREMENT_INDEX_NPROBE", 0)) or None,
+    "m": int(os.getenv("RETIREMENT_INDEX_HNSW_M", 0)) or None,
+    "ef_search": int(os.getenv("RETIREMENT_INDEX_EF_SEARCH", 0)) or None
+}
+INDEX_MMAP = os.getenv("RETIREMENT_INDEX_MMAP", "false").lower() == "true"
+# Fused FAISS + BM25 candidates passed to the cross encoder
+RERANK_CANDIDATES = int(os.getenv("RETIREMENT_RERANK_CANDIDATES", 5))
+# Adaptive mode picks the rerank depth per query from the FAISS distance margin
+ADAPTIVE_RERANK = os.getenv("RETIREMENT_ADAPTIVE_RERANK", "false").lower() == "true"
+RERANK_BUDGET_MS = float(os.getenv("RETIREMENT_RERANK_BUDGET_MS", 0)) or None
+RERANK_ESCALATION_FACTOR = 2
+if INDEX_TYPE not in INDEX_TYPES:
+    logger.warning(f"Unknown RETIREMENT_INDEX_TYPE {INDEX_TYPE!r}, falling back to flat")
+    INDEX_TYPE = "flat"
+SPLITTER_SETTINGS = {
+    "chunk_size": 800,
+    "chunk_overlap": 200,
+    "separators": ["\n\n", "\n", ".", "!", "?"]
+}
+
 @lru_cache(maxsize=1)
 def get_embedding_model():
-    logger.info("Initializing embedding model")
-    return SentenceTransformer("all-MiniLM-L6-v2")
+    logger.info(f"Initializing embedding model ({INFERENCE_BACKEND} backend)")
+    with readiness.loading("embedding_model"):
+        return load_embedding_model(EMBEDDING_MODEL_NAME, INFERENCE_BACKEND, INFERENCE_THREADS)
 
 @lru_cache(maxsize=1)
 def get_cross_encoder():
-    logger.info("Initializing cross encoder model")
-    return CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
+    logger.info(f"Initializing cross encoder model ({INFERENCE_BACKEND} backend)")
+    with readiness.loading("cross_encoder"):
+        return load_cross_encoder(CROSS_ENCODER_MODEL_NAME, INFERENCE_BACKEND, INFERENCE_THREADS)
+
+# Concurrent requests share forward passes: each batcher waits up to a few
+# milliseconds for more queries or query/chunk pairs before calling the model
+INFERENCE_MAX_BATCH = int(os.getenv("RETIREMENT_INFERENCE_MAX_BATCH", 64))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("RETIREMENT_INFERENCE_MAX_WAIT_MS", 5))
+embedding_batcher = InferenceBatcher(
+    "embedding",
+    lambda texts: get_embedding_model().encode(texts, batch_size=EMBEDDING_BATCH_SIZE),
+    max_batch_size=INFERENCE_MAX_BATCH,
+    max_wait_ms=INFERENCE_MAX_WAIT_MS
+)
+rerank_stats = RerankStats()
+
+def predict_rerank_pairs(pairs):
+    """One cross-encoder forward pass, timed without the batching delay for the adaptive depth budget"""
+    cross_encoder = get_cross_encoder()
+    start = time.perf_counter()
+    scores = cross_encoder.predict(pairs, batch_size=INFERENCE_MAX_BATCH)
+    rerank_stats.record_forward(len(pairs), time.perf_counter() - start)
+    return scores
+
+rerank_batcher = InferenceBatcher(
+    "rerank",
+    predict_rerank_pairs,
+    max_batch_size=INFERENCE_MAX_BATCH,
+    max_wait_ms=INFERENCE_MAX_WAIT_MS
+)
+
+# Bounded caches for retrieval inference, cleared whenever the index is rebuilt
+query_embedding_cache = LRUCache(int(os.getenv("RETIREMENT_QUERY_CACHE_SIZE", 1024)))
+rerank_score_cache = LRUCache(int(os.getenv("RETIREMENT_RERANK_CACHE_SIZE", 8192)))
+
+def embed_query(query: str) -> np.ndarray:
+    """Embed a refined query, reusing the cached embedding when available"""
+    embedding = query_embedding_cache.get(query)
+    if embedding is None:
+        embedding = np.asarray(embedding_batcher.submit([query])[0], dtype=np.float32)
+        query_embedding_cache.put(query, embedding)
+    return embedding
+
+def rerank_scores(query: str, candidates) -> List[float]:
+    """Cross-encoder scores for query/chunk pairs, predicting only uncached pairs"""
+    keys = [(query, doc.metadata.get("chunk_id", doc.page_content)) for doc in candidates]
+    scores = [rerank_score_cache.get(key) for key in keys]
+    missing = [i for i, score in enumerate(scores) if score is None]
+    if missing:
+        predicted = rerank_batcher.submit([(query, candidates[i].page_content) for i in missing])
+        for i, score in zip(missing, predicted):
+            scores[i] = float(score)
+            rerank_score_cache.put(keys[i], scores[i])
+    return scores
+
+def clear_retrieval_caches():
+    query_embedding_cache.clear()
+    rerank_score_cache.clear()
 
 class IndexManager:
     _instance = None
@@ -79,29 +276,53 @@ class IndexManager:
         if cls._instance is None:
             logger.info("Creating new IndexManager instance")
             cls._instance = super(IndexManager, cls).__new__(cls)
-            cls._instance.index = faiss.IndexFlatL2(384)
+            cls._instance.index = None
             cls._instance.document_store = []
+            cls._instance.fact_index = None
+            cls._instance.bm25_index = None
             cls._instance.initialized = False
+            cls._instance._init_lock = threading.Lock()
         return cls._instance
 
     def initialize(self, force=False):
-        if self.initialized and not force:
-            return
-        logger.info("Initializing index")
-        self.index = faiss.IndexFlatL2(384)
-        self.document_store = []
-        self.process_retirement_text()
-        self.initialized = True
+        # Background warm-up and the first request may race to initialize
+        with self._init_lock:
+            if self.initialized and not force:
+                return
+            logger.info("Initializing index")
+            with readiness.loading("retrieval_index"):
+                self.index = None
+                self.document_store = []
+                self.process_retirement_text()
+                # Lexical indexes are cheap to build and live next to the FAISS index
+                self.fact_index = FactIndex(load_retirement_facts())
+                self.bm25_index = BM25Index([doc.page_content for doc in self.document_store])
+                # Cached scores refer to chunk IDs of the previous index
+                clear_retrieval_caches()
+                self.initialized = True
     
-    def process_retirement_text(self, file_path="data/retirement_facts.txt"):
+    def process_retirement_text(self, file_path="data/retirement_facts.txt", cache_dir=INDEX_CACHE_DIR):
+        from langchain_core.documents import Document
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 text = f.read()
 
+            # Reuse the persisted index when the text, splitter and model are unchanged
+            cache_key = content_hash(text, SPLITTER_SETTINGS, EMBEDDING_CACHE_ID, INDEX_TYPE, INDEX_PARAMS)
+            cached = load_index_artifacts(cache_dir, cache_key, mmap=INDEX_MMAP)
+            if cached is not None:
+                self.index = configure_search(cached["index"], **INDEX_PARAMS)
+                self.document_store = [
+                    Document(page_content=chunk["page_content"], metadata=chunk["metadata"])
+                    for chunk in cached["chunks"]
+                ]
+                logger.info(f"Loaded {len(self.document_store)} indexed chunks from {cache_dir}")
+                return True
+
             text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=800,
-                chunk_overlap=200,
-                separators=["\n\n", "\n", ".", "!", "?"],
+                **SPLITTER_SETTINGS,
                 length_function=len
             )
             doc = Document(page_content=text)
@@ -116,10 +337,31 @@ class IndexManager:
                     "chunk_type": "contextual"
                 }
 
-            embeddings = [get_embedding_model().encode(split.page_content) for split in splits]
-            self.index.add(np.array(embeddings, dtype=np.float32))
+            # Only embed chunks whose content changed since the last build
+            chunk_hashes = [content_hash(split.page_content, EMBEDDING_CACHE_ID) for split in splits]
+            cached_vectors = load_cached_vectors(cache_dir)
+            missing = [i for i, chunk_hash in enumerate(chunk_hashes) if chunk_hash not in cached_vectors]
+            if missing:
+                encoded = get_embedding_model().encode(
+                    [splits[i].page_content for i in missing],
+                    batch_size=EMBEDDING_BATCH_SIZE,
+                    convert_to_numpy=True
+                )
+                cached_vectors.update(zip((chunk_hashes[i] for i in missing), encoded))
+
+            embeddings = np.array([cached_vectors[chunk_hash] for chunk_hash in chunk_hashes], dtype=np.float32).reshape(-1, EMBEDDING_DIMENSION)
+            self.index = build_index(INDEX_TYPE, embeddings, EMBEDDING_DIMENSION, **INDEX_PARAMS)
             self.document_store = splits
-            logger.info(f"Indexed {len(splits)} chunks from retirement_fact.txt")
+            logger.info(f"Indexed {len(splits)} chunks from retirement_fact.txt ({len(missing)} newly embedded)")
+
+            save_index_artifacts(
+                cache_dir,
+                cache_key,
+                self.index,
+                embeddings,
+                chunk_hashes,
+                [{"page_content": split.page_content, "metadata": split.metadata} for split in splits]
+            )
             return True
         except Exception as e:
             logger.error(f"Error processing retirement text: {e}")
@@ -167,46 +409,13 @@ def is_rule_based_query(query: str) -> bool:
     ]
     return any(keyword in query.lower() for keyword in rule_keywords)
 
-def retrieve_from_json(query: str, json_facts: dict) -> str:
+def retrieve_from_json(query: str, json_facts: dict, fact_index: Optional[FactIndex] = None) -> str:
     """Query structured JSON facts for rule-based information"""
     
-    # Simple keyword matching for now, but could be enhanced with more
-    # sophisticated techniques like a small LLM for structured data extraction
-    query_terms = query.lower().split()
-    matching_facts = []
-    
-    def search_dict(d, path=""):
-        results = []
-        for k, v in d.items():
-            key = k.replace("_", " ").lower()
-            current_path = f"{path}.{key}" if path else key
-            
-            # Check if any query term is in the key
-            if any(term in key for term in query_terms):
-                if isinstance(v, dict):
-                    results.append((current_path, flatten_dict(v)))
-                else:
-                    results.append((current_path, str(v)))
-            
-            # Recursively search nested dictionaries
-            if isinstance(v, dict):
-                results.extend(search_dict(v, current_path))
-        
-        return results
-    
-    # Flatten nested dict for display
-    def flatten_dict(d, prefix=''):
-        result = []
-        for k, v in d.items():
-            key = k.replace("_", " ")
-            if isinstance(v, dict):
-                result.append(f"{key}:")
-                result.extend([f"  {x}" for x in flatten_dict(v)])
-            else:
-                result.append(f"{key}: {v}")
-        return result
-    
-    matching_facts = search_dict(json_facts)
+    # Term lookups against the inverted index over fact keys and values
+    if fact_index is None:
+        fact_index = FactIndex(json_facts)
+    matching_facts = fact_index.search(query)
     
     # Format the results
     if matching_facts:
@@ -222,32 +431,120 @@ def retrieve_from_json(query: str, json_facts: dict) -> str:
     else:
         return "No specific rules found in structured data. Please check the contextual information."
 
-def hybrid_retrieve(query: str, user_data: Optional[Dict[str, Any]] = None, index_manager=None, k=8, top_n=3) -> str:
-    """Use both structured and unstructured data sources based on query type"""
+def hybrid_retrieve_chunks(query: str, user_data: Optional[Dict[str, Any]] = None, index_manager=None,
+                           k=8, top_n=3) -> Tuple[str, List[str]]:
+    """Use both structured and unstructured data sources based on query type.
+
+    Returns the structured facts found for rule-based queries (empty for
+    contextual ones) and the retrieved chunks in relevance order, kept
+    separate so callers can budget the chunks without splitting them apart.
+    """
     
     # Refine the query first
     refined_query = refine_query(query, user_data)
     
+    if index_manager is None:
+        index_manager = get_index_manager()
+    
     # Load retirement facts
     json_facts = load_retirement_facts()
     
     # Route to appropriate retrieval method
+    structured_results = ""
     if is_rule_based_query(refined_query):
         logger.info("Using structured retrieval for rule-based query")
-        structured_results = retrieve_from_json(refined_query, json_facts)
+        structured_results = retrieve_from_json(refined_query, json_facts, getattr(index_manager, "fact_index", None))
         
         # If structured retrieval found little, supplement with semantic search
-        if len(structured_results.split('\n')) < 5:
-            logger.info("Supplementing with semantic search")
-            semantic_results = retrieve_with_rerank(refined_query, index_manager, k, top_n)
-            return f"{structured_results}\n\nAdditional context:\n\n{semantic_results}"
-        return structured_results
+        if len(structured_results.split('\n')) >= 5:
+            return structured_results, []
+        logger.info("Supplementing with semantic search")
     else:
         logger.info("Using semantic search for contextual query")
-        return retrieve_with_rerank(refined_query, index_manager, k, top_n)
 
-def retrieve_with_rerank(prompt: str, index_manager=None, k=8, top_n=3) -> str:
-    """Retrieve context using semantic search with reranking"""
+    if not getattr(index_manager, "document_store", None):
+        logger.warning("No documents indexed")
+        return structured_results, []
+    try:
+        return structured_results, retrieve_chunks(refined_query, index_manager, k, top_n)
+    except Exception as e:
+        logger.error(f"Error in retrieve_chunks: {e}")
+        return structured_results, []
+
+def hybrid_retrieve(query: str, user_data: Optional[Dict[str, Any]] = None, index_manager=None, k=8, top_n=3) -> str:
+    """Structured facts and retrieved chunks for a query as one text"""
+    structured_results, chunks = hybrid_retrieve_chunks(query, user_data, index_manager, k, top_n)
+    semantic_results = "\n\n".join(chunks) or "No relevant information found."
+    if not structured_results:
+        return semantic_results
+    if not chunks:
+        return structured_results
+    return f"{structured_results}\n\nAdditional context:\n\n{semantic_results}"
+
+def retrieve_chunks(prompt: str, index_manager=None, k=8, top_n=3, rerank_k=None,
+                    adaptive: Optional[bool] = None, latency_budget_ms: Optional[float] = None) -> List[str]:
+    """Retrieve the ``top_n`` chunks for a query using semantic search with reranking.
+
+    In adaptive mode the number of candidates sent to the cross encoder is
+    chosen per query from the FAISS distances and the latency budget;
+    candidates left unscored keep their fused retrieval order.
+    """
+    if index_manager is None:
+        index_manager = get_index_manager()
+    if not index_manager.document_store:
+        return []
+
+    n_documents = len(index_manager.document_store)
+
+    def semantic_search(depth):
+        D, I = index_manager.index.search(query_embedding[None, :], depth)
+        # Approximate indexes pad missing results with -1
+        valid = [(float(d), int(i)) for d, i in zip(D[0], I[0]) if 0 <= i < n_documents]
+        return [d for d, _ in valid], [i for _, i in valid]
+
+    query_embedding = embed_query(prompt)
+    distances, semantic_ids = semantic_search(k)
+    depth = rerank_k or min(k, RERANK_CANDIDATES)
+
+    decision = None
+    if rerank_k is None and (ADAPTIVE_RERANK if adaptive is None else adaptive):
+        decision = choose_rerank_depth(
+            distances, top_n, max_depth=depth,
+            latency_budget_ms=latency_budget_ms or RERANK_BUDGET_MS,
+            per_pair_ms=rerank_stats.per_pair_ms
+        )
+        if decision["escalate"]:
+            distances, semantic_ids = semantic_search(k * RERANK_ESCALATION_FACTOR)
+        depth = decision["depth"]
+
+    # Fuse with BM25 so lexical matches reach the reranker without a deeper FAISS search
+    bm25_index = getattr(index_manager, "bm25_index", None)
+    lexical_ids = [doc_id for doc_id, _ in bm25_index.search(prompt, len(semantic_ids) or k)] if bm25_index else []
+    fused_ids = reciprocal_rank_fusion([semantic_ids, lexical_ids])[:max(depth, top_n)]
+    candidates = [index_manager.document_store[i] for i in fused_ids]
+
+    scores = rerank_scores(prompt, candidates[:depth]) if depth else []
+    if decision is not None:
+        rerank_stats.record(decision)
+
+    # Include metadata in results
+    results = []
+    for doc, score in zip(candidates[:depth], scores):
+        results.append({
+            "content": doc.page_content,
+            "metadata": doc.metadata,
+            "score": float(score)
+        })
+    
+    sorted_results = sorted(results, key=lambda x: x["score"], reverse=True)
+    sorted_results += [{"content": doc.page_content, "metadata": doc.metadata, "score": None} for doc in candidates[depth:]]
+    sorted_results = sorted_results[:top_n]
+    
+    return [r["content"] for r in sorted_results]
+
+def retrieve_with_rerank(prompt: str, index_manager=None, k=8, top_n=3, rerank_k=None,
+                         adaptive: Optional[bool] = None, latency_budget_ms: Optional[float] = None) -> str:
+    """Retrieve context using semantic search with reranking, as one text (see ``retrieve_chunks``)"""
     if index_manager is None:
         index_manager = get_index_manager()
     
@@ -256,29 +553,7 @@ def retrieve_with_rerank(prompt: str, index_manager=None, k=8, top_n=3) -> str:
         return "No documents indexed."
 
     try:
-        query_embedding = get_embedding_model().encode([prompt])[0]
-        D, I = index_manager.index.search(np.array([query_embedding], dtype=np.float32), k)
-        candidates = [index_manager.document_store[i] for i in I[0] if i < len(index_manager.document_store)]
-
-        pairs = [(prompt, doc.page_content) for doc in candidates]
-        scores = get_cross_encoder().predict(pairs)
-
-        # Include metadata in results
-        results = []
-        for doc, score in zip(candidates, scores):
-            results.append({
-                "content": doc.page_content,
-                "metadata": doc.metadata,
-                "score": float(score)
-            })
-        
-        sorted_results = sorted(results, key=lambda x: x["score"], reverse=True)[:top_n]
-        
-        # Format results with metadata for debugging/transparency
-        return "\n\n".join([
-            f"{r['content']}" 
-            for r in sorted_results
-        ])
+        return "\n\n".join(retrieve_chunks(prompt, index_manager, k, top_n, rerank_k, adaptive, latency_budget_ms))
     except Exception as e:
         logger.error(f"Error in retrieve_with_rerank: {e}")
         return "Error retrieving relevant information."
@@ -319,27 +594,136 @@ def compute_user_key(user_input: dict) -> str:
     serialized = json.dumps(user_input, sort_keys=True)
     return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
 
-def load_plan_cache(path="data/retirement_plan_cache.json") -> dict:
-    """Load cached plans keyed by user input hash."""
-    if not os.path.exists(path):
-        return {}
+# Plan and narrative caches live in SQLite; the JSON files they replace are imported once
+PLAN_CACHE_MAX_ENTRIES = int(os.getenv("RETIREMENT_PLAN_CACHE_MAX_ENTRIES", 10000))
+PLAN_CACHE_TTL_SECONDS = float(os.getenv("RETIREMENT_PLAN_CACHE_TTL_SECONDS", 30 * 24 * 3600)) or None
+LEGACY_PLAN_CACHE_PATH = "data/retirement_plan_cache.json"
+LEGACY_NARRATIVE_CACHE_PATH = "data/retirement_narrative_cache.json"
+
+plan_cache = KVStore(
+    os.getenv("RETIREMENT_PLAN_CACHE_DB", "data/retirement_plan_cache.sqlite3"),
+    max_entries=PLAN_CACHE_MAX_ENTRIES,
+    ttl_seconds=PLAN_CACHE_TTL_SECONDS
+)
+narrative_cache = KVStore(
+    os.getenv("RETIREMENT_NARRATIVE_CACHE_DB", "data/retirement_narrative_cache.sqlite3"),
+    max_entries=PLAN_CACHE_MAX_ENTRIES,
+    ttl_seconds=PLAN_CACHE_TTL_SECONDS
+)
+
+def migrate_plan_caches():
+    """Import the legacy JSON plan and narrative caches into their stores (a no-op after the first run)."""
     try:
-        with open(path, "r") as f:
-            return json.load(f)
+        plan_cache.import_json(LEGACY_PLAN_CACHE_PATH, secondary_field="plan_id")
+        narrative_cache.import_json(LEGACY_NARRATIVE_CACHE_PATH)
     except Exception as e:
-        logger.error(f"Error loading plan cache: {e}")
-        return {}
+        logger.error(f"Error migrating plan caches: {e}")
+
+def get_cached_plan(key: str) -> Optional[dict]:
+    """Cached plan for a user input hash, if any."""
+    return plan_cache.get(key)
+
+def get_cached_plans(keys: List[str]) -> Dict[str, dict]:
+    """Cached plans for several user input hashes, in one lookup."""
+    return plan_cache.get_many(keys)
+
+def find_cached_plan(plan_id: str) -> Optional[dict]:
+    """Cached plan with the given plan ID, if any."""
+    return plan_cache.get_by_secondary(plan_id)
 
-def save_plan_cache(key: str, plan_data: dict, path="data/retirement_plan_cache.json"):
+def discard_provisional_plan(key: str, plan_id: str):
+    """Drop a provisional plan whose upgrade failed, so the next request retries the LLM."""
+    entry = plan_cache.get(key)
+    if entry and entry.get("provisional"):
+        plan_cache.delete(key, secondary_key=plan_id)
+
+def save_plan_cache(key: str, plan_data: dict):
     """Save plan data in cache by key."""
-    cache = load_plan_cache(path)
-    cache[key] = plan_data
+    if "intermediate_calculations" in plan_data:
+        plan_data = {
+            **plan_data,
+            "intermediate_calculations": encode_calculations(plan_data["intermediate_calculations"], PLAN_CACHE_CALC_FORMAT)
+        }
     try:
-        with open(path, "w") as f:
-            json.dump(cache, f, indent=2)
+        plan_cache.put(key, plan_data, secondary_key=plan_data.get("plan_id"))
     except Exception as e:
         logger.error(f"Error saving plan cache: {e}")
 
+narrative_cache_stats = NarrativeCacheStats()
+
+def narrative_signature(user_input: dict, metrics: dict) -> str:
+    """Quantized profile under which a narrative is shared"""
+    return profile_signature(
+        age=int(user_input.get('age') or 0),
+        income=float(user_input.get('income') or 0),
+        savings=float(user_input.get('currentSavings') or 0),
+        years_left=metrics["years_left"],
+        gap=metrics["gap"],
+        has_mortgage=user_input.get('hasMortgage', 'no') == 'yes',
+        has_investment=user_input.get('hasInvestment', 'no') == 'yes',
+        age_band=NARRATIVE_AGE_BAND,
+        years_left_band=NARRATIVE_YEARS_LEFT_BAND
+    )
+
+def narrative_figures(user_input: dict, metrics: dict) -> Dict[str, tuple]:
+    """The user-specific figures a narrative may quote, as (kind, value)"""
+    user_data = format_user_data(user_input)
+    return {
+        "age": ("age", user_data["age"]),
+        "retirement_age": ("retirement_age", user_data["retirement_age"]),
+        "years_left": ("years", metrics["years_left"]),
+        "income": ("money", user_data["income"]),
+        "savings": ("money", user_data["savings"]),
+        "retirement_goal": ("money", user_data["retirement_goal"]),
+        "mortgage_balance": ("money", user_data["mortgage_balance"] if user_data["has_mortgage"] else None),
+        "investment_value": ("money", user_data["investment_value"] if user_data["has_investment"] else None),
+        "projected_savings": ("money", metrics["projected_savings"]),
+        "gap": ("money", abs(metrics["gap"])),
+        "annual_contribution": ("money", metrics["annual_contribution"]),
+        "required_savings_rate": ("percent", metrics["required_savings_rate"] * 100),
+        "job": ("text", user_data["job"]),
+        "gender": ("text", user_data["gender"])
+    }
+
+def lookup_cached_narrative(user_input: dict, metrics: dict) -> Optional[str]:
+    """A narrative written for a similar profile, re-rendered with this user's figures"""
+    if not NARRATIVE_CACHE_ENABLED:
+        return None
+    signature = narrative_signature(user_input, metrics)
+    entry = narrative_cache.get(signature)
+    narrative = render(entry["template"], narrative_figures(user_input, metrics)) if entry else None
+    narrative_cache_stats.record_lookup(signature, narrative is not None, render_failed=entry is not None and narrative is None)
+    return narrative
+
+@lru_cache(maxsize=1)
+def narrative_fact_values() -> frozenset:
+    """Amounts in the knowledge base, which a shared narrative may quote as written"""
+    texts = [flatten_facts(load_retirement_facts())]
+    try:
+        with open("data/retirement_facts.txt", encoding="utf-8") as f:
+            texts.append(f.read())
+    except OSError as e:
+        logger.warning(f"Narrative cache cannot read retirement_facts.txt: {e}")
+    return frozenset(figure_values("\n".join(texts)))
+
+def remember_narrative(user_input: dict, metrics: dict, plan: str):
+    """Store an LLM narrative as a template for users with the same profile signature.
+
+    Narratives quoting an amount that is neither the user's figure nor a
+    knowledge-base fact are not stored, since it was likely derived from
+    this user's finances.
+    """
+    if not NARRATIVE_CACHE_ENABLED:
+        return
+    template = templatize(plan, narrative_figures(user_input, metrics), narrative_fact_values())
+    narrative_cache_stats.record_store(template is not None)
+    if template is None:
+        return
+    try:
+        narrative_cache.put(narrative_signature(user_input, metrics), {"template": template, "created_at": datetime.now().isoformat()})
+    except Exception as e:
+        logger.error(f"Error saving narrative cache: {e}")
+
 # ────────────────────────────────────────────────────────────────────────────────
 # Format User Input with Enhanced Validation
 # ────────────────────────────────────────────────────────────────────────────────
@@ -382,84 +766,110 @@ def format_user_data(user_input):
 # Prompt Generator with Personalization
 # ────────────────────────────────────────────────────────────────────────────────
 
-def create_prompt(user_data: dict, json_facts: str, rag_context: str, 
+# Token budgets for the stable facts prefix and the per-request retrieved context
+PROMPT_STATIC_FACTS_TOKENS = int(os.getenv("RETIREMENT_PROMPT_STATIC_FACTS_TOKENS", 1000))
+PROMPT_CONTEXT_TOKENS = int(os.getenv("RETIREMENT_PROMPT_CONTEXT_TOKENS", 1500))
+
+PLAN_SYSTEM_TEMPLATE = """You are a retirement planning assistant. Use structured facts,
+retrieved context, user input, and similar user insights to create a personalized plan.
+The plan should be detailed, actionable, and tailored to the user's specific situation.
+Also, it should be detailed and personalized to the user.
+
+[Structured Facts]
+{{ static_facts }}
+"""
+
+PLAN_USER_TEMPLATE = """[User Info]
+Age: {{ age }}
+Income: ${{ income }}
+Savings: ${{ savings }}
+Retirement Goal: ${{ retirement_goal }}
+Retirement Age: {{ retirement_age }}
+{% if has_mortgage %}
+Mortgage: ${{ mortgage_balance }} over {{ mortgage_term }} years
+{% endif %}
+{% if has_investment %}
+Investments: ${{ investment_value }}
+{% endif %}
+
+[Retrieved Context]
+{% if structured_context %}
+{{ structured_context }}
+
+{% endif %}
+{% for snippet in context %}
+{{ snippet }}
+
+{% endfor %}
+{% if similar_profiles %}
+[Similar Profile Insights]
+{% for profile in similar_profiles %}
+Similar profile ({{ profile.similarity }}% match):
+- Age: {{ profile.age }}, Income: ${{ profile.income }}, Savings: ${{ profile.savings }}
+- Recommended strategy: {{ profile.strategy }}
+{% endfor %}
+
+{% endif %}
+[Request]
+Please generate a detailed and personalized retirement strategy using all the information above.
+"""
+
+plan_prompt_builder = PromptBuilder(
+    PLAN_SYSTEM_TEMPLATE,
+    PLAN_USER_TEMPLATE,
+    context_budget=PROMPT_CONTEXT_TOKENS,
+    static_facts_budget=PROMPT_STATIC_FACTS_TOKENS
+)
+
+def create_prompt(user_data: dict, json_facts: str, structured_context: str, context_chunks: List[str],
                   similar_profiles: Optional[List[Dict]] = None) -> tuple[str, str]:
-    """Enhanced prompt generator with personalization based on similar profiles"""
-    
-    system_prompt = """You are a retirement planning assistant. Use structured facts, 
-    retrieved context, user input, and similar user insights to create a personalized plan.
-    The plan should be detailed, actionable, and tailored to the user's specific situation.
-    Also, it should be detailed and personalized to the user."""
-
-    personalization_template = ""
-    if similar_profiles and len(similar_profiles) > 0:
-        personalization_template = """
-        [Similar Profile Insights]
-        {% for profile in similar_profiles %}
-        Similar profile ({{ profile.similarity }}% match):
-        - Age: {{ profile.age }}, Income: ${{ profile.income }}, Savings: ${{ profile.savings }}
-        - Recommended strategy: {{ profile.strategy }}
-        {% endfor %}
-        """
-
-    user_template = """
-    [User Info]
-    Age: {{ age }}
-    Income: ${{ income }}
-    Savings: ${{ savings }}
-    Retirement Goal: ${{ retirement_goal }}
-    Retirement Age: {{ retirement_age }}
-    {% if has_mortgage %}
-    Mortgage: ${{ mortgage_balance }} over {{ mortgage_term }} years
-    {% endif %}
-    {% if has_investment %}
-    Investments: ${{ investment_value }}
-    {% endif %}
-
-    [Structured Facts]
-    {{ json_facts }}
-
-    [Retrieved Context]
-    {{ rag_context }}
-    
-    {{ personalization }}
-
-    [Request]
-    Please generate a detailed and personalized retirement strategy using all the information above.
-    """
+    """Enhanced prompt generator with personalization based on similar profiles.
 
-    full_prompt = Template(user_template + personalization_template).render(
-        **user_data, 
-        json_facts=json_facts, 
-        rag_context=clean_rag_facts(rag_context),
+    ``json_facts`` go in the system prompt, which stays identical across
+    requests.  The structured facts matched for this request open the
+    retrieved context as is; the retrieved chunks follow, whole and by
+    relevance, until the context token budget is spent.
+    """
+    prompt = plan_prompt_builder.build(
+        json_facts,
+        [chunk.strip() for chunk in context_chunks if chunk.strip()],
+        structured_context=structured_context.strip(),
         similar_profiles=similar_profiles or [],
-        personalization=personalization_template if similar_profiles else ""
+        **user_data
     )
-    
-    return system_prompt, full_prompt
+    logger.debug(
+        f"Prompt ~{prompt['prompt_tokens']} tokens, {prompt['context_tokens']} of context "
+        f"({prompt['context_dropped']} snippets over budget)"
+    )
+    return prompt["system_prompt"], prompt["user_prompt"]
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Call Ollama with Better Error Handling
 # ────────────────────────────────────────────────────────────────────────────────
 
-def call_ollama(system_prompt, user_prompt, max_retries=2):
-    """Call Ollama with retry logic and better error handling"""
-    for attempt in range(max_retries + 1):
-        try:
-            response = ollama.chat(
-                model="llama3:8b",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ]
-            )
-            return response["message"]["content"]
-        except Exception as e:
-            logger.error(f"Ollama call failed (attempt {attempt+1}/{max_retries+1}): {e}")
-            if attempt == max_retries:
-                raise Exception(f"Failed to generate response after {max_retries+1} attempts: {e}")
-            # Wait before retrying (exponential backoff)
-            time.sleep(2 ** attempt)
+LLM_MODEL = os.getenv("RETIREMENT_LLM_MODEL", "llama3:8b")
+# Budget for one narrative, including queueing for a model slot and retries
+LLM_DEADLINE_SECONDS = float(os.getenv("RETIREMENT_LLM_DEADLINE_SECONDS", 120))
+llm_client = LLMClient(
+    LLM_MODEL,
+    host=os.getenv("OLLAMA_HOST"),
+    max_concurrency=int(os.getenv("RETIREMENT_LLM_CONCURRENCY", 2)),
+    max_queue=int(os.getenv("RETIREMENT_LLM_QUEUE", 32)),
+    keep_alive=os.getenv("RETIREMENT_LLM_KEEP_ALIVE") or None
+)
+
+# Default latency SLO for /plan: past it a provisional fallback plan is served
+# and the LLM narrative replaces it in the background (0 waits for the LLM)
+PLAN_SLO_SECONDS = float(os.getenv("RETIREMENT_PLAN_SLO_SECONDS", 0)) or None
+
+def llm_deadline(deadline_seconds: Optional[float] = None) -> float:
+    """Absolute deadline on the monotonic clock for a narrative started now"""
+    return time.monotonic() + (deadline_seconds or LLM_DEADLINE_SECONDS)
+
+def slo_deadline(slo_seconds: Optional[float] = None) -> Optional[float]:
+    """Monotonic time after which a provisional plan is served, or None to wait for the LLM"""
+    slo_seconds = slo_seconds or PLAN_SLO_SECONDS
+    return time.monotonic() + slo_seconds if slo_seconds else None
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Find Similar User Profiles for Personalization
@@ -516,11 +926,28 @@ def find_similar_profiles(user_data, max_profiles=3):
 # Create Retirement Plan with Intermediate Calculations
 # ────────────────────────────────────────────────────────────────────────────────
 
-def create_retirement_plan(user_input: dict):
-    """Generate retirement plan with intermediate calculations"""
-    # Generate a unique ID for this plan
-    plan_id = str(uuid.uuid4())
+def compute_plan_metrics(user_inputs: List[dict]) -> List[dict]:
+    """Compute the numeric plan metrics for a batch of users in one vectorized pass"""
+    annual_return = 0.065
+    scores = project_population(user_inputs, contribution_rate=0.15, annual_return=annual_return)
     
+    return [
+        {
+            "projected_savings": float(scores["projected_savings"][i]),
+            "years_left": int(scores["years_left"][i]),
+            "gap": float(scores["gap"][i]),
+            "required_savings_rate": float(scores["required_savings_rate"][i]),
+            "annual_contribution": float(scores["annual_contribution"][i]),
+            "annual_return": annual_return,
+            "intermediate_calculations": to_intermediate_calculations(
+                scores["projection"], int(scores["age"][i]), i
+            )
+        }
+        for i in range(len(user_inputs))
+    ]
+
+def prepare_plan_narrative(user_input: dict, metrics: Optional[dict] = None) -> dict:
+    """Gather everything the narrative needs: metrics, similar profiles, prompts and fallback inputs"""
     # Extract and calculate all metrics using Python
     current_age = int(user_input.get('age') or 0)
     retirement_age = int(user_input.get('retirementAge') or 0)
@@ -538,52 +965,17 @@ def create_retirement_plan(user_input: dict):
     has_insurance = user_input.get('hasInsurance', 'no') == 'yes'
     insurance_payment = float(user_input.get('insurancePayment') or 0)
     
-    # Calculate all metrics
-    years_left = retirement_age - current_age
-    annual_contribution = income * 0.15
-    annual_return = 0.065
-    
-    # Track intermediate calculations for transparency
-    intermediate_calculations = {
-        "contributions": [],
-        "growth": [],
-        "cumulative": []
-    }
-    
-    # Projected savings calculation with intermediate steps
-    projected_savings = current_savings
-    cumulative = current_savings
-    
-    for year in range(1, years_left + 1):
-        # Growth on existing savings
-        year_growth = projected_savings * annual_return
-        
-        # Add this year's contribution
-        contribution = annual_contribution
-        
-        # Update projected savings
-        projected_savings = projected_savings + year_growth + contribution
-        
-        # Store intermediate calculations
-        intermediate_calculations["contributions"].append({
-            "year": current_age + year,
-            "amount": contribution
-        })
-        
-        intermediate_calculations["growth"].append({
-            "year": current_age + year,
-            "amount": year_growth
-        })
-        
-        intermediate_calculations["cumulative"].append({
-            "year": current_age + year,
-            "amount": projected_savings
-        })
-    
-    # Calculate gap and required savings rate
-    gap = goal - projected_savings
-    required_savings_rate = (goal - current_savings) / (income * years_left) if years_left > 0 else 0
-    required_savings_rate = min(max(required_savings_rate, 0.15), 0.50)
+    # Projected savings, gap and required savings rate, with per-year
+    # intermediate steps for transparency
+    if metrics is None:
+        metrics = compute_plan_metrics([user_input])[0]
+    years_left = metrics["years_left"]
+    annual_contribution = metrics["annual_contribution"]
+    annual_return = metrics["annual_return"]
+    projected_savings = metrics["projected_savings"]
+    intermediate_calculations = metrics["intermediate_calculations"]
+    gap = metrics["gap"]
+    required_savings_rate = metrics["required_savings_rate"]
     
     # Calculate benchmarks
     age_benchmarks = {
@@ -614,7 +1006,7 @@ def create_retirement_plan(user_input: dict):
     
     # Use hybrid retrieval
     index_manager = get_index_manager()
-    rag_context = hybrid_retrieve(retirement_query, user_input, index_manager)
+    structured_context, context_chunks = hybrid_retrieve_chunks(retirement_query, user_input, index_manager)
     
     # Format user data for prompt
     formatted_user_data = format_user_data(user_input)
@@ -622,18 +1014,18 @@ def create_retirement_plan(user_input: dict):
     # Create the prompt
     system_prompt, user_prompt = create_prompt(
         formatted_user_data, 
-        json_facts, 
-        rag_context,
+        json_facts,
+        structured_context,
+        context_chunks,
         similar_profiles
     )
     
-    # Call the LLM
-    try:
-        llm_response = call_ollama(system_prompt, user_prompt)
-        plan = llm_response
-    except Exception as e:
-        logger.error(f"Error generating plan with LLM: {str(e)}")
-        plan = generate_fallback_plan({
+    return {
+        "metrics": metrics,
+        "similar_profiles": similar_profiles,
+        "system_prompt": system_prompt,
+        "user_prompt": user_prompt,
+        "fallback_data": {
             "user_profile": {
                 "age": current_age,
                 "gender": gender,
@@ -665,20 +1057,125 @@ def create_retirement_plan(user_input: dict):
                 "return_rate": 0.065,
                 "inflation_rate": 0.03
             }
-        })
+        }
+    }
 
+def assemble_plan(plan_id: str, plan: str, prepared: dict, narrative_source: str = "llm",
+                  provisional: bool = False) -> dict:
+    """Combine a finished narrative with its numeric metrics into the cached plan record"""
+    metrics = prepared["metrics"]
     return {
         "plan_id": plan_id,
         "plan": plan,
-        "projected_savings": projected_savings,
-        "years_left": years_left,
-        "gap": gap,
-        "required_savings_rate": required_savings_rate,
-        "intermediate_calculations": intermediate_calculations,
-        "similar_profiles": similar_profiles,
+        "narrative_source": narrative_source,
+        "provisional": provisional,
+        "projected_savings": metrics["projected_savings"],
+        "years_left": metrics["years_left"],
+        "gap": metrics["gap"],
+        "required_savings_rate": metrics["required_savings_rate"],
+        "intermediate_calculations": metrics["intermediate_calculations"],
+        "similar_profiles": prepared["similar_profiles"],
         "status": "success"
     }
 
+# Background LLM generations that will replace a provisional plan, by plan ID.
+# Only this process's tasks are here; whether an upgrade is pending is read
+# from the cached plan so every server worker agrees on it.
+_plan_upgrades: Dict[str, asyncio.Task] = {}
+plan_upgrade_stats = {"started": 0, "completed": 0, "failed": 0}
+# Slack past the LLM deadline before a provisional plan's upgrade is presumed lost
+PLAN_UPGRADE_GRACE_SECONDS = 30
+
+async def upgrade_provisional_plan(generation: asyncio.Future, key: str, plan_id: str, user_input: dict, prepared: dict):
+    """Replace a provisional plan in the cache with the LLM narrative once it finishes"""
+    try:
+        plan = await generation
+    except Exception as e:
+        logger.error(f"Error upgrading provisional plan {plan_id}: {str(e)}")
+        plan_upgrade_stats["failed"] += 1
+        await asyncio.to_thread(discard_provisional_plan, key, plan_id)
+        return
+    await asyncio.to_thread(remember_narrative, user_input, prepared["metrics"], plan)
+    await asyncio.to_thread(save_plan_cache, key, assemble_plan(plan_id, plan, prepared))
+    plan_upgrade_stats["completed"] += 1
+    logger.info(f"Provisional plan {plan_id} upgraded to the LLM narrative")
+
+def start_plan_upgrade(generation: asyncio.Future, key: str, plan_id: str, user_input: dict, prepared: dict):
+    task = asyncio.create_task(upgrade_provisional_plan(generation, key, plan_id, user_input, prepared))
+    _plan_upgrades[plan_id] = task
+    plan_upgrade_stats["started"] += 1
+    task.add_done_callback(lambda _: _plan_upgrades.pop(plan_id, None))
+
+def mark_upgrade_pending(provisional: dict, deadline: float) -> dict:
+    """Lease a provisional plan's upgrade until its LLM deadline, in wall-clock time shared by all workers"""
+    return {
+        **provisional,
+        "upgrade_started_at": time.time(),
+        "upgrade_lease_seconds": max(deadline - time.monotonic(), 0) + PLAN_UPGRADE_GRACE_SECONDS
+    }
+
+def plan_upgrade_pending(plan_data: Optional[dict]) -> bool:
+    """True while some worker may still replace this provisional plan with the LLM narrative"""
+    if not plan_data or not plan_data.get("provisional"):
+        return False
+    started = plan_data.get("upgrade_started_at")
+    return started is not None and time.time() < started + plan_data.get("upgrade_lease_seconds", 0)
+
+def is_servable_cached_plan(plan_data: Optional[dict]) -> bool:
+    """False for a provisional plan whose upgrade lease ran out (e.g. its worker restarted),
+    which should be regenerated under the same plan ID"""
+    return bool(plan_data) and not (plan_data.get("provisional") and not plan_upgrade_pending(plan_data))
+
+async def create_retirement_plan(user_input: dict, metrics: Optional[dict] = None, plan_id: Optional[str] = None,
+                                 deadline: Optional[float] = None, slo: Optional[float] = None):
+    """Generate retirement plan with intermediate calculations.
+
+    Reuses a cached narrative for a similar profile when there is one, and
+    falls back to the rule-based plan if the LLM fails or misses the deadline.
+    If the narrative is not ready by the ``slo`` time the fallback plan is
+    cached and returned as provisional while the LLM keeps generating; the
+    finished narrative then replaces it in the cache under the same plan ID.
+    """
+    # Generate a unique ID for this plan
+    plan_id = plan_id or str(uuid.uuid4())
+    deadline = deadline or llm_deadline()
+    if metrics is None:
+        metrics = (await run_blocking(compute_pool, compute_plan_metrics, [user_input]))[0]
+
+    narrative = await asyncio.to_thread(lookup_cached_narrative, user_input, metrics)
+    if narrative is not None:
+        similar_profiles = await run_blocking(planner_pool, find_similar_profiles, user_input)
+        return assemble_plan(plan_id, narrative, {"metrics": metrics, "similar_profiles": similar_profiles}, "narrative_cache")
+
+    prepared = await run_blocking(planner_pool, prepare_plan_narrative, user_input, metrics)
+
+    # Call the LLM
+    generation = asyncio.ensure_future(llm_client.chat(prepared["system_prompt"], prepared["user_prompt"], deadline))
+    try:
+        timeout = max(slo - time.monotonic(), 0) if slo is not None else None
+        plan = await asyncio.wait_for(asyncio.shield(generation), timeout)
+    except asyncio.TimeoutError:
+        logger.info(f"Plan {plan_id} missed its SLO, serving the fallback plan until the LLM finishes")
+        provisional = mark_upgrade_pending(
+            assemble_plan(plan_id, generate_fallback_plan(prepared["fallback_data"]), prepared, "fallback", provisional=True),
+            deadline
+        )
+        key = compute_user_key(user_input)
+        await asyncio.to_thread(save_plan_cache, key, provisional)
+        start_plan_upgrade(generation, key, plan_id, user_input, prepared)
+        return provisional
+    except asyncio.CancelledError:
+        generation.cancel()
+        raise
+    except PoolSaturated as e:
+        raise saturated_error(e)
+    except Exception as e:
+        logger.error(f"Error generating plan with LLM: {str(e)}")
+        return assemble_plan(plan_id, generate_fallback_plan(prepared["fallback_data"]), prepared, "fallback")
+
+    await asyncio.to_thread(remember_narrative, user_input, metrics, plan)
+    return assemble_plan(plan_id, plan, prepared)
+
 # ────────────────────────────────────────────────────────────────────────────────
 # Feedback Mechanism
 # ────────────────────────────────────────────────────────────────────────────────
@@ -694,16 +1191,17 @@ def save_feedback(feedback_data: dict, path="data/retirement_feedback.json"):
     }
 
     try:
-        if os.path.exists(path):
-            with open(path, "r") as f:
-                all_feedback = json.load(f)
-        else:
-            all_feedback = []
+        with _data_file_lock:
+            if os.path.exists(path):
+                with open(path, "r") as f:
+                    all_feedback = json.load(f)
+            else:
+                all_feedback = []
 
-        all_feedback.append(entry)
+            all_feedback.append(entry)
 
-        with open(path, "w") as f:
-            json.dump(all_feedback, f, indent=2)
+            with open(path, "w") as f:
+                json.dump(all_feedback, f, indent=2)
         
         return {"status": "success", "feedback_id": entry["feedback_id"]}
     except Exception as e:
@@ -716,25 +1214,34 @@ def save_feedback(feedback_data: dict, path="data/retirement_feedback.json"):
 
 def save_user_profile(user_input: dict, path="data/retirement_user_data.json"):
     """Save user profile data"""
-    entry = {
-        "id": str(uuid.uuid4()),
-        "timestamp": datetime.now().isoformat(),
-        "data": user_input
-    }
+    profile_ids = save_user_profiles([user_input], path)
+    return profile_ids[0] if profile_ids else None
+
+def save_user_profiles(user_inputs: List[dict], path="data/retirement_user_data.json"):
+    """Save several user profiles with a single read and rewrite of the profile file"""
+    entries = [
+        {
+            "id": str(uuid.uuid4()),
+            "timestamp": datetime.now().isoformat(),
+            "data": user_input
+        }
+        for user_input in user_inputs
+    ]
 
     try:
-        if os.path.exists(path):
-            with open(path, "r") as f:
-                all_data = json.load(f)
-        else:
-            all_data = []
+        with _data_file_lock:
+            if os.path.exists(path):
+                with open(path, "r") as f:
+                    all_data = json.load(f)
+            else:
+                all_data = []
 
-        all_data.append(entry)
+            all_data.extend(entries)
 
-        with open(path, "w") as f:
-            json.dump(all_data, f, indent=2)
+            with open(path, "w") as f:
+                json.dump(all_data, f, indent=2)
         
-        return entry["id"]
+        return [entry["id"] for entry in entries]
     except Exception as e:
         logger.error(f"Error saving user input: {e}")
         return None
@@ -758,19 +1265,24 @@ def load_all_user_profiles(path="data/retirement_user_data.json"):
 # Calculate Retirement Plan with API Endpoints
 # ────────────────────────────────────────────────────────────────────────────────
 
-def calculate_retirement(user_input):
+async def calculate_retirement(user_input, calc_format="records", deadline: Optional[float] = None,
+                               slo: Optional[float] = None):
     """Main function to calculate retirement plan"""
     key = compute_user_key(user_input)
-    cache = load_plan_cache()
+    cached = await asyncio.to_thread(get_cached_plan, key)
 
-    if key in cache:
-        plan_data = cache[key]
+    if is_servable_cached_plan(cached):
+        plan_data = cached
     else:
-        plan_data = create_retirement_plan(user_input)
-        save_plan_cache(key, plan_data)
+        plan_data = await create_retirement_plan(
+            user_input, plan_id=cached["plan_id"] if cached else None, deadline=deadline, slo=slo
+        )
+        # Fallback narratives are not cached so the next request retries the LLM
+        if plan_data["narrative_source"] != "fallback":
+            await asyncio.to_thread(save_plan_cache, key, plan_data)
 
     # Save user profile and get ID
-    profile_id = save_user_profile(user_input)
+    profile_id = await asyncio.to_thread(save_user_profile, user_input)
     
     # Add profile ID to result
     if profile_id:
@@ -781,32 +1293,265 @@ def calculate_retirement(user_input):
     
     # Structure the response
     result = {
-        "retirement_plan": {
-            "plan_id": plan_data["plan_id"],
-            "plan": plan_data["plan"],
-            "projected_savings": plan_data["projected_savings"],
-            "years_left": plan_data["years_left"],
-            "gap": plan_data["gap"],
-            "required_savings_rate": plan_data["required_savings_rate"],
-            "intermediate_calculations": plan_data["intermediate_calculations"],
-            "similar_profiles": plan_data["similar_profiles"]
-        },
+        "retirement_plan": format_plan_response(plan_data, calc_format),
         "profile_id": plan_data.get("profile_id", ""),
         "status": "success"
     }
     
     return result
 
+def format_plan_response(plan_data: dict, calc_format: str = "records") -> dict:
+    """Select the plan fields returned to API clients"""
+    return {
+        "plan_id": plan_data["plan_id"],
+        "plan": plan_data["plan"],
+        "narrative_source": plan_data.get("narrative_source", "llm"),
+        "provisional": plan_data.get("provisional", False),
+        "projected_savings": plan_data["projected_savings"],
+        "years_left": plan_data["years_left"],
+        "gap": plan_data["gap"],
+        "required_savings_rate": plan_data["required_savings_rate"],
+        "intermediate_calculations": encode_calculations(plan_data["intermediate_calculations"], calc_format),
+        "similar_profiles": plan_data["similar_profiles"]
+    }
+
+# ────────────────────────────────────────────────────────────────────────────────
+# Batch Plan Generation
+# ────────────────────────────────────────────────────────────────────────────────
+
+# Batches live in SQLite so any server worker can answer polls for them: one
+# entry per batch listing its inputs, plus one per unique plan, updated as
+# each narrative finishes
+PLAN_BATCH_MAX_ENTRIES = int(os.getenv("RETIREMENT_PLAN_BATCH_MAX_ENTRIES", 100000))
+PLAN_BATCH_TTL_SECONDS = float(os.getenv("RETIREMENT_PLAN_BATCH_TTL_SECONDS", 24 * 3600)) or None
+plan_batches = KVStore(
+    os.getenv("RETIREMENT_PLAN_BATCH_DB", "data/retirement_plan_batches.sqlite3"),
+    max_entries=PLAN_BATCH_MAX_ENTRIES,
+    ttl_seconds=PLAN_BATCH_TTL_SECONDS
+)
+
+def batch_entry_key(batch_id: str, user_key: Optional[str] = None) -> str:
+    return f"{batch_id}:{user_key}" if user_key else f"batch:{batch_id}"
+
+async def calculate_retirement_batch(user_inputs: List[dict]):
+    """Compute numeric plans for a batch of users in one pass.
+
+    Identical inputs are deduped by their cache key and cached plans are
+    reused as-is.  Only the metrics run on the compute pool, which may be a
+    process pool; the cache, profile file and batch state stay in this
+    process.  Returns the batch ID and the inputs that still need a
+    narrative, keyed by cache key.
+    """
+    keys = [compute_user_key(user_input) for user_input in user_inputs]
+    unique_inputs = {}
+    for key, user_input in zip(keys, user_inputs):
+        unique_inputs.setdefault(key, user_input)
+
+    cache = await asyncio.to_thread(get_cached_plans, list(unique_inputs))
+    cache = {key: plan for key, plan in cache.items() if is_servable_cached_plan(plan)}
+    pending = {key: user_input for key, user_input in unique_inputs.items() if key not in cache}
+    metrics = {}
+    if pending:
+        metrics = dict(zip(pending, await run_blocking(compute_pool, compute_plan_metrics, list(pending.values()))))
+
+    plans = {}
+    for key in unique_inputs:
+        if key in cache:
+            plans[key] = {**cache[key], "narrative_status": "ready"}
+        else:
+            plans[key] = {
+                "plan_id": str(uuid.uuid4()),
+                "plan": None,
+                **metrics[key],
+                "similar_profiles": [],
+                "narrative_status": "pending"
+            }
+
+    profile_ids = await asyncio.to_thread(save_user_profiles, user_inputs) or [""] * len(user_inputs)
+
+    batch_id = str(uuid.uuid4())
+    await asyncio.to_thread(
+        plan_batches.put_many,
+        {
+            batch_entry_key(batch_id): {"keys": keys, "profile_ids": profile_ids, "unique_keys": list(plans)},
+            **{batch_entry_key(batch_id, key): plan for key, plan in plans.items()}
+        },
+        batch_id
+    )
+
+    return batch_id, pending
+
+BATCH_NARRATIVE_JOB = "batch_narrative"
+
+async def queue_batch_narratives(batch_id: str, pending: Dict[str, dict]):
+    """Queue one narrative job per pending plan of a batch.
+
+    The jobs go on the plan job store, so job workers run them concurrently
+    and they survive a restart.  If the queue is full the plans are marked
+    ``error`` straight away rather than left pending.
+    """
+    payloads = [
+        {"kind": BATCH_NARRATIVE_JOB, "batch_id": batch_id, "key": key, "user_input": user_input}
+        for key, user_input in pending.items()
+    ]
+    try:
+        job_ids = await asyncio.to_thread(plan_jobs.submit_many, payloads)
+    except PoolSaturated as e:
+        logger.warning(f"Cannot queue narratives for batch {batch_id}: {e}")
+        entries = await asyncio.to_thread(plan_batches.get_many, [batch_entry_key(batch_id, key) for key in pending])
+        await asyncio.to_thread(
+            plan_batches.put_many,
+            {entry_key: {**plan, "narrative_status": "error"} for entry_key, plan in entries.items()},
+            batch_id
+        )
+        return
+
+    batch = await asyncio.to_thread(plan_batches.get, batch_entry_key(batch_id))
+    if batch is not None:
+        batch["jobs"] = dict(zip(pending, job_ids))
+        await asyncio.to_thread(plan_batches.put, batch_entry_key(batch_id), batch, batch_id)
+
+async def run_batch_narrative_job(payload: dict) -> dict:
+    """Job handler: generate one batch plan's narrative and attach it to the batch"""
+    batch_id, key = payload["batch_id"], payload["key"]
+    entry_key = batch_entry_key(batch_id, key)
+    numeric_plan = await asyncio.to_thread(plan_batches.get, entry_key)
+    if numeric_plan is None or numeric_plan["narrative_status"] != "pending":
+        # The batch expired, or an earlier attempt already finished this plan
+        status = numeric_plan["narrative_status"] if numeric_plan else "expired"
+        return {"batch_id": batch_id, "key": key, "narrative_status": status}
+
+    try:
+        plan_data = await create_retirement_plan(payload["user_input"], metrics=numeric_plan, plan_id=numeric_plan["plan_id"])
+        if plan_data["narrative_source"] != "fallback":
+            await asyncio.to_thread(save_plan_cache, key, plan_data)
+        plan_data = {**plan_data, "narrative_status": "ready"}
+    except HTTPException as e:
+        if e.status_code in (429, 503):
+            raise RetryJob(e.detail)
+        logger.error(f"Error generating narrative for batch {batch_id}: {e.detail}")
+        plan_data = {**numeric_plan, "narrative_status": "error"}
+    except Exception as e:
+        logger.error(f"Error generating narrative for batch {batch_id}: {str(e)}")
+        plan_data = {**numeric_plan, "narrative_status": "error"}
+    await asyncio.to_thread(plan_batches.put, entry_key, plan_data, batch_id)
+    return {"batch_id": batch_id, "key": key, "narrative_status": plan_data["narrative_status"]}
+
+def get_batch_result(batch_id: str, calc_format: str = "records") -> Optional[dict]:
+    """Structure the current state of a batch, in input order.
+
+    A plan still pending once its narrative job has failed or disappeared
+    from the job store cannot finish any more, so it is reported as ``error``.
+    """
+    batch = plan_batches.get(batch_entry_key(batch_id))
+    if batch is None:
+        return None
+    entries = plan_batches.get_many([batch_entry_key(batch_id, key) for key in batch["unique_keys"]])
+    plans = {key: entries.get(batch_entry_key(batch_id, key)) for key in batch["unique_keys"]}
+    if None in plans.values():
+        return None
+
+    jobs = {key: job_id for key, job_id in batch.get("jobs", {}).items() if plans[key]["narrative_status"] == "pending"}
+    if jobs:
+        statuses = plan_jobs.statuses(list(jobs.values()))
+        for key, job_id in jobs.items():
+            if statuses.get(job_id) not in ("queued", "running"):
+                plans[key] = {**plans[key], "narrative_status": "error"}
+
+    results = []
+    for index, (key, profile_id) in enumerate(zip(batch["keys"], batch["profile_ids"])):
+        plan_data = plans[key]
+        results.append({
+            "index": index,
+            "user_key": key,
+            "profile_id": profile_id,
+            "narrative_status": plan_data["narrative_status"],
+            "retirement_plan": format_plan_response(plan_data, calc_format)
+        })
+
+    return {
+        "batch_id": batch_id,
+        "results": results,
+        "count": len(results),
+        "unique_count": len(plans),
+        "pending": sum(plan["narrative_status"] == "pending" for plan in plans.values()),
+        "status": "success"
+    }
+
+# ────────────────────────────────────────────────────────────────────────────────
+# Worker Pools
+# ────────────────────────────────────────────────────────────────────────────────
+
+# Blocking work runs off the event loop so one slow plan cannot stall every
+# other route.  Plan generation (retrieval, LLM calls, JSON writes) and
+# retrieval queries share the model inference threads; numeric endpoints get
+# their own pool so heavy simulations cannot starve plan generation.
+planner_pool = BoundedPool.from_env("planner", max_workers=4, max_queue=16)
+retrieval_pool = BoundedPool.from_env("retrieval", max_workers=4, max_queue=32)
+compute_pool = BoundedPool.from_env("compute", max_workers=os.cpu_count() or 1, max_queue=64)
+WORKER_POOLS = {"planner": planner_pool, "retrieval": retrieval_pool, "compute": compute_pool}
+
+def saturated_error(e: PoolSaturated) -> HTTPException:
+    logger.warning(str(e))
+    return HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def run_blocking(pool: BoundedPool, fn, *args, **kwargs):
+    """Await ``fn`` on a worker pool, answering 429/503 when the pool is saturated"""
+    try:
+        return await pool.run(fn, *args, **kwargs)
+    except PoolSaturated as e:
+        raise saturated_error(e)
+
+# How often a long-running request checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 0.5
+
+async def cancel_on_disconnect(request: Request, coro):
+    """Await ``coro``, cancelling it (and any LLM generation it started) if the client goes away"""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling plan generation")
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+def shutdown_worker_pools():
+    for pool in WORKER_POOLS.values():
+        pool.shutdown()
+
 # ────────────────────────────────────────────────────────────────────────────────
 # API Endpoints
 # ────────────────────────────────────────────────────────────────────────────────
 
 @router.post("/plan")
-async def generate_retirement_plan(user_input: RetirementInput):
-    """Generate a retirement plan based on user input"""
+async def generate_retirement_plan(
+    user_input: RetirementInput,
+    request: Request,
+    calc_format: str = Query("records", pattern=CALC_FORMAT_PATTERN, description="Encoding of intermediate_calculations"),
+    deadline_seconds: Optional[float] = Query(None, gt=0, description="Use the fallback plan if the LLM takes longer"),
+    slo_seconds: Optional[float] = Query(
+        None, gt=0, description="Serve a provisional fallback plan if the LLM takes longer, upgraded in the background"
+    )
+):
+    """Generate a retirement plan based on user input.
+
+    A provisional plan is replaced by the LLM narrative under the same
+    plan_id; fetch it again from /plan/{plan_id}.
+    """
     try:
-        result = calculate_retirement(user_input.model_dump())
+        result = await cancel_on_disconnect(
+            request,
+            calculate_retirement(user_input.model_dump(), calc_format, llm_deadline(deadline_seconds), slo_deadline(slo_seconds))
+        )
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating retirement plan: {str(e)}")
         return {
@@ -814,8 +1559,423 @@ async def generate_retirement_plan(user_input: RetirementInput):
             "status": "error"
         }
 
+@router.get("/plan/{plan_id}")
+async def get_retirement_plan(
+    plan_id: str,
+    calc_format: str = Query("records", pattern=CALC_FORMAT_PATTERN, description="Encoding of intermediate_calculations")
+):
+    """Get a cached plan by ID, e.g. to pick up the LLM narrative that replaced a provisional plan"""
+    plan_data = await asyncio.to_thread(find_cached_plan, plan_id)
+    if plan_data is None:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    return {
+        "retirement_plan": format_plan_response(plan_data, calc_format),
+        "upgrade_pending": plan_upgrade_pending(plan_data),
+        "status": "success"
+    }
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def format_metrics_event(plan_id: str, metrics: dict, calc_format: str) -> dict:
+    """The numeric part of a plan, sent before any narrative is generated"""
+    return {
+        "plan_id": plan_id,
+        "projected_savings": metrics["projected_savings"],
+        "years_left": metrics["years_left"],
+        "gap": metrics["gap"],
+        "required_savings_rate": metrics["required_savings_rate"],
+        "intermediate_calculations": encode_calculations(metrics["intermediate_calculations"], calc_format)
+    }
+
+async def plan_event_stream(user_input: dict, metrics: dict, calc_format: str, deadline: float):
+    """Server-sent events for one plan: metrics, then narrative tokens, then the finished plan.
+
+    A cached plan, or a narrative reused from a similar profile, is sent as a
+    single token.  If the LLM fails the fallback plan is sent in a
+    ``fallback`` event that replaces any partial narrative.  A finished LLM plan is written to the plan cache before
+    ``done`` so a later identical request is served from cache.  When the
+    client disconnects the stream is cancelled, which stops the generation.
+    """
+    key = compute_user_key(user_input)
+    cached = await asyncio.to_thread(get_cached_plan, key)
+    plan_id = cached["plan_id"] if cached else str(uuid.uuid4())
+    if not is_servable_cached_plan(cached):
+        cached = None
+    yield sse_event("metrics", format_metrics_event(plan_id, metrics, calc_format))
+
+    try:
+        narrative = None if cached else await asyncio.to_thread(lookup_cached_narrative, user_input, metrics)
+        if cached is not None:
+            plan_data = cached
+            yield sse_event("token", {"text": plan_data["plan"]})
+        elif narrative is not None:
+            similar_profiles = await run_blocking(planner_pool, find_similar_profiles, user_input)
+            yield sse_event("similar_profiles", similar_profiles)
+            yield sse_event("token", {"text": narrative})
+            plan_data = assemble_plan(plan_id, narrative, {"metrics": metrics, "similar_profiles": similar_profiles}, "narrative_cache")
+            await asyncio.to_thread(save_plan_cache, key, plan_data)
+        else:
+            prepared = await run_blocking(planner_pool, prepare_plan_narrative, user_input, metrics)
+            yield sse_event("similar_profiles", prepared["similar_profiles"])
+
+            tokens = []
+            try:
+                async with aclosing(llm_client.stream(prepared["system_prompt"], prepared["user_prompt"], deadline)) as stream:
+                    async for text in stream:
+                        tokens.append(text)
+                        yield sse_event("token", {"text": text})
+                plan_data = assemble_plan(plan_id, "".join(tokens), prepared)
+                await asyncio.to_thread(save_plan_cache, key, plan_data)
+                await asyncio.to_thread(remember_narrative, user_input, metrics, plan_data["plan"])
+            except PoolSaturated as e:
+                raise saturated_error(e)
+            except Exception as e:
+                logger.error(f"Error streaming plan from LLM: {str(e)}")
+                plan_data = assemble_plan(plan_id, generate_fallback_plan(prepared["fallback_data"]), prepared, "fallback")
+                yield sse_event("fallback", {"text": plan_data["plan"]})
+
+        profile_id = await asyncio.to_thread(save_user_profile, user_input)
+        yield sse_event("done", {
+            "retirement_plan": format_plan_response(plan_data, calc_format),
+            "profile_id": profile_id or "",
+            "status": "success"
+        })
+    except HTTPException as e:
+        yield sse_event("error", {"error": e.detail, "status_code": e.status_code, "status": "error"})
+    except Exception as e:
+        logger.error(f"Error streaming retirement plan: {str(e)}")
+        yield sse_event("error", {"error": str(e), "status": "error"})
+
+@router.post("/plan/stream")
+async def stream_retirement_plan(
+    user_input: RetirementInput,
+    calc_format: str = Query("records", pattern=CALC_FORMAT_PATTERN, description="Encoding of intermediate_calculations"),
+    deadline_seconds: Optional[float] = Query(None, gt=0, description="Use the fallback plan if the LLM takes longer")
+):
+    """Stream a retirement plan as server-sent events, numeric projection first"""
+    user_input = user_input.model_dump()
+    metrics = (await run_blocking(compute_pool, compute_plan_metrics, [user_input]))[0]
+    return StreamingResponse(
+        plan_event_stream(user_input, metrics, calc_format, llm_deadline(deadline_seconds)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/plan/batch")
+async def generate_retirement_plan_batch(
+    batch_input: BatchRetirementInput,
+    calc_format: str = Query("records", pattern=CALC_FORMAT_PATTERN, description="Encoding of intermediate_calculations")
+):
+    """Generate numeric plans for a batch of users; narratives follow as plan jobs"""
+    try:
+        batch_id, pending = await calculate_retirement_batch([user_input.model_dump() for user_input in batch_input.inputs])
+        if pending:
+            await queue_batch_narratives(batch_id, pending)
+        return await asyncio.to_thread(get_batch_result, batch_id, calc_format)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating retirement plan batch: {str(e)}")
+        return {
+            "error": str(e),
+            "status": "error"
+        }
+
+@router.get("/plan/batch/{batch_id}")
+async def get_retirement_plan_batch(
+    batch_id: str,
+    calc_format: str = Query("records", pattern=CALC_FORMAT_PATTERN, description="Encoding of intermediate_calculations")
+):
+    """Get the numeric results and any finished narratives for a batch"""
+    result = await asyncio.to_thread(get_batch_result, batch_id, calc_format)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return result
+
+# ────────────────────────────────────────────────────────────────────────────────
+# Plan Jobs
+# ────────────────────────────────────────────────────────────────────────────────
+
+# Jobs persist in SQLite so queued work survives restarts and can be run by
+# job_worker.py processes separate from the API
+plan_jobs = JobStore(
+    os.getenv("RETIREMENT_JOB_DB", "data/retirement_jobs.sqlite3"),
+    max_queued=int(os.getenv("RETIREMENT_JOB_QUEUE", 1000)),
+    lease_seconds=float(os.getenv("RETIREMENT_JOB_LEASE_SECONDS", 600))
+)
+JOB_POLL_SECONDS = float(os.getenv("RETIREMENT_JOB_POLL_SECONDS", 0.5))
+
+async def run_plan_job(payload: dict) -> dict:
+    """Job handler: the same result /plan would have returned"""
+    if payload.get("kind") == BATCH_NARRATIVE_JOB:
+        return await run_batch_narrative_job(payload)
+    try:
+        return await calculate_retirement(payload["user_input"], payload["calc_format"])
+    except HTTPException as e:
+        if e.status_code in (429, 503):
+            raise RetryJob(e.detail)
+        raise Exception(e.detail)
+
+async def run_plan_job_worker(concurrency: int = 1, stop: Optional[asyncio.Event] = None):
+    """Run plan jobs until ``stop`` is set or the task is cancelled"""
+    await run_worker(plan_jobs, run_plan_job, concurrency=concurrency, poll_interval=JOB_POLL_SECONDS, stop=stop)
+
+def format_job(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "created_at": datetime.fromtimestamp(job["created_at"]).isoformat(),
+        "updated_at": datetime.fromtimestamp(job["updated_at"]).isoformat(),
+        "result": job["result"],
+        "error": job["error"]
+    }
+
+@router.post("/plan/jobs", status_code=202)
+async def submit_retirement_plan_job(
+    user_input: RetirementInput,
+    calc_format: str = Query("records", pattern=CALC_FORMAT_PATTERN, description="Encoding of intermediate_calculations")
+):
+    """Queue a retirement plan; poll /plan/jobs/{job_id} or subscribe to its events for the result"""
+    try:
+        job_id = await asyncio.to_thread(plan_jobs.submit, {"user_input": user_input.model_dump(), "calc_format": calc_format})
+    except PoolSaturated as e:
+        raise saturated_error(e)
+    return {"job_id": job_id, "status": "queued"}
+
+@router.get("/plan/jobs/{job_id}")
+async def get_retirement_plan_job(job_id: str):
+    """Get the status of a plan job, with its result once it has succeeded"""
+    job = await asyncio.to_thread(plan_jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return format_job(job)
+
+async def job_event_stream(job_id: str):
+    """Server-sent ``status`` events whenever the job changes, ending with the finished job"""
+    last_status = None
+    while True:
+        job = await asyncio.to_thread(plan_jobs.get, job_id)
+        if job is None:
+            # The job row went away mid-stream, e.g. the queue file was replaced
+            yield sse_event("error", {"error": "Job not found", "status_code": 404, "status": "error"})
+            return
+        if job["status"] != last_status:
+            last_status = job["status"]
+            yield sse_event("status", {"job_id": job_id, "status": last_status})
+        if last_status in ("succeeded", "failed"):
+            yield sse_event("done", format_job(job))
+            return
+        await asyncio.sleep(JOB_POLL_SECONDS)
+
+@router.get("/plan/jobs/{job_id}/events")
+async def stream_retirement_plan_job(job_id: str):
+    """Subscribe to a plan job's status changes as server-sent events"""
+    if await asyncio.to_thread(plan_jobs.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        job_event_stream(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/solve")
+async def solve_retirement_goals(solver_input: GoalSolverInput):
+    """Solve the exact contribution rate and earliest retirement age that reach each user's goal"""
+    try:
+        solved = await run_blocking(
+            compute_pool,
+            solve_goals,
+            [user_input.model_dump() for user_input in solver_input.inputs],
+            contribution_rate=solver_input.contribution_rate,
+            annual_return=solver_input.annual_return,
+            max_age=solver_input.max_retirement_age
+        )
+        results = []
+        for i in range(len(solver_input.inputs)):
+            rate = float(solved["contribution_rate"][i])
+            earliest_age = int(solved["earliest_retirement_age"][i])
+            results.append({
+                "index": i,
+                "years_left": int(solved["years_left"][i]),
+                "required_contribution_rate": rate if np.isfinite(rate) else None,
+                "earliest_retirement_age": earliest_age if earliest_age >= 0 else None
+            })
+        return {"results": results, "count": len(results), "status": "success"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error solving retirement goals: {str(e)}")
+        return {
+            "error": str(e),
+            "status": "error"
+        }
+
+@router.post("/decumulation")
+async def simulate_decumulation(decumulation_input: DecumulationInput):
+    """Simulate post-retirement drawdown and portfolio longevity for a batch of users"""
+    try:
+        drawdown = await run_blocking(
+            compute_pool,
+            simulate_population_drawdown,
+            [user_input.model_dump() for user_input in decumulation_input.inputs],
+            strategy=decumulation_input.strategy,
+            withdrawal_rate=decumulation_input.withdrawal_rate,
+            horizon_age=decumulation_input.horizon_age,
+            annual_return=decumulation_input.annual_return,
+            inflation_rate=decumulation_input.inflation_rate,
+            claim_age=decumulation_input.claim_age,
+            include_paths=decumulation_input.include_paths
+        )
+        results = []
+        for i in range(len(decumulation_input.inputs)):
+            depletion_age = int(drawdown["depletion_age"][i])
+            result = {
+                "index": i,
+                "retirement_age": int(drawdown["retirement_age"][i]),
+                "starting_balance": float(drawdown["starting_balance"][i]),
+                "social_security_benefit": float(drawdown["social_security_benefit"][i]),
+                "depletion_age": depletion_age if depletion_age >= 0 else None,
+                "years_funded": int(drawdown["years_funded"][i])
+            }
+            if decumulation_input.include_paths:
+                n_years = int(drawdown["mask"][i].sum())
+                result["paths"] = {
+                    name: drawdown[name][i, :n_years].round(2).tolist()
+                    for name in ("balance", "withdrawal", "rmd", "social_security", "shortfall")
+                }
+            results.append(result)
+        return {
+            "results": results,
+            "count": len(results),
+            "survival_curve": drawdown["survival_curve"].round(4).tolist(),
+            "status": "success"
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error simulating decumulation: {str(e)}")
+        return {
+            "error": str(e),
+            "status": "error"
+        }
+
+@router.post("/household")
+async def project_household_accounts(household_input: HouseholdInput):
+    """Project 401(k), IRA, taxable and home-equity balances to retirement for a batch of households"""
+    try:
+        projection = await run_blocking(
+            compute_pool,
+            project_household,
+            [user_input.model_dump() for user_input in household_input.inputs],
+            accounts={name: overrides.model_dump(exclude_none=True) for name, overrides in household_input.accounts.items()},
+            income_growth=household_input.income_growth,
+            employer_match_rate=household_input.employer_match_rate,
+            employer_match_cap=household_input.employer_match_cap,
+            mortgage_rate=household_input.mortgage_rate,
+            home_appreciation=household_input.home_appreciation,
+            include_paths=household_input.include_paths
+        )
+        results = []
+        for i in range(len(household_input.inputs)):
+            n_years = int(projection["years_left"][i])
+            result = {
+                "index": i,
+                "years_left": n_years,
+                "accounts": {
+                    name: {
+                        "balance": float(projection["balances"][i, a]),
+                        "employee_contributions": float(projection["employee_contributions"][i, a]),
+                        "employer_contributions": float(projection["employer_contributions"][i, a])
+                    }
+                    for a, name in enumerate(projection["accounts"])
+                },
+                "home_equity": float(projection["home_equity"][i]),
+                "remaining_mortgage": float(projection["remaining_mortgage"][i]),
+                "net_worth": float(projection["net_worth"][i])
+            }
+            if household_input.include_paths:
+                result["paths"] = {
+                    **{name: projection["paths"][i, a, :n_years].round(2).tolist() for a, name in enumerate(projection["accounts"])},
+                    "home_equity": projection["home_equity_path"][i, :n_years].round(2).tolist()
+                }
+            results.append(result)
+        return {"results": results, "count": len(results), "status": "success"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error projecting household accounts: {str(e)}")
+        return {
+            "error": str(e),
+            "status": "error"
+        }
+
+@router.post("/simulate")
+async def simulate_retirement_plan(sim_input: SimulationInput):
+    """Run a Monte Carlo simulation of savings at retirement"""
+    try:
+        params = sim_input.model_dump()
+        result = await run_blocking(
+            compute_pool,
+            simulate_retirement,
+            params,
+            n_paths=sim_input.n_paths,
+            seed=sim_input.seed,
+            annual_return=sim_input.annual_return,
+            return_volatility=sim_input.return_volatility,
+            inflation_rate=sim_input.inflation_rate,
+            inflation_volatility=sim_input.inflation_volatility,
+            contribution_rate=sim_input.contribution_rate
+        )
+        return {**result, "status": "success"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error running retirement simulation: {str(e)}")
+        return {
+            "error": str(e),
+            "status": "error"
+        }
+
+@router.post("/sensitivity")
+async def retirement_sensitivity(sensitivity_input: SensitivityInput):
+    """Sweep projected savings and gap over a grid of planning assumptions"""
+    try:
+        retirement_ages = sensitivity_input.retirement_ages or [
+            age for age in range(sensitivity_input.retirementAge - 5, sensitivity_input.retirementAge + 6)
+            if age > sensitivity_input.age
+        ] or [sensitivity_input.retirementAge]
+        grid = await run_blocking(
+            compute_pool,
+            sensitivity_grid,
+            sensitivity_input.currentSavings,
+            sensitivity_input.income,
+            sensitivity_input.retirementSavingsGoal,
+            sensitivity_input.age,
+            sensitivity_input.contribution_rates,
+            sensitivity_input.annual_returns,
+            retirement_ages,
+            sensitivity_input.inflation_rates
+        )
+        return {
+            "axes": grid["axes"],
+            "shape": grid["shape"],
+            "projected_savings": grid["projected_savings"].round(2).tolist(),
+            "gap": grid["gap"].round(2).tolist(),
+            "status": "success"
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing sensitivity grid: {str(e)}")
+        return {
+            "error": str(e),
+            "status": "error"
+        }
+
 @router.post("/feedback")
-async def submit_feedback(feedback: FeedbackInput):
+def submit_feedback(feedback: FeedbackInput):
     """Submit feedback for a retirement plan"""
     try:
         result = save_feedback(feedback.model_dump())
@@ -837,13 +1997,36 @@ def get_user_profiles():
         logger.error(f"Error retrieving user profiles: {str(e)}")
         return {"error": str(e), "status": "error"}
 
+@router.get("/user_profiles/projections")
+def get_user_profile_projections():
+    """Re-score all saved user profiles in one vectorized projection pass"""
+    try:
+        profiles = load_all_user_profiles()
+        scores = project_population([profile.get("data", {}) for profile in profiles])
+        projections = [
+            {
+                "profile_id": profile.get("id", ""),
+                "projected_savings": float(scores["projected_savings"][i]),
+                "years_left": int(scores["years_left"][i]),
+                "gap": float(scores["gap"][i]),
+                "required_savings_rate": float(scores["required_savings_rate"][i])
+            }
+            for i, profile in enumerate(profiles)
+        ]
+        return {"projections": projections, "count": len(projections)}
+    except Exception as e:
+        logger.error(f"Error projecting user profiles: {str(e)}")
+        return {"error": str(e), "status": "error"}
+
 @router.post("/query")
 async def retirement_query(query_input: QueryInput, index_manager: IndexManager = Depends(get_index_manager)):
     """Query the retirement knowledge base with hybrid retrieval"""
     try:
-        result = hybrid_retrieve(
-            query_input.query, 
-            query_input.user_data, 
+        result = await run_blocking(
+            retrieval_pool,
+            hybrid_retrieve,
+            query_input.query,
+            query_input.user_data,
             index_manager
         )
         return {
@@ -851,6 +2034,8 @@ async def retirement_query(query_input: QueryInput, index_manager: IndexManager
             "result": result,
             "status": "success"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing query: {str(e)}")
         return {
@@ -858,6 +2043,30 @@ async def retirement_query(query_input: QueryInput, index_manager: IndexManager
             "status": "error"
         }
 
+@router.get("/cache_stats")
+async def get_cache_stats():
+    """Report hit/miss counters for the retrieval inference caches and the plan and narrative caches"""
+    return {
+        "query_embeddings": query_embedding_cache.stats(),
+        "rerank_scores": rerank_score_cache.stats(),
+        "adaptive_rerank": rerank_stats.stats(),
+        "plan_cache": await asyncio.to_thread(plan_cache.stats),
+        "narrative_cache": {**narrative_cache_stats.stats(), "store": await asyncio.to_thread(narrative_cache.stats)},
+        "status": "success"
+    }
+
+@router.get("/worker_stats")
+async def get_worker_stats():
+    """Report worker pool load and inference batch sizes and queue waits"""
+    return {
+        "pools": {name: pool.stats() for name, pool in WORKER_POOLS.items()},
+        "inference_batchers": {"embedding": embedding_batcher.stats(), "rerank": rerank_batcher.stats()},
+        "llm": llm_client.stats(),
+        "plan_jobs": await asyncio.to_thread(plan_jobs.stats),
+        "plan_upgrades": {**plan_upgrade_stats, "running": len(_plan_upgrades)},
+        "status": "success"
+    }
+
 @router.get("/intermediate_calculations/{plan_id}")
 async def get_intermediate_calculations(plan_id: str):
     """Get intermediate calculations for a specific retirement plan"""
@@ -955,12 +2164,25 @@ This projection assumes:
 # ────────────────────────────────────────────────────────────────────────────────
 
 # Initialize on application startup
-def initialize_app():
-    """Initialize resources when the application starts"""
+RETRIEVAL_SUBSYSTEMS = ("retrieval_index", "embedding_model", "cross_encoder")
+readiness.register(*RETRIEVAL_SUBSYSTEMS)
+
+def initialize_app(warm_models: bool = True):
+    """Initialize resources when the application starts.
+
+    Runs in the background after the server starts accepting traffic; requests
+    that need a subsystem before it is warm load it on demand.
+    """
     try:
+        migrate_plan_caches()
+
         # Initialize the index manager
         index_manager = get_index_manager()
         index_manager.initialize()
+
+        if warm_models:
+            get_embedding_model()
+            get_cross_encoder()
         
         # Warn if data files don't exist
         if not os.path.exists("data/retirement_facts.txt"):
@@ -974,6 +2196,3 @@ def initialize_app():
     except Exception as e:
         logger.error(f"Error initializing retirement planner: {e}")
         return False
-
-# Initialize the application when this module is imported
-initialize_app()
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""Tests for the FAISS index builders in ``modules.ann_index``."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+faiss = pytest.importorskip("faiss")
+
+from modules.ann_index import INDEX_TYPES, build_index, configure_search, read_index
+
+DIMENSION = 32
+
+
+def make_vectors(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((10, DIMENSION)).astype(np.float32)
+    vectors = centers[rng.integers(0, 10, n)] + 0.3 * rng.standard_normal((n, DIMENSION)).astype(np.float32)
+    return vectors.astype(np.float32)
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_every_index_type_finds_stored_vectors(index_type):
+    vectors = make_vectors()
+    index = build_index(index_type, vectors, DIMENSION)
+    assert index.ntotal == len(vectors)
+
+    _, exact = build_index("flat", vectors, DIMENSION).search(vectors[:20], 5)
+    _, found = index.search(vectors[:20], 5)
+    recall = np.mean([len(set(f) & set(e)) / 5 for f, e in zip(found, exact)])
+    assert recall >= 0.8
+    assert all(row[0] == i for i, row in enumerate(found))
+
+
+def test_ivf_list_count_and_probes():
+    index = build_index("ivf", make_vectors(), DIMENSION)
+    # About 4 * sqrt(n) lists by default, searched with nprobe lists
+    assert index.nlist == int(4 * np.sqrt(500)) and index.nprobe == 16
+
+    index = build_index("ivf", make_vectors(n=20), DIMENSION, nlist=64, nprobe=128)
+    assert index.nlist == 20 and index.nprobe == 20
+
+
+def test_hnsw_parameters():
+    index = build_index("hnsw", make_vectors(), DIMENSION, m=16, ef_construction=80, ef_search=40)
+    assert index.hnsw.efConstruction == 80 and index.hnsw.efSearch == 40
+    assert isinstance(index, faiss.IndexHNSWFlat)
+
+
+def test_quantized_indexes_use_their_scalar_quantizer():
+    assert build_index("sq8", make_vectors(), DIMENSION).sq.qtype == faiss.ScalarQuantizer.QT_8bit
+    assert build_index("fp16", make_vectors(), DIMENSION).sq.qtype == faiss.ScalarQuantizer.QT_fp16
+
+
+def test_empty_corpus_and_unknown_type():
+    assert build_index("ivf", np.zeros((0, DIMENSION), dtype=np.float32), DIMENSION).ntotal == 0
+    with pytest.raises(ValueError):
+        build_index("lsh", make_vectors(), DIMENSION)
+
+
+def test_configure_search_applies_knobs_after_loading(tmp_path):
+    path = str(tmp_path / "index.faiss")
+    faiss.write_index(build_index("ivf", make_vectors(), DIMENSION, nlist=8), path)
+    loaded = read_index(path, mmap=True)
+    assert configure_search(loaded, nprobe=4).nprobe == 4
+
+    flat = build_index("flat", make_vectors(), DIMENSION)
+    # Knobs an index does not have are ignored
+    assert configure_search(flat, nprobe=4, ef_search=10) is flat
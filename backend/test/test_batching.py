@@ -0,0 +1,57 @@
+"""Tests for cross-request inference batching in ``modules.batching``."""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.batching import InferenceBatcher
+
+
+def test_concurrent_requests_share_one_forward_pass():
+    calls = []
+    gate = threading.Event()
+
+    def model(items):
+        calls.append(len(items))
+        gate.wait()
+        return [item * 10 for item in items]
+
+    batcher = InferenceBatcher("test", model, max_batch_size=64, max_wait_ms=200)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(batcher.submit, [i, i + 100]) for i in range(8)]
+        gate.set()
+        results = [future.result() for future in futures]
+
+    assert results == [[i * 10, (i + 100) * 10] for i in range(8)]
+    assert sum(calls) == 16
+    assert len(calls) < 8
+    stats = batcher.stats()
+    assert stats["items"] == 16 and stats["batches"] == len(calls)
+    assert stats["queue_wait_ms"]["p99"] >= stats["queue_wait_ms"]["p50"] >= 0
+
+
+def test_batches_are_capped_at_max_batch_size():
+    sizes = []
+    batcher = InferenceBatcher("test", lambda items: sizes.append(len(items)) or items, max_batch_size=4, max_wait_ms=50)
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        list(executor.map(lambda i: batcher.submit([i]), range(10)))
+    assert sum(sizes) == 10
+    assert max(sizes) <= 4
+
+
+def test_model_errors_reach_every_caller_and_batcher_recovers():
+    def model(items):
+        if "bad" in items:
+            raise ValueError("boom")
+        return items
+
+    batcher = InferenceBatcher("test", model, max_wait_ms=0)
+    with pytest.raises(ValueError):
+        batcher.submit(["bad"])
+    assert batcher.submit(["ok"]) == ["ok"]
+    assert batcher.submit([]) == []
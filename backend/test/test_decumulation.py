@@ -0,0 +1,56 @@
+"""Tests for the drawdown engine in ``modules.decumulation``."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND))
+
+from modules.decumulation import estimate_social_security, load_decumulation_tables, simulate_drawdown
+
+TABLES = load_decumulation_tables(str(BACKEND / "data" / "retirement_data.json"))
+
+
+def test_fixed_real_withdrawal_depletes_on_schedule():
+    # 10% a year with no growth or inflation lasts exactly ten years
+    result = simulate_drawdown([100000.0], 60, horizon_age=95, annual_return=0.0, inflation_rate=0.0,
+                               withdrawal_rate=0.10, tables=TABLES, include_paths=True)
+    assert result["depletion_age"][0] == 70
+    assert result["years_funded"][0] == 10
+    assert np.allclose(result["withdrawal"][0, :10], 10000.0)
+
+
+def test_rmd_sets_withdrawal_floor():
+    result = simulate_drawdown([1_000_000.0], 73, horizon_age=75, annual_return=0.0, inflation_rate=0.0,
+                               strategy="fixed_percentage", withdrawal_rate=0.0, tables=TABLES, include_paths=True)
+    assert np.isclose(result["withdrawal"][0, 0], 1_000_000.0 / 26.5)
+    assert result["depletion_age"][0] == -1
+
+
+def test_social_security_reduces_spending_need():
+    result = simulate_drawdown([500000.0, 500000.0], 65, annual_spending=40000.0, social_security=[0.0, 30000.0],
+                               claim_age=65, annual_return=0.0, inflation_rate=0.0, strategy="spending_need",
+                               tables=TABLES, include_paths=True)
+    assert np.allclose(result["withdrawal"][:, 0], [40000.0, 10000.0])
+    assert result["years_funded"][1] > result["years_funded"][0]
+    assert result["survival_curve"][0] == 1.0
+
+
+def test_summaries_do_not_depend_on_paths():
+    args = ([400000.0, 900000.0, 200000.0], [62, 67, 70])
+    kwargs = dict(annual_spending=45000.0, social_security=20000.0, strategy="spending_need", tables=TABLES)
+    summary = simulate_drawdown(*args, **kwargs)
+    full = simulate_drawdown(*args, **kwargs, include_paths=True)
+    assert "balance" not in summary and "mask" not in summary
+    for name in ("depletion_age", "years_funded", "survival_curve"):
+        assert np.array_equal(summary[name], full[name])
+    # The yearly paths agree with the summaries
+    funded = ~np.logical_or.accumulate(full["mask"] & (full["shortfall"] > 1e-6), axis=1)
+    assert np.array_equal(np.where(funded[:, -1], full["mask"].sum(axis=1), funded.argmin(axis=1)), summary["years_funded"])
+
+
+def test_social_security_claiming_adjustment():
+    early, full, late = estimate_social_security(np.array([60000.0] * 3), np.array([62, 67, 70]), TABLES)
+    assert np.isclose(early / full, 0.70) and np.isclose(late / full, 1.24)
@@ -0,0 +1,37 @@
+"""Tests for the intermediate calculation encodings in ``modules.encoding``."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.encoding import calculations_to_arrays, encode_calculations
+
+RECORDS = {
+    "contributions": [{"year": 31, "amount": 100.0}, {"year": 32, "amount": 100.0}],
+    "growth": [{"year": 31, "amount": 0.0}, {"year": 32, "amount": 10.0}],
+    "cumulative": [{"year": 31, "amount": 100.0}, {"year": 32, "amount": 210.0}],
+}
+
+
+def test_columnar_round_trip():
+    columnar = encode_calculations(RECORDS, "columnar")
+    assert columnar["years"] == [31, 32]
+    assert columnar["cumulative"] == [100.0, 210.0]
+    assert encode_calculations(columnar, "records") == RECORDS
+
+
+def test_binary_round_trip_at_float32_precision():
+    binary = encode_calculations(RECORDS, "binary")
+    assert binary["length"] == 2
+    years, series = calculations_to_arrays(binary)
+    assert years.tolist() == [31, 32]
+    assert np.allclose(series["cumulative"], [100.0, 210.0])
+    assert encode_calculations(binary, "records") == RECORDS
+
+
+def test_empty_calculations():
+    empty = {"contributions": [], "growth": [], "cumulative": []}
+    assert encode_calculations(encode_calculations(empty, "binary"), "records") == empty
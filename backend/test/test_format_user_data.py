@@ -9,15 +9,19 @@ dependencies are not installed in the test environment.
 import types
 import sys
 import importlib
+import importlib.util
 from pathlib import Path
 
 # Stub heavy optional dependencies so the module can be imported
-sys.modules.setdefault("faiss", types.ModuleType("faiss"))
+if importlib.util.find_spec("faiss") is None:
+    sys.modules.setdefault("faiss", types.ModuleType("faiss"))
 sys.modules.setdefault("ollama", types.ModuleType("ollama"))
-sys.modules.setdefault("numpy", types.ModuleType("numpy"))
-jinja2_mod = types.ModuleType("jinja2")
-setattr(jinja2_mod, "Template", object)
-sys.modules.setdefault("jinja2", jinja2_mod)
+if importlib.util.find_spec("numpy") is None:
+    sys.modules.setdefault("numpy", types.ModuleType("numpy"))
+if importlib.util.find_spec("jinja2") is None:
+    jinja2_mod = types.ModuleType("jinja2")
+    setattr(jinja2_mod, "Template", object)
+    sys.modules.setdefault("jinja2", jinja2_mod)
 
 st = sys.modules.setdefault("sentence_transformers", types.ModuleType("sentence_transformers"))
 setattr(st, "SentenceTransformer", object)
@@ -0,0 +1,57 @@
+"""Tests for the persisted retrieval index in ``modules.index_store``."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("faiss")
+
+from modules.ann_index import build_index
+from modules.index_store import content_hash, load_cached_vectors, load_index_artifacts, save_index_artifacts
+
+DIMENSION = 16
+
+
+def make_artifacts(n=20):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n, DIMENSION)).astype(np.float32)
+    chunks = [{"page_content": f"chunk {i}", "metadata": {"chunk_id": i}} for i in range(n)]
+    hashes = [content_hash(chunk["page_content"]) for chunk in chunks]
+    return vectors, chunks, hashes
+
+
+def test_content_hash_covers_every_part():
+    assert content_hash("text", {"a": 1}) == content_hash("text", {"a": 1})
+    assert content_hash("text", {"a": 1}) != content_hash("text", {"a": 2})
+    assert content_hash("ab", "c") != content_hash("a", "bc")
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_saved_index_reloads_with_its_chunks(tmp_path, mmap):
+    vectors, chunks, hashes = make_artifacts()
+    save_index_artifacts(str(tmp_path), "key", build_index("flat", vectors, DIMENSION), vectors, hashes, chunks)
+
+    loaded = load_index_artifacts(str(tmp_path), "key", mmap=mmap)
+    assert loaded["chunks"] == chunks
+    _, ids = loaded["index"].search(vectors[3:4], 1)
+    assert ids[0][0] == 3
+
+    cached = load_cached_vectors(str(tmp_path))
+    assert set(cached) == set(hashes)
+    np.testing.assert_array_equal(cached[hashes[5]], vectors[5])
+
+
+def test_stale_or_missing_cache_is_ignored(tmp_path):
+    vectors, chunks, hashes = make_artifacts()
+    assert load_index_artifacts(str(tmp_path), "key") is None
+    assert load_cached_vectors(str(tmp_path)) == {}
+
+    save_index_artifacts(str(tmp_path), "key", build_index("flat", vectors, DIMENSION), vectors, hashes, chunks)
+    assert load_index_artifacts(str(tmp_path), "other settings") is None
+
+    (tmp_path / "index.faiss").write_bytes(b"corrupt")
+    assert load_index_artifacts(str(tmp_path), "key") is None
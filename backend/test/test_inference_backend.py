@@ -0,0 +1,47 @@
+"""Tests for inference backend selection in ``modules.inference_backend``."""
+
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import inference_backend
+
+
+class FakeModel:
+    fail_onnx = False
+
+    def __init__(self, name, backend="torch", model_kwargs=None):
+        if backend == "onnx" and self.fail_onnx:
+            raise ImportError("onnxruntime is not installed")
+        self.name = name
+        self.backend = backend
+        self.model_kwargs = model_kwargs
+
+
+def install_fake_sentence_transformers(monkeypatch):
+    module = types.ModuleType("sentence_transformers")
+    module.SentenceTransformer = FakeModel
+    module.CrossEncoder = FakeModel
+    monkeypatch.setitem(sys.modules, "sentence_transformers", module)
+
+
+def test_onnx_int8_loads_quantized_export(monkeypatch):
+    install_fake_sentence_transformers(monkeypatch)
+    monkeypatch.setattr(inference_backend, "quantized_onnx_file", lambda: "onnx/model_qint8_avx512.onnx")
+    model = inference_backend.load_embedding_model("all-MiniLM-L6-v2", "onnx-int8")
+    assert model.backend == "onnx"
+    assert model.model_kwargs["file_name"] == "onnx/model_qint8_avx512.onnx"
+
+
+def test_onnx_failure_and_unknown_backend_fall_back_to_torch(monkeypatch):
+    install_fake_sentence_transformers(monkeypatch)
+    monkeypatch.setattr(FakeModel, "fail_onnx", True)
+    assert inference_backend.load_cross_encoder("cross-encoder", "onnx").backend == "torch"
+    assert inference_backend.load_cross_encoder("cross-encoder", "tensorrt").backend == "torch"
+
+
+def test_quantized_onnx_file_matches_cpu(monkeypatch):
+    monkeypatch.setattr(inference_backend.platform, "machine", lambda: "aarch64")
+    assert inference_backend.quantized_onnx_file().endswith("arm64.onnx")
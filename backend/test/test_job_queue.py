@@ -0,0 +1,95 @@
+"""Tests for the SQLite plan job queue in ``modules.job_queue``."""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.job_queue import JobStore, RetryJob, run_worker
+from modules.workers import PoolSaturated
+
+
+def test_jobs_run_in_fifo_order_and_persist(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    first = store.submit({"n": 1})
+    second = store.submit({"n": 2})
+
+    # A new store on the same file, as after a restart, sees the queued jobs
+    restarted = JobStore(path)
+    job = restarted.claim("worker-a")
+    assert job["id"] == first and job["status"] == "running" and job["payload"] == {"n": 1}
+    assert restarted.complete(first, "worker-a", {"ok": True})
+
+    assert store.get(first)["status"] == "succeeded"
+    assert store.get(first)["result"] == {"ok": True}
+    assert store.claim("worker-b")["id"] == second
+    assert store.claim("worker-b") is None
+
+
+def test_creates_missing_parent_directories(tmp_path):
+    store = JobStore(str(tmp_path / "nested" / "dir" / "jobs.sqlite3"))
+    job_id = store.submit({"n": 1})
+    assert store.get(job_id)["status"] == "queued"
+
+
+def test_submit_rejects_when_queue_is_full(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), max_queued=1)
+    store.submit({})
+    with pytest.raises(PoolSaturated) as excinfo:
+        store.submit({})
+    assert excinfo.value.status_code == 429
+
+
+def test_submit_many_is_all_or_nothing(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), max_queued=2)
+    first, second = store.submit_many([{"n": 1}, {"n": 2}])
+    assert [store.claim("worker")["id"], store.claim("worker")["id"]] == [first, second]
+    with pytest.raises(PoolSaturated):
+        store.submit_many([{}, {}, {}])
+    assert store.stats()["queued"] == 0
+    assert store.statuses([first, "missing"]) == {first: "running"}
+
+
+def test_expired_lease_is_reclaimed_then_abandoned(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.01, max_attempts=2)
+    job_id = store.submit({})
+    assert store.claim("dead-1")["attempts"] == 1
+    time.sleep(0.02)
+    assert store.claim("dead-2")["attempts"] == 2
+    # The first worker lost its lease, so it cannot finish the job
+    assert not store.complete(job_id, "dead-1", {})
+    time.sleep(0.02)
+    assert store.claim("worker") is None
+    assert store.get(job_id)["status"] == "failed"
+
+
+def test_run_worker_completes_fails_and_requeues(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    ok, bad, busy = store.submit({"n": 2}), store.submit({"n": -1}), store.submit({"n": 0})
+    retried = []
+
+    async def handler(payload):
+        if payload["n"] < 0:
+            raise ValueError("negative")
+        if payload["n"] == 0 and not retried:
+            retried.append(True)
+            raise RetryJob("saturated")
+        return {"double": payload["n"] * 2}
+
+    async def main():
+        stop = asyncio.Event()
+        worker = asyncio.create_task(run_worker(store, handler, concurrency=2, poll_interval=0.01, stop=stop))
+        while store.stats()["queued"] or store.stats()["running"]:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await worker
+
+    asyncio.run(main())
+    assert store.get(ok)["result"] == {"double": 4}
+    assert store.get(bad)["status"] == "failed" and store.get(bad)["error"] == "negative"
+    assert store.get(busy)["status"] == "succeeded" and store.get(busy)["attempts"] == 1
@@ -0,0 +1,100 @@
+"""Tests for the SQLite key-value store behind the plan cache in ``modules.kv_store``."""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.kv_store import KVStore
+
+
+def test_put_get_and_secondary_lookup(tmp_path):
+    store = KVStore(str(tmp_path / "cache.sqlite3"))
+    store.put("a", {"plan_id": "p1", "plan": "text"}, secondary_key="p1")
+    assert store.get("a") == {"plan_id": "p1", "plan": "text"}
+    assert store.get("missing") is None
+    assert store.get_by_secondary("p1")["plan"] == "text"
+    assert store.get_many(["a", "missing"]) == {"a": {"plan_id": "p1", "plan": "text"}}
+
+    # Conditional delete only removes the entry if it still has that secondary key
+    assert not store.delete("a", secondary_key="p2")
+    assert store.delete("a", secondary_key="p1")
+    assert store.get("a") is None
+    assert store.stats()["hits"] == 2
+
+
+def test_creates_missing_parent_directories(tmp_path):
+    store = KVStore(str(tmp_path / "nested" / "dir" / "cache.sqlite3"))
+    store.put("a", 1)
+    assert store.get("a") == 1
+
+
+def test_put_many_writes_entries_under_one_secondary_key(tmp_path):
+    store = KVStore(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    store.put("old", 0)
+    store.put_many({"a": 1, "b": 2}, secondary_key="batch")
+    assert store.get_many(["a", "b", "old"]) == {"a": 1, "b": 2}
+    assert store.get_by_secondary("batch") in (1, 2)
+
+
+def test_evicts_least_recently_read(tmp_path):
+    store = KVStore(str(tmp_path / "cache.sqlite3"), max_entries=2, touch_interval=0)
+    store.put("a", 1)
+    time.sleep(0.01)
+    store.put("b", 2)
+    time.sleep(0.01)
+    store.get("a")
+    time.sleep(0.01)
+    store.put("c", 3)
+    assert store.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert store.stats()["evictions"] == 1
+
+
+def test_reads_refresh_lru_position_at_most_once_per_interval(tmp_path):
+    store = KVStore(str(tmp_path / "cache.sqlite3"), max_entries=2, touch_interval=60)
+    store.put("a", 1)
+    time.sleep(0.01)
+    store.put("b", 2)
+    # "a" was written moments ago, so reading it leaves its position alone
+    # and it is still the least recently used entry
+    store.get("a")
+    store.put("c", 3)
+    assert store.get_many(["a", "b", "c"]) == {"b": 2, "c": 3}
+
+
+def test_expired_entries_are_purged_once_the_store_is_full(tmp_path):
+    store = KVStore(str(tmp_path / "cache.sqlite3"), max_entries=2, ttl_seconds=0.05)
+    store.put("a", 1)
+    time.sleep(0.06)
+    store.put("b", 2)
+    assert store.stats()["evictions"] == 0
+    store.put("c", 3)
+    assert store.get_many(["b", "c"]) == {"b": 2, "c": 3}
+    assert store.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_missing(tmp_path):
+    store = KVStore(str(tmp_path / "cache.sqlite3"), ttl_seconds=0.05)
+    store.put("a", 1)
+    assert store.get("a") == 1
+    time.sleep(0.06)
+    assert store.get("a") is None
+    assert len(store) == 0
+
+
+def test_imports_legacy_json_once(tmp_path):
+    legacy = tmp_path / "cache.json"
+    legacy.write_text(json.dumps({"a": {"plan_id": "p1"}, "b": {"plan_id": "p2"}}))
+    store = KVStore(str(tmp_path / "cache.sqlite3"))
+    store.put("a", {"plan_id": "newer"}, secondary_key="newer")
+
+    assert store.import_json(str(legacy), secondary_field="plan_id") == 1
+    assert store.get("a") == {"plan_id": "newer"}
+    assert store.get_by_secondary("p2") == {"plan_id": "p2"}
+
+    # A restarted process does not import the file again
+    store.delete("b")
+    assert KVStore(str(tmp_path / "cache.sqlite3")).import_json(str(legacy)) == 0
+    assert store.get("b") is None
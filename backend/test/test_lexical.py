@@ -0,0 +1,46 @@
+"""Tests for the lexical retrieval indexes in ``modules.lexical``."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.lexical import BM25Index, FactIndex, reciprocal_rank_fusion, tokenize
+
+FACTS = {
+    "inflation": {"average_rate": 0.025, "impact": "Erodes purchasing power"},
+    "withdrawal_rates": {"4_percent_rule": {"description": "Withdraw 4% in your first year"}},
+    "social_security": {"full_retirement_age": 67},
+}
+
+
+def test_tokenize_keeps_401k_and_drops_stopwords():
+    assert tokenize("What is the 401(k) contribution LIMIT?") == ["401(k)", "contribution", "limit"]
+
+
+def test_fact_index_matches_keys_and_values():
+    index = FactIndex(FACTS)
+    assert [path for path, _ in index.search("inflation")] == ["inflation"]
+    assert [path for path, _ in index.search("purchasing power")] == ["inflation.impact"]
+    assert index.search("withdrawal")[0] == ("withdrawal rates", ["4 percent rule:", "  description: Withdraw 4% in your first year"])
+    assert index.search("unrelated words") == []
+
+
+def test_fact_index_omits_children_of_matched_sections():
+    paths = [path for path, _ in FactIndex(FACTS).search("inflation rate impact")]
+    assert paths == ["inflation"]
+
+
+def test_bm25_ranks_rarer_terms_higher():
+    index = BM25Index([
+        "Roth IRA contributions grow tax free",
+        "Traditional IRA contributions are tax deductible",
+        "Social Security benefits start at 62",
+    ])
+    assert [doc_id for doc_id, _ in index.search("roth ira")][0] == 0
+    assert [doc_id for doc_id, _ in index.search("social security")] == [2]
+    assert index.search("annuity") == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    assert reciprocal_rank_fusion([[1, 2, 3], [3, 1]]) == [1, 3, 2]
@@ -0,0 +1,131 @@
+"""Tests for the pooled async Ollama client in ``modules.llm_client``."""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.llm_client import LLMClient, LLMDeadlineExceeded
+from modules.workers import PoolSaturated
+
+
+class FakeOllama:
+    """Stand-in for ``ollama.AsyncClient`` that records concurrency"""
+
+    def __init__(self, delay=0.0, failures=0, chunks=("Save ", "more.")):
+        self.delay = delay
+        self.failures = failures
+        self.chunks = chunks
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.closed = 0
+
+    async def chat(self, model, messages, stream=False, keep_alive=None):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("ollama unavailable")
+        if stream:
+            return self._stream()
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return {"message": {"content": f"plan for {messages[1]['content']}"}}
+
+    async def _stream(self):
+        try:
+            for chunk in self.chunks:
+                await asyncio.sleep(self.delay)
+                yield {"message": {"content": chunk}}
+        finally:
+            self.closed += 1
+
+
+def make_client(fake, **kwargs):
+    return LLMClient("test-model", client_factory=lambda: fake, backoff=0.01, **kwargs)
+
+
+def test_chat_caps_concurrency():
+    fake = FakeOllama(delay=0.02)
+    client = make_client(fake, max_concurrency=2)
+
+    async def main():
+        return await asyncio.gather(*(client.chat("system", f"user {i}") for i in range(6)))
+
+    plans = asyncio.run(main())
+    assert plans == [f"plan for user {i}" for i in range(6)]
+    assert fake.peak == 2
+    assert client.stats()["completed"] == 6
+    assert client.stats()["running"] == 0
+
+
+def test_retries_then_succeeds():
+    fake = FakeOllama(failures=1)
+    client = make_client(fake, max_retries=2)
+    assert asyncio.run(client.chat("system", "user")) == "plan for user"
+    assert fake.calls == 2
+
+
+def test_deadline_raises_and_frees_slot():
+    fake = FakeOllama(delay=1.0)
+    client = make_client(fake, max_concurrency=1)
+
+    async def main():
+        with pytest.raises(LLMDeadlineExceeded):
+            await client.chat("system", "user", deadline=time.monotonic() + 0.05)
+
+    asyncio.run(main())
+    assert client.stats()["deadline_exceeded"] == 1
+    assert client.stats()["running"] == 0
+
+
+def test_rejects_with_429_when_queue_is_full():
+    fake = FakeOllama(delay=0.05)
+    client = make_client(fake, max_concurrency=1, max_queue=1)
+
+    async def main():
+        running = [asyncio.ensure_future(client.chat("system", "user")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(PoolSaturated) as excinfo:
+            await client.chat("system", "user")
+        await asyncio.gather(*running)
+        return excinfo.value
+
+    assert asyncio.run(main()).status_code == 429
+    assert client.stats()["rejected"] == 1
+
+
+def test_cancel_releases_slot():
+    fake = FakeOllama(delay=1.0)
+    client = make_client(fake, max_concurrency=1)
+
+    async def main():
+        task = asyncio.ensure_future(client.chat("system", "user"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        fake.delay = 0
+        return await client.chat("system", "next")
+
+    assert asyncio.run(main()) == "plan for next"
+    assert client.stats()["running"] == 0
+
+
+def test_stream_yields_tokens_and_closes():
+    fake = FakeOllama()
+    client = make_client(fake)
+
+    async def main():
+        return [text async for text in client.stream("system", "user")]
+
+    assert asyncio.run(main()) == ["Save ", "more."]
+    assert fake.closed == 1
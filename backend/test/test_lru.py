@@ -0,0 +1,39 @@
+"""Tests for the retrieval result caches in ``modules.lru``."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.lru import LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_clear_keeps_counters():
+    cache = LRUCache(4)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    cache.clear()
+
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["size"] == 0
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_zero_size_caches_nothing():
+    cache = LRUCache(0)
+    cache.put("a", 1)
+    assert cache.get("a") is None and len(cache) == 0
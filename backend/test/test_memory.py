@@ -0,0 +1,29 @@
+"""Tests for per-process memory reporting in ``modules.memory``."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.memory import process_memory, worker_memory_report
+
+pytestmark = pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc")
+
+
+def test_process_memory_splits_shared_and_private():
+    usage = process_memory()
+    assert usage["pid"] == os.getpid()
+    assert usage["rss_mb"] > 0
+    assert usage["rss_mb"] == pytest.approx(usage["shared_mb"] + usage["private_mb"], abs=0.5)
+
+
+def test_report_lists_siblings_of_master():
+    report = worker_memory_report(os.getppid())
+    assert os.getpid() in [usage["pid"] for usage in report["workers"]]
+    assert report["master"]["pid"] == os.getppid()
+
+    single = worker_memory_report()
+    assert single["master"] is None and [usage["pid"] for usage in single["workers"]] == [os.getpid()]
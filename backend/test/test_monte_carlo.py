@@ -0,0 +1,40 @@
+"""Tests for the Monte Carlo simulator in ``modules.monte_carlo``."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.monte_carlo import simulate_paths, simulate_retirement
+from modules.projection import future_value
+
+USER = {"age": 30, "retirementAge": 65, "currentSavings": 20000, "income": 60000, "retirementSavingsGoal": 1_000_000}
+
+
+def test_zero_volatility_matches_deterministic_projection():
+    paths = simulate_paths(20000.0, 9000.0, 35, 4, seed=1, return_volatility=0.0,
+                           inflation_rate=0.0, inflation_volatility=0.0)
+    assert np.allclose(paths[:, -1], future_value(20000.0, 9000.0, 0.065, 35), rtol=1e-5)
+
+
+def test_results_are_reproducible_and_independent_of_pool():
+    inline = simulate_retirement(USER, n_paths=60_000, seed=7, parallel=False)
+    pooled = simulate_retirement(USER, n_paths=60_000, seed=7, parallel=True)
+    assert inline["success_probability"] == pooled["success_probability"]
+    assert inline["percentile_bands"]["p50"] == pooled["percentile_bands"]["p50"]
+
+
+def test_bands_are_ordered():
+    result = simulate_retirement(USER, n_paths=2000, seed=3)
+    bands = result["percentile_bands"]
+    assert len(bands["years"]) == 35
+    assert all(lo <= hi for lo, hi in zip(bands["p10"], bands["p90"]))
+    assert 0.0 <= result["success_probability"] <= 1.0
+
+
+def test_already_retired_uses_current_savings():
+    result = simulate_retirement({**USER, "age": 70, "currentSavings": 2_000_000}, n_paths=1000, seed=0)
+    assert result["years_left"] == 0
+    assert result["success_probability"] == 1.0
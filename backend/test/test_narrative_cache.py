@@ -0,0 +1,112 @@
+"""Tests for the profile-bucketed narrative cache in ``modules.narrative_cache``."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.narrative_cache import NarrativeCacheStats, figure_values, profile_signature, render, templatize
+
+
+def figures(age, income, savings, projected, rate, job, retirement_age=65):
+    return {
+        "age": ("age", age),
+        "retirement_age": ("retirement_age", retirement_age),
+        "income": ("money", income),
+        "savings": ("money", savings),
+        "projected_savings": ("money", projected),
+        "required_savings_rate": ("percent", rate),
+        "job": ("text", job)
+    }
+
+
+NARRATIVE = (
+    "As a 35-year-old nurse earning $90,000 with $50k saved, you're on course for about "
+    "$1.2 million if you retire at 65. Save 23.4% of income and max out the $23,000 401(k) limit."
+)
+# Amounts from the static facts, which every user may be told
+FACTS = figure_values("401(k) contribution limit: $23,000\ncatch-up contribution: $7,500")
+
+
+def test_nearby_profiles_share_a_signature():
+    base = profile_signature(35, 90_000, 50_000, 30, 1_000, False, True)
+    assert profile_signature(36, 91_000, 52_000, 31, 2_000, False, True) == base
+    assert profile_signature(41, 90_000, 50_000, 30, 1_000, False, True) != base
+    assert profile_signature(35, 90_000, 50_000, 30, -1_000, False, True) != base
+    assert profile_signature(35, 90_000, 50_000, 30, 1_000, True, True) != base
+
+
+def test_templatize_and_render_rewrites_figures():
+    template = templatize(NARRATIVE, figures(35, 90_000, 50_000, 1_234_567, 23.4, "Nurse"), FACTS)
+    assert "{{income|$,.0}}" in template and "{{job|text}}" in template
+    # Figures that are not the user's own stay as written
+    assert "$23,000 401(k)" in template
+
+    narrative = render(template, figures(37, 94_500, 61_000, 1_301_000, 21.05, "teacher"))
+    assert narrative == (
+        "As a 37-year-old teacher earning $94,500 with $61k saved, you're on course for about "
+        "$1.3 million if you retire at 65. Save 21.1% of income and max out the $23,000 401(k) limit."
+    )
+
+
+def test_templatize_only_rewrites_ages_in_the_users_own_phrasing():
+    narrative = (
+        "As a 52-year-old engineer you can retire at 60 with $900k. "
+        "Catch-up contributions start at age 50 and full retirement age is 67."
+    )
+    template = templatize(narrative, figures(52, 150_000, 400_000, 900_000, 15.0, "engineer", 60))
+    narrative = render(template, figures(50, 150_000, 400_000, 900_000, 15.0, "engineer", 67))
+    assert narrative == (
+        "As a 50-year-old engineer you can retire at 67 with $900k. "
+        "Catch-up contributions start at age 50 and full retirement age is 67."
+    )
+
+
+def test_templatize_refuses_ages_that_may_be_facts():
+    # The user is 50 and retires at 67, so "age 50" and "67" could be either
+    # their own figures or the catch-up age and full retirement age
+    narrative = (
+        "As a 50-year-old engineer you can retire at 67 with $900k. "
+        "Catch-up contributions start at age 50 and full retirement age is 67."
+    )
+    assert templatize(narrative, figures(50, 150_000, 400_000, 900_000, 15.0, "engineer", 67)) is None
+
+
+def test_templatize_refuses_figures_matching_two_values():
+    narrative = "With $90k of income and $90k saved you are on track."
+    assert templatize(narrative, figures(35, 90_000, 90_000, 1_000_000, 10.0, "nurse")) is None
+
+
+def test_templatize_refuses_amounts_derived_from_the_users_figures():
+    user = figures(35, 90_000, 50_000, 1_000_000, 12.0, "nurse")
+    user["gap"] = ("money", 150_000)
+    # $12,500 a month is the gap spread over a year: not a figure and not a fact
+    narrative = "As a 35-year-old nurse you are $150,000 short, about $12,500 a month over the next year."
+    assert templatize(narrative, user, FACTS) is None
+    assert templatize("As a 35-year-old nurse you are $150,000 short of your goal.", user, FACTS) is not None
+
+
+def test_templatize_only_replaces_job_in_the_introduction():
+    user = figures(45, 150_000, 400_000, 900_000, 15.0, "Manager")
+    template = templatize("As a 45-year-old manager you can save $23,000 a year.", user, FACTS)
+    assert template == "As a {{age|.0}}-year-old {{job|text}} you can save $23,000 a year."
+    # "manager" elsewhere may be the user's job or an unrelated word
+    narrative = "As a 45-year-old manager you are on track. Ask a fund manager about fees."
+    assert templatize(narrative, user, FACTS) is None
+
+
+def test_render_fails_when_a_figure_is_missing():
+    template = templatize(NARRATIVE, figures(35, 90_000, 50_000, 1_234_567, 23.4, "Nurse"), FACTS)
+    assert render(template, figures(37, 94_500, 61_000, 1_301_000, 21.05, "")) is None
+
+
+def test_stats_report_hit_rate_per_signature():
+    stats = NarrativeCacheStats()
+    stats.record_lookup("a", hit=False)
+    stats.record_lookup("a", hit=True)
+    stats.record_lookup("b", hit=False, render_failed=True)
+    report = stats.stats()
+    assert report["hit_rate"] == 1 / 3
+    assert report["render_failures"] == 1
+    assert report["top_hit_signatures"] == {"a": 1}
+    assert report["signatures_seen"] == 2
@@ -0,0 +1,142 @@
+"""Tests for the vectorized projection engine in ``modules.projection``."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.projection import (
+    future_value,
+    project_population,
+    project_savings,
+    required_savings_rate,
+    to_intermediate_calculations,
+)
+from modules.sensitivity import sensitivity_grid
+from modules.solver import solve_contribution_rate, solve_retirement_age
+from modules.household import mortgage_balance, project_household
+
+
+def loop_projection(current_savings, annual_contribution, annual_return, years_left):
+    """Reference implementation matching the original per-user loop"""
+    projected = current_savings
+    contributions, growth, cumulative = [], [], []
+    for _ in range(years_left):
+        year_growth = projected * annual_return
+        projected = projected + year_growth + annual_contribution
+        contributions.append(annual_contribution)
+        growth.append(year_growth)
+        cumulative.append(projected)
+    return projected, contributions, growth, cumulative
+
+
+def test_matches_loop_for_mixed_horizons():
+    savings = np.array([10000.0, 0.0, 250000.0])
+    contribution = np.array([15000.0, 4500.0, 0.0])
+    years = np.array([35, 3, 0])
+
+    result = project_savings(savings, contribution, 0.065, years)
+
+    for i in range(3):
+        expected, contributions, growth, cumulative = loop_projection(savings[i], contribution[i], 0.065, years[i])
+        n = years[i]
+        assert np.isclose(result["projected_savings"][i], expected, rtol=1e-12)
+        assert np.allclose(result["contributions"][i, :n], contributions)
+        assert np.allclose(result["growth"][i, :n], growth, rtol=1e-12)
+        assert np.allclose(result["cumulative"][i, :n], cumulative, rtol=1e-12)
+        assert not result["mask"][i, n:].any()
+
+
+def test_zero_return_is_linear():
+    assert future_value(1000.0, 100.0, 0.0, 10) == 2000.0
+
+
+def test_negative_horizon_keeps_current_savings():
+    result = project_savings([5000.0], [1000.0], 0.065, [-3])
+    assert result["projected_savings"][0] == 5000.0
+    assert to_intermediate_calculations(result, 60)["cumulative"] == []
+
+
+def test_intermediate_calculations_shape():
+    result = project_savings([0.0], [100.0], 0.1, [2])
+    calcs = to_intermediate_calculations(result, 30)
+    assert [c["year"] for c in calcs["cumulative"]] == [31, 32]
+    assert np.isclose(calcs["cumulative"][1]["amount"], 210.0)
+    assert np.isclose(calcs["growth"][1]["amount"], 10.0)
+
+
+def test_required_savings_rate_clamped():
+    rates = required_savings_rate([0, 0, 0, 0], [100000, 100000, 0, 100000], [100000, 10**7, 10**6, 10**6], [10, 10, 10, 0])
+    assert np.allclose(rates, [0.15, 0.50, 0.50, 0.15])
+
+
+def test_project_population_handles_missing_fields():
+    scores = project_population([
+        {"age": 30, "retirementAge": 65, "currentSavings": 1000, "income": 50000, "retirementSavingsGoal": 10**6},
+        {"age": 40, "retirementAge": 60, "currentSavings": None, "income": 80000, "retirementSavingsGoal": 0},
+    ])
+    assert scores["years_left"].tolist() == [35, 20]
+    assert np.allclose(scores["gap"], scores["goal"] - scores["projected_savings"])
+    assert project_population([])["projected_savings"].shape == (0,)
+
+
+def test_sensitivity_grid_matches_projection():
+    grid = sensitivity_grid(10000.0, 80000.0, 1_000_000.0, 35, [0.1, 0.15], [0.05, 0.065, 0.08], [60, 65], [0.0, 0.03])
+    assert grid["shape"] == [2, 3, 2, 2]
+    expected = project_savings([10000.0], [80000.0 * 0.15], 0.065, [30])["projected_savings"][0]
+    assert np.isclose(grid["projected_savings"][1, 1, 1, 0], expected)
+    assert np.isclose(grid["projected_savings"][1, 1, 1, 1], expected / 1.03 ** 30)
+    assert np.allclose(grid["gap"], 1_000_000.0 - grid["projected_savings"])
+
+
+def test_solved_rate_reaches_goal_exactly():
+    rates = solve_contribution_rate([10000.0, 2_000_000.0, 0.0], [80000.0, 50000.0, 0.0], 1_000_000.0, [30, 10, 30])
+    assert np.isclose(future_value(10000.0, 80000.0 * rates[0], 0.065, 30), 1_000_000.0)
+    assert rates[1] == 0.0
+    assert np.isinf(rates[2])
+
+
+def test_earliest_retirement_age_is_first_crossing():
+    ages = solve_retirement_age([30, 30, 95], [10000.0, 0.0, 0.0], [80000.0, 1000.0, 1000.0], [1_000_000.0, 10**9, 10**6])
+    years = ages[0] - 30
+    assert future_value(10000.0, 12000.0, 0.065, years) >= 1_000_000.0
+    assert future_value(10000.0, 12000.0, 0.065, years - 1) < 1_000_000.0
+    assert ages[1] == -1 and ages[2] == -1
+
+
+def test_household_accounts_match_single_pot_projection():
+    # One account with no limits, match or income growth reduces to the planner's projection
+    accounts = {
+        "401k": {"contribution_rate": 0.15, "annual_limit": np.inf, "catch_up": 0.0},
+        "ira": {"contribution_rate": 0.0},
+        "taxable": {"contribution_rate": 0.0},
+    }
+    user = {"age": 30, "retirementAge": 65, "currentSavings": 20000, "income": 80000}
+    household = project_household([user], accounts=accounts, income_growth=0.0, employer_match_rate=0.0)
+    expected = project_population([user])["projected_savings"][0]
+    assert np.isclose(household["balances"][0, 0], expected)
+    assert household["home_equity"][0] == 0.0
+
+
+def test_household_paths_are_only_built_on_request():
+    users = [
+        {"age": 40, "retirementAge": 65, "currentSavings": 50000, "income": 100000,
+         "hasMortgage": "yes", "mortgageAmount": 300000, "mortgageTerm": 30, "downPayment": 60000},
+        {"age": 60, "retirementAge": 62, "currentSavings": 400000, "income": 120000},
+    ]
+    summary = project_household(users)
+    full = project_household(users, include_paths=True)
+    assert "paths" not in summary and "home_equity_path" not in summary
+    assert np.array_equal(summary["net_worth"], full["net_worth"])
+    # The last active year of each path is the balance at retirement
+    assert np.allclose(full["paths"][0, :, 24], full["balances"][0])
+    assert np.allclose(full["paths"][1, :, 1], full["balances"][1]) and not full["paths"][1, :, 2:].any()
+    assert np.isclose(full["home_equity_path"][0, 24], full["home_equity"][0])
+
+
+def test_mortgage_paid_off_at_term():
+    assert np.isclose(mortgage_balance(300000.0, 30, 0.065, 30), 0.0, atol=1e-6)
+    assert mortgage_balance(300000.0, 30, 0.065, 10) < 300000.0
+    assert mortgage_balance(300000.0, 0, 0.065, 10) == 300000.0
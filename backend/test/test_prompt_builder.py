@@ -0,0 +1,36 @@
+"""Tests for the token-budgeted prompt assembly in ``modules.prompt_builder``."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.prompt_builder import PromptBuilder, estimate_tokens, fill_budget
+
+SYSTEM = "Instructions.\n{{ static_facts }}"
+USER = "Age: {{ age }}\n{% for snippet in context %}{{ snippet }}\n{% endfor %}"
+
+
+def test_fill_budget_keeps_relevance_order_and_skips_oversized():
+    snippets = ["a" * 40, "b" * 400, "c" * 20]
+    chosen, used, dropped = fill_budget(snippets, budget=20)
+    assert chosen == ["a" * 40, "c" * 20]
+    assert used == estimate_tokens("a" * 40) + estimate_tokens("c" * 20)
+    assert dropped == 1
+
+
+def test_system_prompt_is_stable_and_budgeted():
+    facts = "\n".join(f"fact {i}: " + "x" * 36 for i in range(100))
+    builder = PromptBuilder(SYSTEM, USER, static_facts_budget=50)
+    first = builder.build(facts, ["context one"], age=40)
+    second = builder.build(facts, ["context two"], age=55)
+    assert first["system_prompt"] == second["system_prompt"]
+    assert first["system_prompt"].count("fact ") == 4
+    assert "context two" in second["user_prompt"] and "Age: 55" in second["user_prompt"]
+
+
+def test_context_skips_static_facts_and_duplicates():
+    builder = PromptBuilder(SYSTEM, USER, context_budget=10)
+    prompt = builder.build("known fact", ["known fact", "new fact", "new fact", "y" * 200], age=30)
+    assert prompt["user_prompt"] == "Age: 30\nnew fact\n"
+    assert prompt["context_dropped"] == 1
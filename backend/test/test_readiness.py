@@ -0,0 +1,31 @@
+"""Tests for subsystem warm-up tracking in ``modules.readiness``."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.readiness import Readiness
+
+
+def test_loading_marks_ready_and_reports_snapshot():
+    readiness = Readiness()
+    readiness.register("index", "model")
+    assert not readiness.is_ready()
+
+    with readiness.loading("index"):
+        assert readiness.state("index") == "loading"
+    assert readiness.state("index") == "ready"
+    assert readiness.is_ready(["index"]) and not readiness.is_ready()
+    assert "load_seconds" in readiness.snapshot()["index"]
+
+
+def test_loading_failure_marks_error():
+    readiness = Readiness()
+    with pytest.raises(RuntimeError):
+        with readiness.loading("model"):
+            raise RuntimeError("weights missing")
+    assert readiness.snapshot()["model"] == {"state": "error", "error": "weights missing"}
+    assert not readiness.is_ready()
@@ -0,0 +1,54 @@
+"""Tests for adaptive rerank depth selection in ``modules.rerank_policy``."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.rerank_policy import RerankStats, choose_rerank_depth
+
+
+def test_clear_winner_skips_reranking():
+    decision = choose_rerank_depth([0.4, 0.9, 1.0, 1.1], top_n=3, max_depth=5)
+    assert decision["mode"] == "skip" and decision["depth"] == 0
+
+
+def test_close_candidates_escalate():
+    decision = choose_rerank_depth([1.00, 1.01, 1.02, 1.03, 1.04], top_n=3, max_depth=5)
+    assert decision["mode"] == "escalate" and decision["escalate"]
+    assert decision["depth"] == 10
+
+
+def test_depth_follows_distance_band():
+    decision = choose_rerank_depth([1.0, 1.05, 1.1, 1.3, 1.5, 1.8], top_n=2, max_depth=5)
+    assert decision["mode"] == "partial" and decision["depth"] == 3
+
+    decision = choose_rerank_depth([1.0, 1.05, 1.1, 1.12, 1.14, 1.8], top_n=2, max_depth=5)
+    assert decision["mode"] == "full" and decision["depth"] == 5
+
+
+def test_latency_budget_caps_depth():
+    decision = choose_rerank_depth([1.00, 1.01, 1.02, 1.03, 1.04], top_n=3, max_depth=5,
+                                   latency_budget_ms=10, per_pair_ms=4)
+    assert decision["mode"] == "partial" and decision["depth"] == 2 and not decision["escalate"]
+
+    decision = choose_rerank_depth([1.0, 1.05, 1.1], top_n=3, max_depth=5, latency_budget_ms=1, per_pair_ms=4)
+    assert decision["mode"] == "skip" and decision["depth"] == 0
+
+
+def test_stats_track_decisions_and_pair_cost():
+    stats = RerankStats(initial_per_pair_ms=10, alpha=0.5)
+    stats.record({"mode": "partial"}, pairs=4, seconds=0.02)
+    stats.record({"mode": "skip"})
+    summary = stats.stats()
+    assert summary["decisions"]["partial"] == 1 and summary["decisions"]["skip"] == 1
+    assert summary["per_pair_ms"] == 7.5
+
+
+def test_forward_passes_update_pair_cost_without_a_decision():
+    stats = RerankStats(initial_per_pair_ms=10, alpha=0.5)
+    stats.record_forward(pairs=8, seconds=0.016)
+    stats.record_forward(pairs=0, seconds=1.0)
+    summary = stats.stats()
+    assert summary["per_pair_ms"] == 6.0
+    assert sum(summary["decisions"].values()) == 0
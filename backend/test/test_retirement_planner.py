@@ -0,0 +1,408 @@
+"""Tests for the plan endpoints in ``retirement_planner``.
+
+Optional model dependencies are stubbed as in ``test_format_user_data``; the
+LLM and retrieval are replaced per test, and every store points at a
+temporary directory.
+"""
+
+import asyncio
+import importlib.util
+import json
+import time
+import multiprocessing
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+if importlib.util.find_spec("faiss") is None:
+    sys.modules.setdefault("faiss", types.ModuleType("faiss"))
+sys.modules.setdefault("ollama", types.ModuleType("ollama"))
+if importlib.util.find_spec("jinja2") is None:
+    jinja2_mod = types.ModuleType("jinja2")
+    setattr(jinja2_mod, "Template", object)
+    sys.modules.setdefault("jinja2", jinja2_mod)
+
+st = sys.modules.setdefault("sentence_transformers", types.ModuleType("sentence_transformers"))
+setattr(st, "SentenceTransformer", object)
+setattr(st, "CrossEncoder", object)
+
+lc_docs = types.ModuleType("langchain_core.documents")
+setattr(lc_docs, "Document", object)
+sys.modules.setdefault("langchain_core", types.ModuleType("langchain_core"))
+sys.modules.setdefault("langchain_core.documents", lc_docs)
+
+lts = types.ModuleType("langchain_text_splitters")
+setattr(lts, "RecursiveCharacterTextSplitter", object)
+sys.modules.setdefault("langchain_text_splitters", lts)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+spec = importlib.util.spec_from_file_location(
+    "retirement_planner",
+    (Path(__file__).resolve().parents[1] / "retirement_planner.py")
+)
+retirement_planner = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(retirement_planner)
+# Process pools pickle functions by module name
+sys.modules.setdefault("retirement_planner", retirement_planner)
+
+from modules.batching import InferenceBatcher
+from modules.job_queue import JobStore
+from modules.kv_store import KVStore
+from modules.rerank_policy import RerankStats
+from modules.workers import BoundedPool, PoolSaturated
+
+
+@pytest.fixture
+def planner(tmp_path, monkeypatch):
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(retirement_planner, "plan_jobs", JobStore(str(tmp_path / "jobs.sqlite3")))
+    monkeypatch.setattr(retirement_planner, "JOB_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(retirement_planner, "plan_cache", KVStore(str(tmp_path / "plans.sqlite3")))
+    monkeypatch.setattr(retirement_planner, "narrative_cache", KVStore(str(tmp_path / "narratives.sqlite3")))
+    monkeypatch.setattr(retirement_planner, "plan_batches", KVStore(str(tmp_path / "batches.sqlite3")))
+    # No retrieval index or facts: prompts are built from the user input alone
+    monkeypatch.setattr(retirement_planner, "get_index_manager", lambda: None)
+    monkeypatch.setattr(retirement_planner, "hybrid_retrieve_chunks", lambda *args, **kwargs: ("", []))
+    monkeypatch.setattr(retirement_planner, "load_retirement_facts", lambda: {})
+    return retirement_planner
+
+
+class StubLLM:
+    """Stands in for ``llm_client``: a fixed narrative, or ``error`` raised after the first token"""
+
+    def __init__(self, narrative="Save 15% of your income and retire at 65.", error=None, delay=0.0):
+        self.narrative = narrative
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    async def chat(self, system_prompt, user_prompt, deadline=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.narrative
+
+    async def stream(self, system_prompt, user_prompt, deadline=None):
+        self.calls += 1
+        for token in self.narrative.split(" "):
+            yield token + " "
+            if self.error:
+                raise self.error
+
+
+@pytest.fixture
+def llm(planner, monkeypatch):
+    stub = StubLLM()
+    monkeypatch.setattr(planner, "llm_client", stub)
+    return stub
+
+
+@pytest.fixture
+def client(planner):
+    app = FastAPI()
+    app.include_router(planner.router)
+    with TestClient(app) as client:
+        yield client
+
+
+USER = {"age": 35, "currentSavings": 50000, "income": 90000, "retirementAge": 65, "retirementSavingsGoal": 1000000}
+
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def collect(stream) -> list:
+    async def main():
+        return [event async for event in stream]
+    return asyncio.run(main())
+
+
+def drain_jobs(planner, concurrency=2):
+    """Run the plan job worker until the queue is empty"""
+    async def main():
+        stop = asyncio.Event()
+        worker = asyncio.create_task(planner.run_plan_job_worker(concurrency, stop))
+        while planner.plan_jobs.stats()["queued"] or planner.plan_jobs.stats()["running"]:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await worker
+    asyncio.run(main())
+
+
+def test_job_events_end_with_an_error_when_the_job_disappears(planner):
+    job_id = planner.plan_jobs.submit({})
+    lookups = iter([planner.plan_jobs.get(job_id), None])
+    planner.plan_jobs.get = lambda _: next(lookups)
+
+    events = collect(planner.job_event_stream(job_id))
+    assert [event.split("\n")[0] for event in events] == ["event: status", "event: error"]
+    assert '"status_code": 404' in events[-1]
+
+
+@pytest.mark.parametrize("field, values", [
+    ("annual_returns", [0.05, -1.5]),
+    ("annual_returns", [2.0]),
+    ("retirement_ages", [65, 500]),
+    ("contribution_rates", [-0.1]),
+    ("inflation_rates", [-1.0]),
+])
+def test_sensitivity_rejects_out_of_range_sweep_values(client, field, values):
+    response = client.post("/api/retirement/sensitivity", json={**USER, field: values})
+    assert response.status_code == 422
+
+
+def test_sensitivity_accepts_in_range_sweep_values(client):
+    response = client.post("/api/retirement/sensitivity", json={
+        **USER, "annual_returns": [-0.2, 0.05], "retirement_ages": [60, 67], "contribution_rates": [0.1]
+    })
+    assert response.status_code == 200
+
+
+def test_prompt_keeps_chunks_whole_and_structured_facts_outside_the_budget(planner, monkeypatch):
+    monkeypatch.setattr(planner.plan_prompt_builder, "context_budget", 30)
+    structured = "Relevant retirement rules and facts:\n\n• contribution limit: $23,000\n"
+    chunks = ["Roth IRAs grow tax free.\n\nWithdrawals after 59½ are not taxed.", "A long chunk " * 20]
+    user_data = planner.format_user_data(planner.RetirementInput(**USER).model_dump())
+
+    _, user_prompt = planner.create_prompt(user_data, "", structured, chunks)
+    context = user_prompt.split("[Retrieved Context]\n")[1]
+    assert context.startswith(structured.strip())
+    # The first chunk fits the budget and keeps its second paragraph; the second does not fit
+    assert "Roth IRAs grow tax free.\n\nWithdrawals after 59½ are not taxed." in context
+    assert "A long chunk" not in context
+
+
+def test_reinitializing_the_index_clears_retrieval_caches(planner, monkeypatch):
+    monkeypatch.setattr(planner.IndexManager, "process_retirement_text", lambda self: None)
+    monkeypatch.setattr(planner, "load_retirement_facts", lambda: {})
+    planner.query_embedding_cache.put("query", [0.1])
+    planner.rerank_score_cache.put(("query", 3), 0.5)
+
+    planner.IndexManager().initialize(force=True)
+    assert len(planner.query_embedding_cache) == 0
+    assert len(planner.rerank_score_cache) == 0
+
+
+def test_rerank_pair_cost_excludes_batching_delay(planner, monkeypatch):
+    class FastCrossEncoder:
+        def predict(self, pairs, **kwargs):
+            return [1.0] * len(pairs)
+
+    monkeypatch.setattr(planner, "get_cross_encoder", lambda: FastCrossEncoder())
+    monkeypatch.setattr(planner, "rerank_stats", RerankStats(initial_per_pair_ms=0, alpha=1))
+    monkeypatch.setattr(planner, "rerank_batcher", InferenceBatcher("rerank", planner.predict_rerank_pairs, max_wait_ms=100))
+
+    assert planner.rerank_batcher.submit([("query", "chunk")] * 2) == [1.0, 1.0]
+    # The batcher waited 100ms for more pairs; only the forward pass counts
+    assert planner.rerank_stats.per_pair_ms < 10
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="the stubbed module must be inherited by workers")
+def test_batch_on_a_process_pool_keeps_batch_state_in_the_server(client, planner, llm, monkeypatch):
+    pool = BoundedPool("compute", max_workers=1, max_queue=4, kind="process")
+    monkeypatch.setattr(planner, "compute_pool", pool)
+    try:
+        response = client.post("/api/retirement/plan/batch", json={"inputs": [USER, {**USER, "age": 40}]})
+    finally:
+        pool.shutdown(wait=True)
+
+    result = response.json()
+    assert response.status_code == 200 and result["count"] == 2
+    drain_jobs(planner)
+    assert client.get(f"/api/retirement/plan/batch/{result['batch_id']}").json()["pending"] == 0
+    assert len(planner.load_all_user_profiles()) == 2
+
+
+def test_batches_are_readable_from_another_worker(client, planner, llm, tmp_path, monkeypatch):
+    batch_id = client.post("/api/retirement/plan/batch", json={"inputs": [USER]}).json()["batch_id"]
+    drain_jobs(planner)
+
+    # Another server process only shares the SQLite file
+    monkeypatch.setattr(planner, "plan_batches", KVStore(str(tmp_path / "batches.sqlite3")))
+    result = client.get(f"/api/retirement/plan/batch/{batch_id}").json()
+    assert result["results"][0]["narrative_status"] == "ready"
+    assert result["results"][0]["retirement_plan"]["plan"] == llm.narrative
+    assert client.get("/api/retirement/plan/batch/unknown").status_code == 404
+
+
+def cached_plan_key(planner, user):
+    return planner.compute_user_key(planner.RetirementInput(**user).model_dump())
+
+
+def test_slow_llm_serves_a_provisional_plan_then_upgrades_it(client, planner, llm):
+    llm.delay = 0.3
+    plan = client.post("/api/retirement/plan?slo_seconds=0.05", json=USER).json()["retirement_plan"]
+    assert plan["provisional"] and plan["narrative_source"] == "fallback"
+
+    # The upgrade state is stored with the plan, so any worker can report it
+    cached = planner.plan_cache.get(cached_plan_key(planner, USER))
+    assert planner.plan_upgrade_pending(cached)
+    assert client.get(f"/api/retirement/plan/{plan['plan_id']}").json()["upgrade_pending"]
+
+    for _ in range(50):
+        upgraded = client.get(f"/api/retirement/plan/{plan['plan_id']}").json()
+        if not upgraded["retirement_plan"]["provisional"]:
+            break
+        time.sleep(0.05)
+    assert upgraded["retirement_plan"]["plan"] == llm.narrative
+    assert not upgraded["upgrade_pending"]
+
+
+def test_provisional_plan_is_regenerated_once_its_upgrade_lease_expires(client, planner, llm):
+    key = cached_plan_key(planner, USER)
+    prepared = {"metrics": planner.compute_plan_metrics([USER])[0], "similar_profiles": []}
+    provisional = planner.assemble_plan("plan-1", "Fallback plan", prepared, "fallback", provisional=True)
+
+    # Another worker is still upgrading it: serve it as is
+    planner.save_plan_cache(key, {**provisional, "upgrade_started_at": time.time(), "upgrade_lease_seconds": 60})
+    plan = client.post("/api/retirement/plan", json=USER).json()["retirement_plan"]
+    assert plan["plan"] == "Fallback plan" and llm.calls == 0
+
+    # The upgrading worker went away: regenerate under the same plan ID
+    planner.save_plan_cache(key, {**provisional, "upgrade_started_at": time.time() - 120, "upgrade_lease_seconds": 60})
+    plan = client.post("/api/retirement/plan", json=USER).json()["retirement_plan"]
+    assert plan["plan_id"] == "plan-1" and plan["plan"] == llm.narrative and not plan["provisional"]
+    assert llm.calls == 1
+
+
+class Document:
+    def __init__(self, page_content, metadata=None):
+        self.page_content = page_content
+        self.metadata = metadata or {}
+
+
+class ParagraphSplitter:
+    def __init__(self, **kwargs):
+        pass
+
+    def split_documents(self, documents):
+        return [Document(part) for document in documents for part in document.page_content.split("\n\n")]
+
+
+class CountingEmbeddingModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        rng = np.random.default_rng(len(self.encoded))
+        return rng.standard_normal((len(texts), retirement_planner.EMBEDDING_DIMENSION)).astype(np.float32)
+
+
+def test_index_reloads_from_disk_and_reembeds_only_changed_chunks(planner, tmp_path, monkeypatch):
+    pytest.importorskip("faiss")
+    monkeypatch.setitem(sys.modules, "langchain_core.documents", types.SimpleNamespace(Document=Document))
+    monkeypatch.setitem(sys.modules, "langchain_text_splitters",
+                        types.SimpleNamespace(RecursiveCharacterTextSplitter=ParagraphSplitter))
+    model = CountingEmbeddingModel()
+    monkeypatch.setattr(planner, "get_embedding_model", lambda: model)
+    monkeypatch.setattr(planner, "INDEX_MMAP", True)
+    facts, cache_dir = tmp_path / "facts.txt", str(tmp_path / "index")
+    manager = object.__new__(planner.IndexManager)
+
+    facts.write_text("IRA limits\n\n401(k) limits\n\nSocial Security")
+    assert manager.process_retirement_text(str(facts), cache_dir)
+    assert model.encoded == ["IRA limits", "401(k) limits", "Social Security"]
+
+    # Unchanged text loads the persisted (memory-mapped) index without embedding anything
+    manager.index = None
+    assert manager.process_retirement_text(str(facts), cache_dir)
+    assert len(model.encoded) == 3 and manager.index.ntotal == 3
+    assert [doc.metadata["chunk_id"] for doc in manager.document_store] == [0, 1, 2]
+
+    facts.write_text("IRA limits\n\n401(k) limits for 2025\n\nSocial Security")
+    assert manager.process_retirement_text(str(facts), cache_dir)
+    assert model.encoded[3:] == ["401(k) limits for 2025"]
+    assert manager.index.ntotal == 3
+
+
+def test_plan_stream_sends_metrics_then_tokens_then_done(client, llm):
+    response = client.post("/api/retirement/plan/stream", json=USER)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    names = [name for name, _ in events]
+
+    assert names[:2] == ["metrics", "similar_profiles"] and names[-1] == "done"
+    assert set(names[2:-1]) == {"token"}
+    assert "".join(data["text"] for name, data in events if name == "token") == llm.narrative + " "
+    assert events[0][1]["plan_id"] == events[-1][1]["retirement_plan"]["plan_id"]
+
+    # The finished plan was cached, so the same request streams it as one token
+    cached = [name for name, _ in parse_events(client.post("/api/retirement/plan/stream", json=USER).text)]
+    assert cached == ["metrics", "token", "done"] and llm.calls == 1
+
+
+def test_plan_stream_falls_back_when_the_llm_fails(client, llm):
+    llm.error = RuntimeError("model crashed")
+    events = parse_events(client.post("/api/retirement/plan/stream", json=USER).text)
+    assert [name for name, _ in events][-2:] == ["fallback", "done"]
+    assert events[-1][1]["retirement_plan"]["narrative_source"] == "fallback"
+
+
+def test_plan_stream_ends_with_an_error_event_when_the_llm_is_saturated(client, llm):
+    llm.error = PoolSaturated("llm", 429)
+    events = parse_events(client.post("/api/retirement/plan/stream", json=USER).text)
+    assert events[0][0] == "metrics"
+    assert events[-1][0] == "error" and events[-1][1]["status_code"] == 429
+
+
+def test_batch_dedupes_inputs_and_reuses_cached_plans(client, planner, llm):
+    other = {**USER, "age": 50, "retirementAge": 67}
+    prepared = {"metrics": planner.compute_plan_metrics([other])[0], "similar_profiles": []}
+    planner.save_plan_cache(cached_plan_key(planner, other), planner.assemble_plan("cached-plan", "Cached narrative", prepared))
+
+    result = client.post("/api/retirement/plan/batch", json={"inputs": [USER, USER, other]}).json()
+    assert (result["count"], result["unique_count"], result["pending"]) == (3, 2, 1)
+    first, duplicate, cached = result["results"]
+    assert first["user_key"] == duplicate["user_key"]
+    assert first["retirement_plan"]["plan_id"] == duplicate["retirement_plan"]["plan_id"]
+    assert first["narrative_status"] == "pending" and first["retirement_plan"]["projected_savings"] > 0
+    assert cached["narrative_status"] == "ready" and cached["retirement_plan"]["plan"] == "Cached narrative"
+
+    # Narratives are generated by plan jobs, once per unique input
+    drain_jobs(planner)
+    polled = client.get(f"/api/retirement/plan/batch/{result['batch_id']}").json()
+    assert polled["pending"] == 0 and llm.calls == 1
+    assert [r["retirement_plan"]["plan"] for r in polled["results"]] == [llm.narrative, llm.narrative, "Cached narrative"]
+    assert planner.get_cached_plan(first["user_key"])["plan"] == llm.narrative
+    assert len(planner.load_all_user_profiles()) == 3
+
+
+def test_batch_narratives_run_concurrently_and_survive_a_restart(client, planner, llm):
+    llm.delay = 0.2
+    inputs = [{**USER, "age": age} for age in (30, 35, 40, 45)]
+    result = client.post("/api/retirement/plan/batch", json={"inputs": inputs}).json()
+    assert result["pending"] == 4
+
+    # The jobs are on disk, so a worker started after the request picks them up
+    started = time.monotonic()
+    drain_jobs(planner, concurrency=4)
+    assert time.monotonic() - started < 0.6
+    polled = client.get(f"/api/retirement/plan/batch/{result['batch_id']}").json()
+    assert polled["pending"] == 0 and llm.calls == 4
+
+
+def test_batch_plans_whose_jobs_cannot_finish_report_an_error(client, planner, llm, monkeypatch):
+    batch_id = client.post("/api/retirement/plan/batch", json={"inputs": [USER]}).json()["batch_id"]
+    job = planner.plan_jobs.claim("crashed-worker")
+    planner.plan_jobs.fail(job["id"], "crashed-worker", "worker died")
+    polled = client.get(f"/api/retirement/plan/batch/{batch_id}").json()
+    assert polled["pending"] == 0 and polled["results"][0]["narrative_status"] == "error"
+
+    # A full job queue fails the narratives up front instead of leaving them pending
+    monkeypatch.setattr(planner.plan_jobs, "max_queued", 0)
+    result = client.post("/api/retirement/plan/batch", json={"inputs": [{**USER, "age": 40}]}).json()
+    assert result["pending"] == 0 and result["results"][0]["narrative_status"] == "error"
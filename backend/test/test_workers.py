@@ -0,0 +1,84 @@
+"""Tests for the bounded worker pools in ``modules.workers``."""
+
+import asyncio
+import gc
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import workers
+from modules.workers import BoundedPool, PoolSaturated
+
+
+def test_run_returns_result_off_the_event_loop():
+    pool = BoundedPool("test", max_workers=2, max_queue=0)
+    loop_thread = threading.get_ident()
+
+    async def main():
+        return await pool.run(lambda x: (x * 2, threading.get_ident()), 21)
+
+    value, worker_thread = asyncio.run(main())
+    assert value == 42
+    assert worker_thread != loop_thread
+    assert pool.stats()["completed"] == 1
+    pool.shutdown()
+
+
+def test_rejects_with_429_when_queue_is_full():
+    pool = BoundedPool("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.stats()["running"] == 1 and pool.stats()["queued"] == 1
+        with pytest.raises(PoolSaturated) as excinfo:
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+        return excinfo.value
+
+    error = asyncio.run(main())
+    assert error.status_code == 429
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["running"] == 0
+    pool.shutdown()
+
+
+def test_rejects_with_503_after_shutdown():
+    pool = BoundedPool("test", max_workers=1, max_queue=0)
+    pool.shutdown()
+    with pytest.raises(PoolSaturated) as excinfo:
+        asyncio.run(pool.run(int))
+    assert excinfo.value.status_code == 503
+
+
+def test_from_env_reads_sizes(monkeypatch):
+    monkeypatch.setenv("RETIREMENT_TEST_WORKERS", "3")
+    monkeypatch.setenv("RETIREMENT_TEST_QUEUE", "7")
+    pool = BoundedPool.from_env("test", max_workers=1, max_queue=0)
+    assert (pool.max_workers, pool.max_queue, pool.kind) == (3, 7, "thread")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_starts_fresh_executors_without_pinning_pools():
+    pool = BoundedPool("test", max_workers=1, max_queue=0)
+    asyncio.run(pool.run(int, "1"))
+    assert pool._executor is not None
+
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if pool._executor is None and pool.in_flight == 0 else 1)
+    assert os.waitpid(pid, 0)[1] == 0
+    assert pool._executor is not None
+    pool.shutdown()
+
+    # The fork handler holds pools weakly, so dropped pools can be collected
+    del pool
+    gc.collect()
+    assert not any(p.name == "test" for p in workers._live_pools)
@@ -33,6 +33,9 @@ const RetirementPlanDisplay = () => {
     return null;
   }
 
+  const { years, cumulative } = planData.intermediate_calculations;
+  const savingsProjection = years.map((year, i) => ({ year, amount: cumulative[i] }));
+
   const formatCurrency = (value: number) => {
     return new Intl.NumberFormat('en-US', {
       style: 'currency',
@@ -134,7 +137,7 @@ const RetirementPlanDisplay = () => {
               </h2>
               <div className="h-[200px]">
                 <ResponsiveContainer width="100%" height="100%">
-                  <LineChart data={planData.intermediate_calculations.cumulative}>
+                  <LineChart data={savingsProjection}>
                     <XAxis 
                       dataKey="year" 
                       tick={{ fontSize: 12 }}
@@ -47,6 +47,14 @@ export interface RetirementPlanInput {
   retirementSavingsGoal: number;
 }
 
+export interface ColumnarCalculations {
+  format: 'columnar';
+  years: number[];
+  contributions: number[];
+  growth: number[];
+  cumulative: number[];
+}
+
 export interface RetirementPlanResponse {
   plan_id: string;
   plan: string;
@@ -54,11 +62,7 @@ export interface RetirementPlanResponse {
   years_left: number;
   gap: number;
   required_savings_rate: number;
-  intermediate_calculations: {
-    contributions: Array<{ year: number; amount: number }>;
-    growth: Array<{ year: number; amount: number }>;
-    cumulative: Array<{ year: number; amount: number }>;
-  };
+  intermediate_calculations: ColumnarCalculations;
   similar_profiles: Array<{
     profile_id: string;
     similarity: number;
@@ -105,7 +109,9 @@ export const stocksApi = {
 export const retirementApi = {
   generatePlan: async (input: RetirementPlanInput): Promise<RetirementPlanResponse> => {
     try {
-      const response = await axios.post(`${API_BASE_URL}/retirement/plan`, input);
+      const response = await axios.post(`${API_BASE_URL}/retirement/plan`, input, {
+        params: { calc_format: 'columnar' }
+      });
       return response.data.retirement_plan;
     } catch (error) {
       console.error('Error generating retirement plan:', error);